@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Admission Control
+Estimates the CPU and temp-disk cost of render jobs, queues them when the
+node is busy and rejects them (with a retry hint) when it is saturated
+"""
+
+import asyncio
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+# Minimum number of recorded renders before the cost model is refitted
+MIN_CALIBRATION_RECORDS = 5
+# Only the most recent renders are used, so the model follows hardware/setting changes
+MAX_CALIBRATION_RECORDS = 500
+
+
+def _solve_least_squares(rows: List[List[float]], targets: List[float]) -> Optional[List[float]]:
+    """
+    Solve the normal equations of a small least squares problem
+
+    Args:
+        rows: Feature vectors
+        targets: Observed values
+
+    Returns:
+        Coefficients, or None if the system is singular
+    """
+    n = len(rows[0])
+    # Augmented matrix [X^T X | X^T y]
+    matrix = [[0.0] * (n + 1) for _ in range(n)]
+    for row, target in zip(rows, targets):
+        for i in range(n):
+            for j in range(n):
+                matrix[i][j] += row[i] * row[j]
+            matrix[i][n] += row[i] * target
+
+    # Gauss-Jordan elimination with partial pivoting
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(matrix[r][col]))
+        if abs(matrix[pivot][col]) < 1e-12:
+            return None
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        for r in range(n):
+            if r != col:
+                factor = matrix[r][col] / matrix[col][col]
+                for c in range(col, n + 1):
+                    matrix[r][c] -= factor * matrix[col][c]
+
+    return [matrix[i][n] / matrix[i][i] for i in range(n)]
+
+
+def load_metric_records(metrics_path: str) -> List[Dict]:
+    """
+    Read the most recent recorded render metrics (calibration data)
+
+    Args:
+        metrics_path: JSONL file written by AdmissionController.record()
+    """
+    if not os.path.exists(metrics_path):
+        return []
+    with open(metrics_path, 'r') as f:
+        return _parse_metric_lines(f.readlines())
+
+
+def _parse_metric_lines(lines: List[str]) -> List[Dict]:
+    """The most recent records of metrics JSONL lines (unreadable lines skipped)"""
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records[-MAX_CALIBRATION_RECORDS:]
+
+
+def _read_and_trim_metrics(metrics_path: str) -> List[Dict]:
+    """
+    Read the metrics file, cutting it back to the records calibration uses
+
+    The file is rewritten (atomically) once it holds twice MAX_CALIBRATION_RECORDS
+    lines, so it stays bounded however long the node runs. A record another
+    process appends during the rewrite may be lost; the model never needs all of them.
+    """
+    with open(metrics_path, 'r') as f:
+        lines = f.readlines()
+    if len(lines) > 2 * MAX_CALIBRATION_RECORDS:
+        lines = lines[-MAX_CALIBRATION_RECORDS:]
+        trimmed_path = f"{metrics_path}.tmp"
+        with open(trimmed_path, 'w') as f:
+            f.writelines(lines)
+        os.replace(trimmed_path, metrics_path)
+    return _parse_metric_lines(lines)
+
+
+class JobCost:
+    def __init__(self, cpu_seconds: float, temp_bytes: int, features: Dict):
+        """
+        Estimated cost of one render job
+
+        Args:
+            cpu_seconds: Estimated FFmpeg CPU time (user + system)
+            temp_bytes: Estimated peak disk usage (scene clips + output)
+            features: Job features the estimate was computed from
+        """
+        self.cpu_seconds = cpu_seconds
+        self.temp_bytes = temp_bytes
+        self.features = features
+
+
+class CostModel:
+    # Conservative starting point (libx264 -preset fast, zoompan at 1.5-2x),
+    # replaced by calibrate() once enough renders have been recorded
+    DEFAULT_CPU_COEFFICIENTS = [0.02, 0.5, 1.0]  # per megapixel-frame, per scene, fixed
+    DEFAULT_DISK_COEFFICIENTS = [300_000.0, 1_000_000.0]  # per megapixel-second, fixed
+
+    def __init__(self):
+        """Linear cost model for render jobs, refittable from recorded metrics"""
+        self.cpu_coefficients = list(self.DEFAULT_CPU_COEFFICIENTS)
+        self.disk_coefficients = list(self.DEFAULT_DISK_COEFFICIENTS)
+        self.calibrated_from = 0
+
+    @staticmethod
+    def features(scene_durations: Sequence[float], width: int, height: int, fps: int) -> Dict:
+        """
+        Job features used by the model
+
+        Args:
+            scene_durations: Audio duration of each scene in seconds
+            width, height: Output dimensions
+            fps: Frames per second
+        """
+        video_seconds = float(sum(scene_durations))
+        megapixels = width * height / 1_000_000
+        return {
+            'scene_count': len(scene_durations),
+            'video_seconds': video_seconds,
+            'width': width,
+            'height': height,
+            'fps': fps,
+            'megapixel_frames': megapixels * video_seconds * fps,
+            'megapixel_seconds': megapixels * video_seconds,
+        }
+
+    def estimate(self, scene_durations: Sequence[float], width: int, height: int,
+                 fps: int) -> JobCost:
+        """Estimate CPU-seconds and temp disk bytes of a render job"""
+        features = self.features(scene_durations, width, height, fps)
+        a, b, c = self.cpu_coefficients
+        cpu_seconds = a * features['megapixel_frames'] + b * features['scene_count'] + c
+        d, e = self.disk_coefficients
+        temp_bytes = d * features['megapixel_seconds'] + e
+        return JobCost(max(0.0, cpu_seconds), int(max(0.0, temp_bytes)), features)
+
+    def calibrate(self, records: List[Dict]) -> bool:
+        """
+        Refit the model from recorded render metrics
+
+        Args:
+            records: Render metric records (features plus measured
+                     cpu_seconds and temp_bytes)
+
+        Returns:
+            True if the model was refitted
+        """
+        records = [r for r in records if r.get('cpu_seconds') and r.get('temp_bytes')]
+        if len(records) < MIN_CALIBRATION_RECORDS:
+            return False
+
+        cpu_fit = _solve_least_squares(
+            [[r['megapixel_frames'], r['scene_count'], 1.0] for r in records],
+            [r['cpu_seconds'] for r in records]
+        )
+        disk_fit = _solve_least_squares(
+            [[r['megapixel_seconds'], 1.0] for r in records],
+            [r['temp_bytes'] for r in records]
+        )
+        if cpu_fit is None or disk_fit is None:
+            return False
+
+        # Negative coefficients come from noise on small samples, clamp them
+        self.cpu_coefficients = [max(0.0, value) for value in cpu_fit]
+        self.disk_coefficients = [max(0.0, value) for value in disk_fit]
+        self.calibrated_from = len(records)
+        return True
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int):
+        """
+        Raised when the node is saturated and a job cannot even be queued
+
+        Args:
+            message: Reason for the rejection
+            retry_after: Suggested seconds before retrying
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, metrics_path: str, disk_path: str,
+                 max_concurrent: Optional[int] = None,
+                 max_queue: int = 8,
+                 max_backlog_seconds: float = 900,
+                 min_free_gb: float = 1.0,
+                 cpu_count: Optional[int] = None):
+        """
+        Initialize admission control
+
+        Args:
+            metrics_path: JSONL file of recorded render metrics (calibration data)
+            disk_path: Path on the filesystem holding temp files and outputs
+            max_concurrent: Renders allowed to run at once
+                            (default: one per 4 cores, FFmpeg is multithreaded)
+            max_queue: Jobs allowed to wait for a render slot
+            max_backlog_seconds: Reject when the estimated time to drain
+                                 running and queued work exceeds this
+            min_free_gb: Disk headroom kept after all admitted jobs' footprints
+            cpu_count: CPU cores available to renders (default: os.cpu_count())
+        """
+        self.metrics_path = Path(metrics_path)
+        self.disk_path = str(disk_path)
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent or max(1, self.cpu_count // 4)
+        self.max_queue = max_queue
+        self.max_backlog_seconds = max_backlog_seconds
+        self.min_free_gb = min_free_gb
+
+        self.model = CostModel()
+        self._condition = threading.Condition()
+        # Serializes writes of the metrics file; never held together with _condition
+        self._metrics_lock = threading.Lock()
+        self._running: Dict[int, tuple] = {}  # ticket -> (cost, start time)
+        self._queued: Dict[int, JobCost] = {}
+        self._waiting = set()  # queued tickets blocked in wait_for_slot()
+        self._listeners = set()  # wake-up callbacks of wait_for_slot_async() waiters
+        self._next_ticket = 0
+        self._records_since_fit = 0
+
+        self.model.calibrate(self._load_records())
+
+    def _load_records(self) -> List[Dict]:
+        """Read recorded render metrics"""
+        return load_metric_records(str(self.metrics_path))
+
+    def estimate(self, scene_durations: Sequence[float], width: int, height: int,
+                 fps: int) -> JobCost:
+        """Estimate the cost of a job with the current (calibrated) model"""
+        return self.model.estimate(scene_durations, width, height, fps)
+
+    def _wall_seconds(self, cost: JobCost) -> float:
+        """Estimated wall time of a job, sharing the cores with max_concurrent jobs"""
+        return cost.cpu_seconds / (self.cpu_count / self.max_concurrent)
+
+    def _backlog_seconds(self) -> float:
+        """Estimated seconds until all running and queued work is done (lock held)"""
+        now = time.time()
+        remaining = sum(
+            max(0.0, self._wall_seconds(cost) - (now - started))
+            for cost, started in self._running.values()
+        )
+        remaining += sum(self._wall_seconds(cost) for cost in self._queued.values())
+        return remaining / self.max_concurrent
+
+    def _reserved_bytes(self) -> int:
+        """Disk footprint of running and queued jobs (lock held)"""
+        return (sum(cost.temp_bytes for cost, _ in self._running.values())
+                + sum(cost.temp_bytes for cost in self._queued.values()))
+
+    def _check_admissible(self, cost: JobCost):
+        """Raise AdmissionRejected if the job cannot be queued (lock held)"""
+        backlog = self._backlog_seconds()
+
+        if len(self._queued) >= self.max_queue:
+            raise AdmissionRejected(
+                f"Render queue is full ({len(self._queued)} jobs waiting)",
+                retry_after=max(1, math.ceil(backlog / max(1, len(self._queued))))
+            )
+
+        if self._running and backlog + self._wall_seconds(cost) > self.max_backlog_seconds:
+            raise AdmissionRejected(
+                f"Render backlog is {backlog:.0f}s of work",
+                retry_after=max(1, math.ceil(backlog + self._wall_seconds(cost) - self.max_backlog_seconds))
+            )
+
+        free = shutil.disk_usage(self.disk_path).free
+        needed = self._reserved_bytes() + cost.temp_bytes + self.min_free_gb * (1024**3)
+        if needed > free:
+            if not self._running:
+                raise AdmissionRejected(
+                    f"Insufficient disk space: job needs {cost.temp_bytes / (1024**3):.2f} GB "
+                    f"plus {self.min_free_gb} GB headroom, {free / (1024**3):.2f} GB free",
+                    retry_after=300
+                )
+            now = time.time()
+            soonest = min(
+                max(0.0, self._wall_seconds(c) - (now - started))
+                for c, started in self._running.values()
+            )
+            raise AdmissionRejected(
+                "Insufficient disk space for another render right now",
+                retry_after=max(1, math.ceil(soonest))
+            )
+
+    def enqueue(self, cost: JobCost) -> int:
+        """
+        Admit a job into the queue without waiting for a render slot
+
+        Lets callers reject early (before uploads are decoded or provider
+        calls are made) and claim the slot only when the render is ready.
+
+        Args:
+            cost: Estimated job cost
+
+        Returns:
+            Ticket to pass to wait_for_slot() and release()
+
+        Raises:
+            AdmissionRejected: The node is saturated
+        """
+        with self._condition:
+            self._check_admissible(cost)
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._queued[ticket] = cost
+            return ticket
+
+    def wait_for_slot(self, ticket: int, timeout: Optional[float] = None):
+        """
+        Block until an enqueued job may start rendering
+
+        Waiting jobs get slots in ticket (FIFO) order.
+
+        Args:
+            ticket: Ticket returned by enqueue()
+            timeout: Maximum seconds to wait
+
+        Raises:
+            AdmissionRejected: The wait timed out (the job is dequeued), or
+                               the ticket was released while waiting
+        """
+        with self._condition:
+            self._waiting.add(ticket)
+            deadline = time.time() + timeout if timeout is not None else None
+            try:
+                while not self._try_start(ticket):
+                    remaining = deadline - time.time() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        self._time_out(ticket)
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting.discard(ticket)
+                self._notify()
+
+    async def wait_for_slot_async(self, ticket: int, timeout: Optional[float] = None):
+        """
+        Wait on the event loop until an enqueued job may start rendering
+
+        Same contract as wait_for_slot(), but no thread is parked while the
+        job waits: release() and the other waiters wake it through the loop.
+
+        Args:
+            ticket: Ticket returned by enqueue()
+            timeout: Maximum seconds to wait
+
+        Raises:
+            AdmissionRejected: The wait timed out (the job is dequeued), or
+                               the ticket was released while waiting
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def wake():
+            loop.call_soon_threadsafe(changed.set)
+
+        deadline = loop.time() + timeout if timeout is not None else None
+        with self._condition:
+            self._waiting.add(ticket)
+            self._listeners.add(wake)
+        try:
+            while True:
+                changed.clear()
+                with self._condition:
+                    if self._try_start(ticket):
+                        return
+                remaining = deadline - loop.time() if deadline is not None else None
+                try:
+                    await asyncio.wait_for(changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    with self._condition:
+                        if not self._try_start(ticket):
+                            self._time_out(ticket)
+                        return
+        finally:
+            with self._condition:
+                self._waiting.discard(ticket)
+                self._listeners.discard(wake)
+                self._notify()
+
+    def _try_start(self, ticket: int) -> bool:
+        """Move a waiting job to running if it is next and a slot is free (lock held)"""
+        if ticket not in self._queued:
+            # release() was called meanwhile: the job was abandoned
+            raise AdmissionRejected("Job left the render queue", retry_after=0)
+        if len(self._running) >= self.max_concurrent or min(self._waiting) != ticket:
+            return False
+        self._running[ticket] = (self._queued.pop(ticket), time.time())
+        return True
+
+    def _time_out(self, ticket: int):
+        """Dequeue a job whose wait for a slot timed out (lock held)"""
+        self._queued.pop(ticket, None)
+        raise AdmissionRejected(
+            "Timed out waiting for a render slot",
+            retry_after=max(1, math.ceil(self._backlog_seconds()))
+        )
+
+    def _notify(self):
+        """Wake the threads and event loops waiting for a slot (lock held)"""
+        self._condition.notify_all()
+        for wake in self._listeners:
+            wake()
+
+    def acquire(self, cost: JobCost, timeout: Optional[float] = None) -> int:
+        """
+        Admit a job and wait for a render slot (enqueue + wait_for_slot)
+
+        Returns:
+            Ticket to pass to release()
+
+        Raises:
+            AdmissionRejected: The node is saturated (or the wait timed out)
+        """
+        ticket = self.enqueue(cost)
+        self.wait_for_slot(ticket, timeout)
+        return ticket
+
+    def release(self, ticket: int):
+        """Free the render slot (or queue place) of a finished, failed or abandoned job"""
+        with self._condition:
+            self._running.pop(ticket, None)
+            self._queued.pop(ticket, None)
+            self._notify()
+
+    def record(self, cost: JobCost, cpu_seconds: float, temp_bytes: int, wall_seconds: float):
+        """
+        Record measured render metrics and periodically recalibrate the model
+
+        Args:
+            cost: Estimate the job was admitted with
+            cpu_seconds: Measured FFmpeg CPU time
+            temp_bytes: Measured peak disk usage
+            wall_seconds: Measured render wall time
+        """
+        record = dict(cost.features)
+        record.update({
+            'timestamp': time.time(),
+            'cpu_seconds': cpu_seconds,
+            'temp_bytes': temp_bytes,
+            'wall_seconds': wall_seconds,
+            'estimated_cpu_seconds': cost.cpu_seconds,
+            'estimated_temp_bytes': cost.temp_bytes,
+        })
+
+        # File I/O and the refit stay off the admission lock that waiters,
+        # status() and the metrics endpoint share
+        with self._metrics_lock:
+            try:
+                with open(self.metrics_path, 'a') as f:
+                    f.write(json.dumps(record) + "\n")
+                self._records_since_fit += 1
+                if self._records_since_fit < MIN_CALIBRATION_RECORDS:
+                    return
+                self._records_since_fit = 0
+                records = _read_and_trim_metrics(str(self.metrics_path))
+            except OSError as e:
+                print(f"⚠️  Could not record render metrics: {e}")
+                return
+
+        fitted = CostModel()
+        if fitted.calibrate(records):
+            with self._condition:
+                self.model.cpu_coefficients = fitted.cpu_coefficients
+                self.model.disk_coefficients = fitted.disk_coefficients
+                self.model.calibrated_from = fitted.calibrated_from
+
+    def status(self) -> Dict:
+        """Current load, for health checks and metrics"""
+        with self._condition:
+            return {
+                'running': len(self._running),
+                'queued': len(self._queued),
+                'max_concurrent': self.max_concurrent,
+                'backlog_seconds': self._backlog_seconds(),
+                'reserved_bytes': self._reserved_bytes(),
+            }
@@ -4,14 +4,29 @@ Flask API Server for AI Video Weaver
 Provides endpoints for video generation using FFmpeg
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, redirect, send_file, send_from_directory
 from flask_cors import CORS
 import base64
 import os
+import re
+import shutil
 import tempfile
+import threading
+import time
 import uuid
 from pathlib import Path
-from video_generator import VideoGenerator
+from typing import Optional
+from urllib.parse import urlsplit
+from video_generator import VideoGenerator, HLS_PLAYLIST_NAME, HLS_SEGMENT_SECONDS
+from storage_manager import StorageManager
+from video_catalog import VideoCatalog
+from admission import AdmissionController, AdmissionRejected
+from capabilities import ffmpeg_version
+from font_index import SCRIPT_SAMPLES, font_index
+from metrics import CONTENT_TYPE, REGISTRY, register_process_metrics
+from progress_events import MAX_SUBSCRIBERS, ProgressBroker, unknown_job_events
+from render_workers import render_job
+from tracing import span
 import traceback
 
 app = Flask(__name__)
@@ -20,11 +35,171 @@ CORS(app)  # Enable CORS for React frontend
 # Configuration
 UPLOAD_FOLDER = Path("./temp_uploads")
 OUTPUT_FOLDER = Path("./generated_videos")
-UPLOAD_FOLDER.mkdir(exist_ok=True)
-OUTPUT_FOLDER.mkdir(exist_ok=True)
+STREAM_FOLDER = OUTPUT_FOLDER / "streams"
+
+# Storage limits (uploads are evicted shortly after the last job using them releases them)
+OUTPUT_QUOTA_GB = float(os.getenv('OUTPUT_QUOTA_GB', '10'))
+OUTPUT_MAX_AGE = float(os.getenv('OUTPUT_MAX_AGE', '86400'))  # 24 hours
+UPLOAD_MAX_AGE = 60
+MIN_FREE_GB = 3.0
+
+# Render admission: concurrent renders, queue length and how long a request may wait
+MAX_CONCURRENT_RENDERS = int(os.getenv('MAX_CONCURRENT_RENDERS', '0')) or None  # default: cores / 4
+MAX_QUEUED_RENDERS = int(os.getenv('MAX_QUEUED_RENDERS', '8'))
+RENDER_QUEUE_TIMEOUT = 600
+
+# Client-chosen job ids (so the event stream can be opened before the render request returns)
+JOB_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+# Event streams open at once when served by WSGI threads (one thread each); more get 503
+MAX_EVENT_SUBSCRIBERS = int(os.getenv('MAX_EVENT_SUBSCRIBERS', str(MAX_SUBSCRIBERS)))
+EVENT_STREAMS_RETRY_AFTER = 5
+# Public base URL of the event server when it is not the API host on the event port (e.g. behind a proxy)
+EVENTS_BASE_URL = os.getenv('EVENTS_BASE_URL')
+
+# Shared services, created by init_app() on the first request (or by serve.py)
+catalog: Optional[VideoCatalog] = None
+admission: Optional[AdmissionController] = None
+video_generator: Optional[VideoGenerator] = None
+storage: Optional[StorageManager] = None
+_init_lock = threading.Lock()
+# Worker processes that renders run in (set by serve.py); None renders in the request thread
+render_pool = None
+# Serves event streams without a thread per stream (set by serve.py); None streams from WSGI threads
+event_server = None
+
+
+def init_app():
+    """
+    Create the folders and shared services and clean up old files, once
+
+    Safe to call from any thread; every request calls it, so once set up it
+    returns without taking the lock.
+    """
+    global catalog, admission, video_generator, storage
+
+    if storage is not None:
+        return
+    with _init_lock:
+        if storage is not None:
+            return
+
+        UPLOAD_FOLDER.mkdir(exist_ok=True)
+        OUTPUT_FOLDER.mkdir(exist_ok=True)
+
+        # Catalog of generated videos (shared with the MCP server)
+        catalog = VideoCatalog(str(OUTPUT_FOLDER / ".video_catalog.db"))
+
+        # Admission control, calibrated from the metrics of past renders
+        admission = AdmissionController(
+            metrics_path=str(OUTPUT_FOLDER / "render_metrics.jsonl"),
+            disk_path=str(OUTPUT_FOLDER),
+            max_concurrent=MAX_CONCURRENT_RENDERS,
+            max_queue=MAX_QUEUED_RENDERS
+        )
 
-# Initialize video generator
-video_generator = VideoGenerator(output_dir=str(OUTPUT_FOLDER))
+        video_generator = VideoGenerator(output_dir=str(OUTPUT_FOLDER), catalog=catalog,
+                                         cost_model=admission.model)
+
+        # Tracks outputs and uploads; eviction runs in a background janitor thread
+        manager = StorageManager(
+            index_path=str(OUTPUT_FOLDER / ".storage_index.json"),
+            quotas={'output': OUTPUT_QUOTA_GB},
+            max_ages={'output': OUTPUT_MAX_AGE, 'upload': UPLOAD_MAX_AGE},
+            min_free_gb=MIN_FREE_GB
+        )
+        manager.add_root(str(UPLOAD_FOLDER), 'upload')
+        manager.add_root(str(OUTPUT_FOLDER), 'output', '*.mp4')
+        manager.add_root(str(STREAM_FOLDER), 'output')
+        manager.on_evict(uncatalog_evicted_video)
+        manager.on_evict(forget_evicted_stream)
+
+        print("\n🧹 Performing startup cleanup...")
+        evicted = manager.collect()
+        backfilled = catalog.backfill(str(OUTPUT_FOLDER))
+        if backfilled:
+            print(f"📚 Catalog backfilled {backfilled} existing video(s)")
+        print(f"✅ Startup cleanup: Removed {evicted.get('upload', 0)} temp files "
+              f"and {evicted.get('output', 0)} old videos")
+
+        # Released uploads and streams are only ever deleted by the janitor
+        manager.start_janitor()
+
+        # Set last: other threads treat a storage manager as a finished setup
+        storage = manager
+
+
+@app.before_request
+def ensure_initialized():
+    """Requests may arrive before serve.py or __main__ called init_app() (other WSGI servers)"""
+    init_app()
+
+
+def uncatalog_evicted_video(path: str, kind: str):
+    """Keep the catalog in sync with the storage janitor"""
+    if kind == 'output':
+        catalog.remove(os.path.basename(path))
+
+
+# Streaming render jobs (job_id -> status dict), rendered in background threads;
+# an entry lives as long as its stream directory
+stream_jobs = {}
+stream_jobs_lock = threading.Lock()
+
+
+def forget_evicted_stream(path: str, kind: str):
+    """Drop the status of a streaming job once the janitor deleted its stream"""
+    if Path(path).parent == STREAM_FOLDER.resolve():
+        with stream_jobs_lock:
+            stream_jobs.pop(Path(path).name, None)
+
+
+# Progress events of render jobs, served by /api/jobs/<id>/events
+progress = ProgressBroker(max_subscribers=MAX_EVENT_SUBSCRIBERS)
+
+# Metrics served at /api/metrics (see metrics.py)
+JOBS_SUBMITTED = REGISTRY.counter('video_jobs_submitted_total', "Render requests received")
+JOBS_REJECTED = REGISTRY.counter('video_jobs_rejected_total',
+                                 "Render requests turned away by admission control")
+JOBS_COMPLETED = REGISTRY.counter('video_jobs_completed_total', "Renders that produced a video")
+JOBS_FAILED = REGISTRY.counter('video_jobs_failed_total', "Renders that failed (uploads or FFmpeg)")
+JOBS_RUNNING = REGISTRY.gauge('video_jobs_running', "Renders holding a render slot")
+JOBS_QUEUED = REGISTRY.gauge('video_jobs_queued', "Admitted renders waiting for a render slot")
+RENDER_SLOTS = REGISTRY.gauge('video_render_slots', "Renders allowed to run at once")
+RENDER_BACKLOG = REGISTRY.gauge('video_render_backlog_seconds',
+                                "Estimated seconds to drain running and queued renders")
+STAGE_SECONDS = REGISTRY.histogram('video_stage_duration_seconds',
+                                   "Duration of render job stages", ['stage'])
+ENCODE_SPEED = REGISTRY.histogram('video_encode_speed_ratio',
+                                  "Seconds of video rendered per second of render time",
+                                  buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8))
+UPLOAD_BYTES = REGISTRY.counter('video_upload_bytes_total', "Decoded bytes of uploaded scene files",
+                                ['kind'])
+DISK_FREE = REGISTRY.gauge('video_disk_free_bytes', "Free bytes of the volume", ['volume'])
+STORAGE_BYTES = REGISTRY.gauge('video_storage_bytes', "Bytes of tracked files", ['kind'])
+EVENT_SUBSCRIBERS = REGISTRY.gauge('video_event_subscribers', "Open job event streams")
+RENDER_CPU = REGISTRY.counter('video_render_cpu_seconds_total',
+                              "FFmpeg CPU time of finished renders (from -benchmark)")
+
+
+def collect_metrics():
+    """Refresh the gauges read at scrape time (queue depth, disk)"""
+    if storage is None:
+        return
+    status = admission.status()
+    JOBS_RUNNING.set(status['running'])
+    JOBS_QUEUED.set(status['queued'])
+    RENDER_SLOTS.set(status['max_concurrent'])
+    RENDER_BACKLOG.set(status['backlog_seconds'])
+    for volume, path in (('uploads', UPLOAD_FOLDER), ('outputs', OUTPUT_FOLDER),
+                         ('render_temp', tempfile.gettempdir())):
+        DISK_FREE.set(shutil.disk_usage(path).free, volume=volume)
+    for kind in ('upload', 'output'):
+        STORAGE_BYTES.set(storage.usage(kind), kind=kind)
+    EVENT_SUBSCRIBERS.set(progress.subscribers + (event_server.subscribers if event_server else 0))
+
+
+REGISTRY.add_collector(collect_metrics)
+register_process_metrics()
 
 
 def save_base64_file(base64_data: str, file_extension: str) -> str:
@@ -36,30 +211,63 @@ def save_base64_file(base64_data: str, file_extension: str) -> str:
         file_extension: File extension (.jpg, .wav, etc.)
 
     Returns:
-        Path to saved file
+        Path to saved file (registered with the storage manager and
+        referenced until release_temp_files() is called)
     """
-    # Remove data URI prefix if present
-    if ',' in base64_data and base64_data.startswith('data:'):
-        base64_data = base64_data.split(',')[1]
+    with span('decode', kind=file_extension) as decode_span:
+        # Remove data URI prefix if present
+        if ',' in base64_data and base64_data.startswith('data:'):
+            base64_data = base64_data.split(',')[1]
 
-    # Decode base64
-    file_data = base64.b64decode(base64_data)
+        # Decode base64
+        file_data = base64.b64decode(base64_data)
+        decode_span.set(bytes=len(file_data))
+        UPLOAD_BYTES.inc(len(file_data), kind=file_extension.lstrip('.'))
 
     # Generate unique filename
     filename = f"{uuid.uuid4()}{file_extension}"
     file_path = UPLOAD_FOLDER / filename
 
     # Save file
-    with open(file_path, 'wb') as f:
-        f.write(file_data)
+    with span('write', kind=file_extension):
+        with open(file_path, 'wb') as f:
+            f.write(file_data)
 
     # If it's an audio file, validate and re-encode it
     if file_extension in ['.wav', '.mp3', '.m4a']:
-        file_path = validate_and_fix_audio(str(file_path))
+        with span('audio_check'):
+            file_path = validate_and_fix_audio(str(file_path))
 
+    storage.register(str(file_path), 'upload', acquire=True)
     return str(file_path)
 
 
+def estimate_audio_seconds(base64_data: str) -> float:
+    """
+    Estimate the duration of a base64 encoded WAV without decoding all of it
+
+    Args:
+        base64_data: Base64 encoded audio (with or without data URI prefix)
+
+    Returns:
+        Estimated duration in seconds
+    """
+    start = base64_data.index(',') + 1 if base64_data.startswith('data:') and ',' in base64_data else 0
+    size = (len(base64_data) - start) * 3 // 4
+
+    try:
+        header = base64.b64decode(base64_data[start:start + 64])
+        if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+            byte_rate = int.from_bytes(header[28:32], 'little')
+            if byte_rate > 0:
+                return max(0.0, (size - 44) / byte_rate)
+    except Exception:
+        pass
+
+    # Raw PCM from Gemini TTS: 24 kHz, mono, 16-bit
+    return size / 48000
+
+
 def validate_and_fix_audio(audio_path: str) -> str:
     """
     Validate audio file and re-encode if necessary to ensure FFmpeg compatibility
@@ -148,10 +356,166 @@ def validate_and_fix_audio(audio_path: str) -> str:
         return audio_path  # Return original even if re-encoding failed
 
 
+def release_temp_files(temp_files: list):
+    """Release uploaded scene files; the storage janitor deletes them later"""
+    for temp_file in temp_files:
+        storage.release(temp_file)
+
+
+def admission_rejected_response(error: AdmissionRejected):
+    """429 response with a Retry-After header"""
+    response = jsonify({"error": str(error), "retryAfter": error.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def run_admitted_render(ticket: int, scenes: list, render_options: dict,
+                        job_id: str, **kwargs) -> str:
+    """
+    Wait for a render slot, render, record the job's metrics and free the slot
+
+    Stage, progress and result events go to the job's progress feed. The
+    render runs in render_pool when serve.py set one up, otherwise in this
+    thread.
+
+    Args:
+        ticket: Admission ticket from admission.enqueue()
+        scenes: Processed scenes (local image/audio paths)
+        render_options: Keyword arguments for VideoGenerator.generate_video
+        job_id: Job ID (progress feed and render context)
+        **kwargs: Extra keyword arguments for VideoGenerator.generate_video
+
+    Returns:
+        Path to the generated video
+    """
+    try:
+        wait_start = time.time()
+        progress.publish(job_id, 'stage', {'stage': 'queued', 'scenes': len(scenes)})
+        with span('admission_wait', job_id=job_id):
+            try:
+                admission.wait_for_slot(ticket, timeout=RENDER_QUEUE_TIMEOUT)
+            except AdmissionRejected as e:
+                JOBS_REJECTED.inc()
+                progress.publish(job_id, 'failed', {'error': str(e), 'retryAfter': e.retry_after})
+                raise
+        render_start = time.time()
+        STAGE_SECONDS.observe(render_start - wait_start, stage='admission_wait')
+        try:
+            if render_pool is not None:
+                result = render_pool.render(job_id, scenes, render_options, **kwargs)
+            else:
+                result = render_job(video_generator, job_id, scenes, render_options,
+                                    progress.get(job_id), **kwargs)
+        except Exception as e:
+            JOBS_FAILED.inc()
+            progress.publish(job_id, 'failed', {'error': str(e)})
+            raise
+        render_seconds = time.time() - render_start
+        output_path = result['output_path']
+        progress.publish(job_id, 'completed', {
+            'videoUrl': f"/api/download/{os.path.basename(output_path)}",
+            'filename': os.path.basename(output_path),
+            'renderSeconds': round(render_seconds, 1),
+        })
+
+        JOBS_COMPLETED.inc()
+        RENDER_CPU.inc(result['cpu_seconds'])
+        STAGE_SECONDS.observe(render_seconds, stage='render')
+        for stage, seconds in result['stage_timings'].items():
+            STAGE_SECONDS.observe(seconds, stage=stage)
+        scene_durations = list(result['audio_durations'].values())
+        if render_seconds > 0:
+            ENCODE_SPEED.observe(sum(scene_durations) / render_seconds)
+
+        # Feed the measured cost back into the model's calibration data
+        width, height = video_generator.get_dimensions(render_options['aspect_ratio'])
+        measured = admission.estimate(scene_durations, width, height, render_options['fps'])
+        admission.record(measured, result['cpu_seconds'], result['temp_bytes'], render_seconds)
+        return output_path
+
+    finally:
+        admission.release(ticket)
+
+
+def run_streaming_render(job_id: str, ticket: int, scenes: list, temp_files: list,
+                         render_options: dict, stream_dir: str):
+    """
+    Render a video in a background thread while writing an HLS playlist
+
+    Args:
+        job_id: Streaming job ID
+        ticket: Admission ticket from admission.enqueue()
+        scenes: Processed scenes (local image/audio paths)
+        temp_files: Uploaded files to remove after the render
+        render_options: Keyword arguments for VideoGenerator.generate_video
+        stream_dir: Directory for the HLS playlist and segments
+    """
+    try:
+        output_path = run_admitted_render(
+            ticket, scenes, render_options, job_id,
+            streaming_output='hls',
+            stream_dir=stream_dir
+        )
+        storage.register(output_path, 'output')
+        with stream_jobs_lock:
+            stream_jobs[job_id]["status"] = "completed"
+
+    except Exception as e:
+        print(f"❌ Error in streaming render {job_id}: {str(e)}")
+        print(traceback.format_exc())
+        with stream_jobs_lock:
+            stream_jobs[job_id]["status"] = "failed"
+            stream_jobs[job_id]["error"] = str(e)
+
+    finally:
+        release_temp_files(temp_files)
+        # The janitor may now evict the stream (and with it the job's status)
+        storage.register(stream_dir, 'output')
+        storage.release(stream_dir)
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
-    return jsonify({"status": "healthy", "message": "Video generation API is running"})
+    """
+    Readiness check
+
+    Healthy (200) while FFmpeg is installed, the output volume keeps
+    MIN_FREE_GB free and a render slot or queue place is open; otherwise 503
+    with the failing checks, so load balancers route renders elsewhere.
+    """
+    status = admission.status()
+    free_gb = shutil.disk_usage(OUTPUT_FOLDER).free / (1024**3)
+    checks = {
+        "ffmpeg": ffmpeg_version() is not None,
+        "disk": free_gb >= MIN_FREE_GB,
+        "workers": (status['running'] < status['max_concurrent']
+                    or status['queued'] < admission.max_queue),
+    }
+    ready = all(checks.values())
+    failing = [name for name, ok in checks.items() if not ok]
+    return jsonify({
+        "status": "healthy" if ready else "unavailable",
+        "message": ("Video generation API is running" if ready
+                    else f"Not ready: {', '.join(failing)}"),
+        "checks": checks,
+        "freeDiskGb": round(free_gb, 2),
+        "renders": {
+            "running": status['running'],
+            "queued": status['queued'],
+            "maxConcurrent": status['max_concurrent'],
+            "maxQueued": admission.max_queue,
+            "backlogSeconds": round(status['backlog_seconds'], 1),
+            "workerRestarts": render_pool.restarts if render_pool is not None else 0,
+            "workerRecycles": render_pool.recycles if render_pool is not None else 0
+        }
+    }), 200 if ready else 503
+
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return app.response_class(REGISTRY.render(), content_type=CONTENT_TYPE)
 
 
 @app.route('/api/generate-video', methods=['POST'])
@@ -174,12 +538,25 @@ def generate_video():
         "transitionDuration": 0.5,
         "fps": 30,
         "filename": "my_video.mp4",
-        "enableCaptions": true
+        "enableCaptions": true,
+        "streaming": false,
+        "jobId": "optional client-chosen id (8-64 letters, digits, - or _)"
     }
 
+    With "streaming": true the render runs in the background and the response
+    (202) carries a playlistUrl for an HLS playlist that grows during the render.
+
+    Progress is pushed as server-sent events on /api/jobs/<jobId>/events;
+    clients that pass their own jobId can subscribe before this request returns.
+
+    When the node is saturated the request is rejected with 429 and a
+    Retry-After header; otherwise it waits in the render queue.
+
     Returns:
         JSON with video URL or error message
     """
+    job_id = None
+    rendering = False
     try:
         data = request.json
         scenes_data = data.get('scenes', [])
@@ -188,81 +565,130 @@ def generate_video():
         fps = data.get('fps', 30)
         filename = data.get('filename', f'video_{uuid.uuid4()}.mp4')
         enable_captions = data.get('enableCaptions', True)  # Default to True for backward compatibility
+        streaming = data.get('streaming', False)
+        job_id = data.get('jobId') or uuid.uuid4().hex
 
         if not scenes_data:
             return jsonify({"error": "No scenes provided"}), 400
+        if not JOB_ID_PATTERN.match(job_id):
+            return jsonify({"error": "Invalid jobId"}), 400
+        try:
+            progress.create(job_id)
+        except ValueError:
+            return jsonify({"error": f"Job {job_id} already exists"}), 409
+        JOBS_SUBMITTED.inc()
 
         print(f"📥 Received request to generate video with {len(scenes_data)} scenes")
         print(f"   Captions enabled: {enable_captions}")
 
+        # Admission control before any upload is decoded or written
+        width, height = video_generator.get_dimensions(aspect_ratio)
+        cost = admission.estimate(
+            [estimate_audio_seconds(scene.get('audioUrl', '')) for scene in scenes_data],
+            width, height, fps
+        )
+        try:
+            ticket = admission.enqueue(cost)
+        except AdmissionRejected as e:
+            print(f"⏳ Render rejected: {e} (retry after {e.retry_after}s)")
+            JOBS_REJECTED.inc()
+            progress.publish(job_id, 'failed', {'error': str(e), 'retryAfter': e.retry_after})
+            return admission_rejected_response(e)
+        print(f"   Estimated cost: {cost.cpu_seconds:.0f} CPU-s, {cost.temp_bytes / (1024**2):.0f} MB disk")
+
         # Process each scene and save files
         processed_scenes = []
         temp_files = []  # Track temp files for cleanup
 
-        for i, scene in enumerate(scenes_data):
-            print(f"💾 Processing scene {i+1}/{len(scenes_data)}...")
-
-            # Determine image extension from mime type
-            mime_type = scene.get('imageMimeType', 'image/jpeg')
-            img_ext = '.jpg' if 'jpeg' in mime_type else '.png'
-
-            # Save image
-            image_path = save_base64_file(scene['imageUrl'], img_ext)
-            temp_files.append(image_path)
-
-            # Save audio (assuming WAV format, adjust if needed)
-            audio_path = save_base64_file(scene['audioUrl'], '.wav')
-            temp_files.append(audio_path)
-
-            processed_scenes.append({
-                'image_path': image_path,
-                'audio_path': audio_path,
-                'caption': scene.get('caption', ''),
-                'voice_over': scene.get('voiceOver', '')
-            })
+        upload_start = time.time()
+        progress.publish(job_id, 'stage', {'stage': 'uploading', 'scenes': len(scenes_data)})
+        try:
+            for i, scene in enumerate(scenes_data):
+                print(f"💾 Processing scene {i+1}/{len(scenes_data)}...")
+
+                # Determine image extension from mime type
+                mime_type = scene.get('imageMimeType', 'image/jpeg')
+                img_ext = '.jpg' if 'jpeg' in mime_type else '.png'
+
+                with span('upload', job_id=job_id, scene=i):
+                    # Save image
+                    image_path = save_base64_file(scene['imageUrl'], img_ext)
+                    temp_files.append(image_path)
+
+                    # Save audio (assuming WAV format, adjust if needed)
+                    audio_path = save_base64_file(scene['audioUrl'], '.wav')
+                    temp_files.append(audio_path)
+
+                processed_scenes.append({
+                    'image_path': image_path,
+                    'audio_path': audio_path,
+                    'caption': scene.get('caption', ''),
+                    'voice_over': scene.get('voiceOver', '')
+                })
+        except Exception:
+            JOBS_FAILED.inc()
+            release_temp_files(temp_files)
+            admission.release(ticket)
+            raise
+        STAGE_SECONDS.observe(time.time() - upload_start, stage='upload')
+
+        render_options = {
+            'output_filename': filename,
+            'aspect_ratio': aspect_ratio,
+            'transition_duration': transition_duration,
+            'fps': fps,
+            'enable_captions': enable_captions
+        }
+
+        if streaming:
+            # Render in the background and hand out the growing HLS playlist
+            stream_dir = STREAM_FOLDER / job_id
+            stream_dir.mkdir(parents=True, exist_ok=True)
+            # Referenced until the render ends, so the janitor leaves the growing stream alone
+            storage.register(str(stream_dir), 'output', acquire=True)
+            with stream_jobs_lock:
+                stream_jobs[job_id] = {
+                    "status": "running",
+                    "filename": filename,
+                    "error": None
+                }
+
+            thread = threading.Thread(
+                target=run_streaming_render,
+                args=(job_id, ticket, processed_scenes, temp_files, render_options, str(stream_dir)),
+                daemon=True
+            )
+            thread.start()
+
+            return jsonify({
+                "success": True,
+                "jobId": job_id,
+                "playlistUrl": f"/api/stream/{job_id}/{HLS_PLAYLIST_NAME}",
+                "statusUrl": f"/api/jobs/{job_id}",
+                "eventsUrl": f"/api/jobs/{job_id}/events",
+                "videoUrl": f"/api/download/{filename}",
+                "filename": filename,
+                "message": "Video generation started"
+            }), 202
 
         # Generate video
         print("🎬 Starting video generation with FFmpeg...")
-        output_path = video_generator.generate_video(
-            scenes=processed_scenes,
-            output_filename=filename,
-            aspect_ratio=aspect_ratio,
-            transition_duration=transition_duration,
-            fps=fps,
-            enable_captions=enable_captions
-        )
+        rendering = True
+        try:
+            output_path = run_admitted_render(ticket, processed_scenes, render_options, job_id)
+        except AdmissionRejected as e:
+            print(f"⏳ Render rejected: {e} (retry after {e.retry_after}s)")
+            return admission_rejected_response(e)
+        finally:
+            release_temp_files(temp_files)
 
-        # Cleanup temp files
-        print("🧹 Cleaning up temporary files...")
-        for temp_file in temp_files:
-            try:
-                os.remove(temp_file)
-            except:
-                pass
-
-        # Auto-cleanup old generated videos (older than 1 hour to prevent disk full)
-        print("🧹 Auto-cleaning old generated videos...")
-        import time
-        current_time = time.time()
-        cleaned_count = 0
-        for old_file in OUTPUT_FOLDER.glob('*.mp4'):
-            try:
-                file_age = current_time - os.path.getmtime(old_file)
-                # Keep only the current video and recent ones (1 hour)
-                if file_age > 3600 and str(old_file) != str(output_path):  # 1 hour
-                    os.remove(old_file)
-                    cleaned_count += 1
-            except Exception as e:
-                print(f"⚠️  Could not remove {old_file}: {e}")
-                pass
-
-        if cleaned_count > 0:
-            print(f"✅ Removed {cleaned_count} old video(s) to free up space")
+        storage.register(output_path, 'output')
 
         # Return video URL
         video_url = f"/api/download/{os.path.basename(output_path)}"
         return jsonify({
             "success": True,
+            "jobId": job_id,
             "videoUrl": video_url,
             "filename": os.path.basename(output_path),
             "message": "Video generated successfully"
@@ -271,6 +697,9 @@ def generate_video():
     except Exception as e:
         print(f"❌ Error generating video: {str(e)}")
         print(traceback.format_exc())
+        # run_admitted_render publishes the outcome of the render itself
+        if job_id is not None and not rendering:
+            progress.publish(job_id, 'failed', {'error': str(e)})
         return jsonify({
             "error": str(e),
             "details": traceback.format_exc()
@@ -282,17 +711,22 @@ def download_video(filename):
     """
     Download generated video file
 
+    Only catalogued videos are served: the output folder also holds the
+    catalog database, storage index and render metrics.
+
     Args:
         filename: Name of the video file to download
     """
     try:
         file_path = OUTPUT_FOLDER / filename
 
-        if not file_path.exists():
+        if not filename.endswith('.mp4') or catalog.get(filename) is None or not file_path.exists():
             return jsonify({"error": "File not found"}), 404
 
+        storage.touch(str(file_path))
         return send_file(
-            file_path,
+            # Absolute: Flask resolves relative paths against the app's root, not the working directory
+            file_path.resolve(),
             mimetype='video/mp4',
             as_attachment=True,
             download_name=filename
@@ -303,63 +737,185 @@ def download_video(filename):
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/api/cleanup', methods=['POST'])
-def cleanup_files():
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    Get the status of a streaming render job
+
+    Args:
+        job_id: ID returned by /api/generate-video with "streaming": true
+    """
+    with stream_jobs_lock:
+        job = stream_jobs.get(job_id)
+        job = dict(job) if job else None
+
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    job["jobId"] = job_id
+    job["playlistUrl"] = f"/api/stream/{job_id}/{HLS_PLAYLIST_NAME}"
+    if job["status"] == "completed":
+        job["videoUrl"] = f"/api/download/{job['filename']}"
+    return jsonify(job)
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
     """
-    Cleanup old temporary and output files
+    Server-sent events of a render job
+
+    Events: "stage" (uploading, queued, scene N, assembly), "progress"
+    (overall fraction, current stage fraction, ETA; at most twice a
+    second) and a final "completed" (videoUrl) or "failed" (error). A
+    reconnecting EventSource resumes after its Last-Event-ID. Under
+    serve.py the request is redirected to the event server. The stream of
+    a job whose render request has not arrived yet ends at once, and
+    EventSource reconnects by itself.
+
+    Args:
+        job_id: ID returned by (or passed to) /api/generate-video
+    """
+    if not JOB_ID_PATTERN.match(job_id):
+        return jsonify({"error": "Job not found"}), 404
+    if event_server is not None:
+        # Served by the event server, where an idle stream holds no thread
+        if EVENTS_BASE_URL:
+            base_url = EVENTS_BASE_URL.rstrip('/')
+        else:
+            hostname = urlsplit(request.host_url).hostname
+            if ':' in hostname:
+                hostname = f"[{hostname}]"
+            base_url = f"{request.scheme}://{hostname}:{event_server.port}"
+        return redirect(f"{base_url}/api/jobs/{job_id}/events", code=307)
+
+    event_headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    feed = progress.get(job_id)
+    if feed is None:
+        # The render request has not arrived (yet): the client reconnects shortly
+        return Response(unknown_job_events(), mimetype='text/event-stream', headers=event_headers)
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+    stream = progress.open_stream(feed, last_event_id)
+    if stream is None:
+        response = jsonify({"error": "Too many open event streams, retry later",
+                            "retryAfter": EVENT_STREAMS_RETRY_AFTER})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(EVENT_STREAMS_RETRY_AFTER)
+        return response
+    return Response(stream, mimetype='text/event-stream', headers=event_headers)
+
+
+@app.route('/api/stream/<job_id>/<path:filename>', methods=['GET'])
+def stream_video(job_id, filename):
+    """
+    Serve the HLS playlist and segments of a streaming render
+
+    The playlist is an EVENT playlist: players reload it and pick up the
+    segments of each scene as it is encoded, until #EXT-X-ENDLIST is
+    appended with the last scene.
+
+    Args:
+        job_id: Streaming job ID
+        filename: Playlist, init segment or media segment name
+    """
+    stream_dir = STREAM_FOLDER / job_id
+
+    if filename == HLS_PLAYLIST_NAME:
+        if not (stream_dir / filename).exists():
+            with stream_jobs_lock:
+                job = stream_jobs.get(job_id)
+            if not job or job["status"] != "running":
+                return jsonify({"error": "Playlist not found"}), 404
+
+            # Scenes are still encoding: hand out an empty playlist to poll
+            empty_playlist = (
+                "#EXTM3U\n"
+                "#EXT-X-VERSION:7\n"
+                f"#EXT-X-TARGETDURATION:{HLS_SEGMENT_SECONDS}\n"
+                "#EXT-X-PLAYLIST-TYPE:EVENT\n"
+            )
+            response = app.response_class(empty_playlist, mimetype='application/vnd.apple.mpegurl')
+        else:
+            response = send_from_directory(stream_dir, filename,
+                                           mimetype='application/vnd.apple.mpegurl')
+        # The playlist grows during the render, never let it be cached
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    if not stream_dir.exists():
+        return jsonify({"error": "Stream not found"}), 404
+
+    return send_from_directory(stream_dir, filename, mimetype='video/mp4')
+
+
+@app.route('/api/videos', methods=['GET'])
+def list_videos():
+    """
+    List generated videos from the catalog, newest first
+
+    Query parameters:
+        page: 1-based page number (default: 1)
+        pageSize: Videos per page (default: 20, max: 100)
     """
     try:
-        # Cleanup temp uploads
-        for file in UPLOAD_FOLDER.glob('*'):
-            try:
-                os.remove(file)
-            except:
-                pass
-
-        # Optionally cleanup old generated videos (older than 24 hours)
-        import time
-        current_time = time.time()
-        for file in OUTPUT_FOLDER.glob('*.mp4'):
-            try:
-                file_age = current_time - os.path.getmtime(file)
-                if file_age > 86400:  # 24 hours in seconds
-                    os.remove(file)
-            except:
-                pass
+        page = max(1, request.args.get('page', 1, type=int))
+        page_size = min(100, max(1, request.args.get('pageSize', 20, type=int)))
+
+        videos = []
+        for video in catalog.list(page=page, page_size=page_size):
+            videos.append({
+                "filename": video['filename'],
+                "videoUrl": f"/api/download/{video['filename']}",
+                "topic": video['topic'],
+                "createdAt": video['created_at'],
+                "sizeBytes": video['size_bytes'],
+                "duration": video['duration'],
+                "videoCodec": video['video_codec'],
+                "width": video['width'],
+                "height": video['height'],
+                "sceneCount": video['scene_count'],
+                "aspectRatio": video['aspect_ratio'],
+                "renderSeconds": video['render_seconds'],
+                "stageTimings": video['stage_timings']
+            })
 
-        return jsonify({"success": True, "message": "Cleanup completed"})
+        return jsonify({
+            "videos": videos,
+            "page": page,
+            "pageSize": page_size,
+            "total": catalog.count()
+        })
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-def startup_cleanup():
-    """Clean up old files on server startup to prevent disk space issues"""
-    import time
-    print("\n🧹 Performing startup cleanup...")
+@app.route('/api/cleanup', methods=['POST'])
+def cleanup_files():
+    """
+    Run a storage janitor pass now
 
-    # Clean all temp uploads
-    temp_count = 0
-    for file in UPLOAD_FOLDER.glob('*'):
-        try:
-            os.remove(file)
-            temp_count += 1
-        except:
-            pass
+    Evicts released uploads, outputs idle longer than OUTPUT_MAX_AGE and least
+    recently used outputs beyond OUTPUT_QUOTA_GB. Files still referenced by an
+    in-flight job are never removed.
+    """
+    try:
+        evicted = storage.collect()
+        return jsonify({"success": True, "message": "Cleanup completed", "evicted": evicted})
 
-    # Clean old generated videos (older than 1 hour)
-    current_time = time.time()
-    video_count = 0
-    for file in OUTPUT_FOLDER.glob('*.mp4'):
-        try:
-            file_age = current_time - os.path.getmtime(file)
-            if file_age > 3600:  # 1 hour
-                os.remove(file)
-                video_count += 1
-        except:
-            pass
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def startup_cleanup():
+    """Set up the app (cleanup and storage janitor included) and index the fonts up front"""
+    init_app()
 
-    print(f"✅ Startup cleanup: Removed {temp_count} temp files and {video_count} old videos")
+    fonts = font_index()
+    missing = [script for script in SCRIPT_SAMPLES if fonts.font_for_script(script) is None]
+    print(f"🔤 Indexed {len(fonts)} font(s)"
+          + (f"; no font for {', '.join(missing)}" if missing else ""))
 
 
 if __name__ == '__main__':
@@ -371,8 +927,13 @@ if __name__ == '__main__':
     Available endpoints:
     - POST /api/generate-video  : Generate video from scenes
     - GET  /api/download/<file> : Download generated video
+    - GET  /api/videos          : List generated videos (paginated)
+    - GET  /api/jobs/<id>       : Streaming render job status
+    - GET  /api/jobs/<id>/events: Render progress (server-sent events)
+    - GET  /api/stream/<id>/... : HLS playlist of a streaming render
     - POST /api/cleanup         : Cleanup old files
-    - GET  /api/health          : Health check
+    - GET  /api/health          : Readiness check
+    - GET  /api/metrics         : Prometheus metrics
 
     Make sure FFmpeg is installed!
     """)
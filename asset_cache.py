@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Asset Cache
+Disk-backed cache of generated images and speech, keyed by everything that
+determines the provider's output, so repeated prompts skip the network
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class AssetCache:
+    def __init__(self, cache_dir: str, max_bytes: int = 1024**3, enabled: bool = True):
+        """
+        Open (and create if needed) the cache directory
+
+        Args:
+            cache_dir: Directory holding cached assets
+            max_bytes: Total size of cached assets; least recently used
+                       entries are evicted beyond it
+            enabled: When False, get() always misses and put() stores nothing
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        self._entries: Dict[str, list] = {}  # filename -> [size, last_access]
+        self._total_bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def _load(self):
+        """Index the entries already on disk (the only directory scan)"""
+        for path in self.cache_dir.iterdir():
+            if not path.is_file() or path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            self._entries[path.name] = [stat.st_size, stat.st_mtime]
+            self._total_bytes += stat.st_size
+
+    @staticmethod
+    def make_key(kind: str, *parts) -> str:
+        """
+        Build a cache key from the inputs that determine an asset
+
+        Args:
+            kind: Asset kind ("image", "speech")
+            *parts: Key fields, e.g. (model, prompt, style, aspect_ratio)
+
+        Returns:
+            Key of the form "<kind>-<sha256 of the fields>"
+        """
+        digest = hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+        return f"{kind}-{digest}"
+
+    def _count(self, kind: str, outcome: str):
+        """Update the hit/miss counters (caller holds the lock)"""
+        stats = self._stats.setdefault(kind, {'hits': 0, 'misses': 0})
+        stats[outcome] += 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read a cached asset
+
+        Returns:
+            Asset bytes, or None on a miss (or when the cache is disabled)
+        """
+        if not self.enabled:
+            return None
+
+        kind = key.split('-', 1)[0]
+        path = self.cache_dir / key
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._count(kind, 'misses')
+            return None
+
+        now = time.time()
+        victims = []
+        with self._lock:
+            self._count(kind, 'hits')
+            entry = self._entries.get(key)
+            if entry is None:
+                # Written by another process since the index was built
+                self._entries[key] = [len(data), now]
+                self._total_bytes += len(data)
+                victims = self._select_evictions()
+            else:
+                entry[1] = now
+        try:
+            # The file's mtime carries the LRU order across restarts
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        self._remove(victims)
+        return data
+
+    def put(self, key: str, data: bytes):
+        """Store an asset and evict least recently used entries beyond max_bytes"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+
+        path = self.cache_dir / key
+        tmp_path = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not cache asset {key}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous:
+                self._total_bytes -= previous[0]
+            self._entries[key] = [len(data), time.time()]
+            self._total_bytes += len(data)
+            victims = self._select_evictions()
+        self._remove(victims)
+
+    def _remove(self, victims: list):
+        """Delete the files of evicted entries"""
+        for victim in victims:
+            try:
+                os.remove(self.cache_dir / victim)
+            except OSError:
+                pass
+
+    def _select_evictions(self) -> list:
+        """Drop least recently used entries until under max_bytes (caller holds the lock)"""
+        victims = []
+        if self._total_bytes <= self.max_bytes:
+            return victims
+        for name, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            victims.append(name)
+            self._total_bytes -= size
+        for name in victims:
+            del self._entries[name]
+        return victims
+
+    def size(self) -> int:
+        """Total bytes of cached assets"""
+        with self._lock:
+            return self._total_bytes
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hits and misses per asset kind since startup"""
+        with self._lock:
+            return {kind: dict(counts) for kind, counts in self._stats.items()}
+
+
+def format_hit_rate(hits: int, total: int) -> str:
+    """Format a hit count as '3/7 (43%)'"""
+    if total == 0:
+        return "0/0"
+    return f"{hits}/{total} ({hits / total:.0%})"
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Scene Asset Pipeline
+Generates scene images and voice-overs concurrently, with a separate
+concurrency limit per provider
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tracing import span
+
+
+# Concurrent requests allowed per provider (override with IMAGE_CONCURRENCY / SPEECH_CONCURRENCY)
+DEFAULT_PROVIDER_CONCURRENCY = {
+    'image': 4,
+    'speech': 4,
+}
+
+
+def get_provider_limits() -> Dict[str, int]:
+    """Per-provider concurrency limits, from the environment or defaults"""
+    return {
+        kind: max(1, int(os.getenv(f"{kind.upper()}_CONCURRENCY", default)))
+        for kind, default in DEFAULT_PROVIDER_CONCURRENCY.items()
+    }
+
+
+async def generate_scene_assets(scenes: List[Dict],
+                                make_image: Callable[[int, Dict], Awaitable[str]],
+                                make_speech: Callable[[int, Dict], Awaitable[str]],
+                                limits: Optional[Dict[str, int]] = None,
+                                on_scene_ready: Optional[Callable[[int, Dict], None]] = None,
+                                scene_retries: int = 0) -> List[Dict]:
+    """
+    Generate the image and voice-over of every scene concurrently
+
+    Image and speech requests of all scenes are fanned out at once; each
+    provider's semaphore caps how many of its requests are in flight. If a
+    scene fails or the job is cancelled, every asset saved so far is deleted.
+
+    Args:
+        scenes: Storyboard scenes (caption, voiceOver, imagePrompt)
+        make_image: Coroutine function (index, scene) -> saved image path
+        make_speech: Coroutine function (index, scene) -> saved audio path
+        limits: Concurrency per provider ({"image": n, "speech": n})
+        on_scene_ready: Called as on_scene_ready(index, processed_scene)
+                        as soon as both assets of a scene are saved
+        scene_retries: Times a scene's failed assets are requested again
+                       (its completed asset is kept) before the job fails
+
+    Returns:
+        Processed scenes (image_path, audio_path, caption, voice_over)
+        in storyboard order
+    """
+    limits = limits or get_provider_limits()
+    semaphores = {kind: asyncio.Semaphore(limit) for kind, limit in limits.items()}
+    # Every saved asset, recorded as soon as it is written, for cleanup on failure
+    saved: List[str] = []
+
+    async def limited(kind: str, make_asset, index: int, scene: Dict) -> str:
+        async with semaphores[kind]:
+            with span(kind):
+                path = await make_asset(index, scene)
+        saved.append(path)
+        return path
+
+    makers = {'image': make_image, 'speech': make_speech}
+
+    async def build_scene(index: int, scene: Dict) -> Dict:
+        assets: Dict[str, str] = {}
+        for attempt in range(scene_retries + 1):
+            pending = [kind for kind in makers if kind not in assets]
+            with span('scene_assets', scene=index, attempt=attempt):
+                results = await asyncio.gather(
+                    *(limited(kind, makers[kind], index, scene) for kind in pending),
+                    return_exceptions=True
+                )
+            failed = []
+            for kind, result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    failed.append((kind, result))
+                else:
+                    assets[kind] = result
+            if not failed:
+                break
+            if attempt == scene_retries:
+                raise failed[0][1]
+            kinds = " and ".join(kind for kind, _ in failed)
+            print(f"   🔁 Scene {index+1}: retrying {kinds} ({failed[0][1]}), keeping completed assets...")
+
+        processed = {
+            'image_path': assets['image'],
+            'audio_path': assets['speech'],
+            'caption': scene['caption'],
+            'voice_over': scene['voiceOver']
+        }
+        if on_scene_ready:
+            on_scene_ready(index, processed)
+        return processed
+
+    tasks = [asyncio.ensure_future(build_scene(i, scene)) for i, scene in enumerate(scenes)]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        # One scene failed (or the job was cancelled): stop the rest, then
+        # delete everything already saved, which no scene will use any more
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for path in saved:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+
+
+async def generate_and_encode(scenes: List[Dict],
+                              make_image: Callable[[int, Dict], Awaitable[str]],
+                              make_speech: Callable[[int, Dict], Awaitable[str]],
+                              encode_scene: Callable[[int, Dict], Awaitable[str]],
+                              limits: Optional[Dict[str, int]] = None,
+                              on_scene_ready: Optional[Callable[[int, Dict], None]] = None,
+                              scene_retries: int = 0) -> Tuple[List[Dict], List[str]]:
+    """
+    Generate scene assets and encode each scene as soon as its assets arrive
+
+    Encoding overlaps with the remaining provider requests, so the job takes
+    roughly max(generation, encoding) instead of their sum. Scenes are
+    encoded one at a time in arrival order (one encoder per job, as the
+    admission cost model assumes). The encoder is busy only part of the
+    time, so callers whose render capacity is scarce (the MCP server's
+    admission slots) generate first and render afterwards instead.
+
+    Args:
+        scenes: Storyboard scenes (caption, voiceOver, imagePrompt)
+        make_image: Coroutine function (index, scene) -> saved image path
+        make_speech: Coroutine function (index, scene) -> saved audio path
+        encode_scene: Coroutine function (index, processed_scene) -> clip path
+        limits: Concurrency per provider ({"image": n, "speech": n})
+        on_scene_ready: Called as on_scene_ready(index, processed_scene)
+                        when a scene's assets are saved
+        scene_retries: Per-scene retries (see generate_scene_assets)
+
+    Returns:
+        Tuple of (processed scenes, scene clips), both in storyboard order
+    """
+    ready_queue: asyncio.Queue = asyncio.Queue()
+    clips: Dict[int, str] = {}
+
+    def scene_ready(index: int, processed: Dict):
+        if on_scene_ready:
+            on_scene_ready(index, processed)
+        ready_queue.put_nowait((index, processed))
+
+    async def encode_ready_scenes():
+        for _ in range(len(scenes)):
+            index, processed = await ready_queue.get()
+            clips[index] = await encode_scene(index, processed)
+
+    generation = asyncio.ensure_future(
+        generate_scene_assets(scenes, make_image, make_speech, limits, scene_ready, scene_retries)
+    )
+    encoding = asyncio.ensure_future(encode_ready_scenes())
+    try:
+        # Fail fast: a failed encode stops generation and vice versa
+        done, _ = await asyncio.wait({generation, encoding}, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+        processed_scenes = await generation
+        await encoding
+    finally:
+        for task in (generation, encoding):
+            task.cancel()
+        await asyncio.gather(generation, encoding, return_exceptions=True)
+
+    return processed_scenes, [clips[i] for i in range(len(scenes))]
+
+
+async def _fake_asset(scene: Dict, latency: float) -> str:
+    """Stand-in provider call: waits like a network round-trip"""
+    await asyncio.sleep(latency)
+    return f"/tmp/fake_{id(scene)}"
+
+
+async def _compare(num_scenes: int, latency: float):
+    """Time serial vs concurrent vs pipelined generation against the fake provider"""
+    scenes = [{'caption': f"Scene {i}", 'voiceOver': f"Scene {i}", 'imagePrompt': ''}
+              for i in range(num_scenes)]
+
+    async def make_asset(index, scene):
+        return await _fake_asset(scene, latency)
+
+    async def encode_scene(index, processed):
+        # Encoding is CPU work: pretend it takes as long as one provider call
+        await asyncio.sleep(latency)
+        return f"/tmp/fake_clip_{index}"
+
+    for label, limits in [("serial", {'image': 1, 'speech': 1}),
+                          ("concurrent", get_provider_limits()),
+                          ("pipelined", get_provider_limits())]:
+        start = time.perf_counter()
+        if label == "serial":
+            for i, scene in enumerate(scenes):
+                await make_asset(i, scene)
+                await make_asset(i, scene)
+            for i, scene in enumerate(scenes):
+                await encode_scene(i, scene)
+        elif label == "concurrent":
+            processed = await generate_scene_assets(scenes, make_asset, make_asset, limits)
+            for i, scene in enumerate(processed):
+                await encode_scene(i, scene)
+        else:
+            await generate_and_encode(scenes, make_asset, make_asset, encode_scene, limits)
+        print(f"   {label:>10}: {time.perf_counter() - start:.2f}s {limits}")
+
+
+if __name__ == "__main__":
+    import sys
+    num_scenes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    print(f"🧪 {num_scenes} scenes, {latency}s fake provider latency")
+    asyncio.run(_compare(num_scenes, latency))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Batch Video Generation
+Generates every video listed in a JSONL manifest, several at a time,
+sharing the provider rate limits, asset cache and render pool of the MCP
+server (without running the MCP server itself).
+
+Manifest (one job per line):
+    {"id": "space-1", "topic": "The History of Space Exploration", "duration": 1}
+    {"topic": "How Photosynthesis Works", "aspect_ratio": "9:16", "image_style": "Cartoon"}
+
+Usage:
+    python batch_generate.py topics.jsonl
+    python batch_generate.py topics.jsonl --results results.jsonl --parallel 3
+    python batch_generate.py topics.jsonl --compare-serial   # serial vs parallel throughput
+    VIDEO_PROVIDER=local python batch_generate.py topics.jsonl   # offline run
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from mcp_server import run_batch
+
+
+def print_result(record: dict):
+    """Print one finished job"""
+    icon = {'completed': '✅', 'cancelled': '🛑'}.get(record['status'], '❌')
+    detail = record.get('outputPath') if record['status'] == 'completed' else record.get('error')
+    seconds = f" in {record['wallSeconds']:.0f}s" if 'wallSeconds' in record else ""
+    print(f"{icon} Line {record['line']}: {record['topic']} → {detail}{seconds}")
+
+
+def throughput(summary: dict) -> float:
+    """Completed videos per hour of a batch run"""
+    completed = summary['counts'].get('completed', 0)
+    return completed * 3600 / summary['wallSeconds'] if summary['wallSeconds'] > 0 else 0.0
+
+
+def print_summary(summary: dict):
+    """Print the counts, wall time and throughput of a batch run"""
+    print("=" * 50)
+    print(f"📦 {summary['jobs']} job(s) in {summary['wallSeconds']:.0f}s, "
+          f"{summary['maxParallel']} at a time")
+    for status, count in sorted(summary['counts'].items()):
+        print(f"   - {status}: {count}")
+    if summary['counts'].get('completed'):
+        print(f"🚀 Throughput: {throughput(summary):.1f} videos/hour")
+    print(f"📄 Results: {summary['resultsPath']}")
+
+
+def compare_serial(args) -> int:
+    """Run the manifest serially, then in parallel, and compare throughput"""
+    # The asset cache is bypassed so the second run does not get the first one's assets for free
+    results = Path(args.results or Path(args.manifest).with_suffix('.results.jsonl'))
+    runs = {}
+
+    async def run_both():
+        # One event loop for both runs: the shared runtime is bound to it
+        for label, parallel in (('serial', 1), ('parallel', args.parallel)):
+            print(f"\n▶️  {label.capitalize()} run")
+            runs[label] = await run_batch(
+                args.manifest, str(results.with_suffix(f'.{label}.jsonl')), parallel,
+                on_job_done=print_result, use_cache=False
+            )
+            print_summary(runs[label])
+
+    asyncio.run(run_both())
+
+    serial, parallel = throughput(runs['serial']), throughput(runs['parallel'])
+    print("=" * 50)
+    print(f"⚖️  Serial: {serial:.1f} videos/hour, parallel ({runs['parallel']['maxParallel']} at a time): "
+          f"{parallel:.1f} videos/hour")
+    if serial:
+        print(f"   Speedup: {parallel / serial:.2f}x")
+    return 0 if all(run['counts'].get('completed', 0) == run['jobs'] for run in runs.values()) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the videos of a JSONL manifest")
+    parser.add_argument('manifest', help="JSONL manifest, one job per line")
+    parser.add_argument('--results', help="Results JSONL (default: <manifest>.results.jsonl)")
+    parser.add_argument('--parallel', type=int,
+                        help="Jobs in flight at once (default: render slots + 1; 1 = serial)")
+    parser.add_argument('--compare-serial', action='store_true',
+                        help="Run the batch serially and then in parallel, without the asset "
+                             "cache, and report both throughputs")
+    args = parser.parse_args()
+
+    print("🎬 AI Video Weaver - Batch Generation")
+    print("=" * 50)
+
+    if args.compare_serial:
+        return compare_serial(args)
+
+    summary = asyncio.run(run_batch(args.manifest, args.results, args.parallel,
+                                    on_job_done=print_result))
+    print_summary(summary)
+    return 0 if summary['counts'].get('completed', 0) == summary['jobs'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Benchmark History
+Stores render benchmark reports (see render_benchmark.py) as versioned JSON
+records with the machine fingerprint, FFmpeg version and git commit, and
+compares two records case by case to flag statistically significant
+regressions in stage time, CPU time, peak memory and output size.
+
+Usage:
+    python render_benchmark.py --repeat 5 --save      # add a record
+    python benchmark_history.py list
+    python benchmark_history.py compare                # two most recent records
+    python benchmark_history.py compare base.json new.json --alpha 0.01
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Bump when the record layout changes; load_record() rejects newer records
+RECORD_VERSION = 1
+HISTORY_DIR = Path(__file__).parent.resolve() / "benchmark_history"
+
+# Measurements compared between records (lower is better for all of them);
+# per-stage timings of full renders are compared as well
+COMPARED_METRICS = ('wallSeconds', 'cpuSeconds', 'peakRssKb', 'outputBytes')
+STAGE_METRIC_PREFIX = 'stage.'
+
+# Defaults of compare(): significance level and smallest change worth flagging
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_CHANGE = 0.05
+# Stages whose timings shift between processes more than the samples of one
+# run vary (the microsecond-scale text filter moves by up to ~20% with
+# interpreter memory layout), so smaller changes are never flagged
+STAGE_MIN_CHANGE = {'text': 0.25}
+
+
+def machine_fingerprint() -> Dict:
+    """Hardware and OS the benchmark ran on, with a short id for grouping records"""
+    processor = platform.processor()
+    if os.path.exists('/proc/cpuinfo'):
+        with open('/proc/cpuinfo', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    processor = line.split(':', 1)[1].strip()
+                    break
+    memory_gb = None
+    if hasattr(os, 'sysconf') and 'SC_PHYS_PAGES' in os.sysconf_names:
+        memory_gb = round(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 1024**3, 1)
+
+    machine = {
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': processor,
+        'cpuCount': os.cpu_count(),
+        'memoryGb': memory_gb,
+        'python': platform.python_version(),
+    }
+    machine['id'] = hashlib.sha256(json.dumps(machine, sort_keys=True).encode()).hexdigest()[:12]
+    return machine
+
+
+def git_commit() -> Optional[str]:
+    """Short commit hash of the working tree (with a + suffix if it has local changes)"""
+    try:
+        cwd = str(Path(__file__).parent)
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('+' if dirty else '')
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+
+def make_record(report: Dict, label: Optional[str] = None) -> Dict:
+    """Versioned history record of a render_benchmark report"""
+    return {
+        'version': RECORD_VERSION,
+        'label': label,
+        'createdAt': report.get('createdAt') or datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'machine': machine_fingerprint(),
+        'ffmpegVersion': report.get('ffmpegVersion'),
+        'settings': {key: report.get(key) for key in ('fps', 'repeat', 'captions')},
+        'cases': report['cases'],
+    }
+
+
+def save_record(record: Dict, history_dir: Optional[str] = None) -> str:
+    """Write a record to the history directory; returns its path"""
+    directory = Path(history_dir or HISTORY_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = record['createdAt'].replace(':', '').replace('-', '')
+    name = f"{stamp}_{(record.get('commit') or 'nogit').rstrip('+')}_{record['machine']['id']}.json"
+    path = directory / name
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2, ensure_ascii=False)
+    return str(path)
+
+
+def load_record(path: str) -> Dict:
+    """Read a record, refusing layouts this version does not know"""
+    with open(path, encoding='utf-8') as f:
+        record = json.load(f)
+    version = record.get('version')
+    if not isinstance(version, int) or version > RECORD_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark record version {version!r}")
+    return record
+
+
+def list_records(history_dir: Optional[str] = None) -> List[str]:
+    """Record paths, oldest first"""
+    directory = Path(history_dir or HISTORY_DIR)
+    return sorted(str(path) for path in directory.glob('*.json')) if directory.exists() else []
+
+
+def _beta_continued_fraction(a: float, b: float, x: float) -> float:
+    """Continued fraction of the incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-14:
+            break
+    return h
+
+
+def _incomplete_beta(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _beta_continued_fraction(a, b, x) / a
+    return 1.0 - front * _beta_continued_fraction(b, a, 1 - x) / b
+
+
+def t_survival(t: float, df: float) -> float:
+    """P(T > t) for Student's t distribution with df degrees of freedom"""
+    tail = 0.5 * _incomplete_beta(df / 2, 0.5, df / (df + t * t))
+    return tail if t > 0 else 1.0 - tail
+
+
+def welch_increase_p(base: List[float], new: List[float]) -> Optional[float]:
+    """
+    One-sided Welch's t-test p-value for "new has a larger mean than base"
+
+    Returns:
+        p-value, or None if either side has fewer than two samples
+    """
+    if len(base) < 2 or len(new) < 2:
+        return None
+    base_var, new_var = statistics.variance(base), statistics.variance(new)
+    difference = statistics.mean(new) - statistics.mean(base)
+    if base_var == 0 and new_var == 0:
+        # Deterministic measurement (e.g. output size): any increase is real
+        return 0.0 if difference > 0 else 1.0
+    se_squared = base_var / len(base) + new_var / len(new)
+    df = se_squared ** 2 / ((base_var / len(base)) ** 2 / (len(base) - 1)
+                            + (new_var / len(new)) ** 2 / (len(new) - 1))
+    return t_survival(difference / math.sqrt(se_squared), df)
+
+
+def case_key(case: Dict) -> str:
+    """Identity of a benchmark case across records"""
+    return json.dumps({'stage': case['stage'], 'params': case['params']}, sort_keys=True)
+
+
+def _metric_samples(case: Dict) -> Dict[str, List[float]]:
+    """Compared measurements of a case, one list of samples per metric"""
+    metrics = {}
+    for sample in case['samples']:
+        values = {metric: sample.get(metric) for metric in COMPARED_METRICS}
+        for stage, seconds in (sample.get('stageTimings') or {}).items():
+            values[STAGE_METRIC_PREFIX + stage] = seconds
+        for metric, value in values.items():
+            if value is not None:
+                metrics.setdefault(metric, []).append(float(value))
+    return metrics
+
+
+def compare(base: Dict, new: Dict, alpha: float = DEFAULT_ALPHA,
+            min_change: float = DEFAULT_MIN_CHANGE) -> Dict:
+    """
+    Compare every case and metric two records have in common
+
+    A metric is a regression (or improvement) when its median changed by
+    more than min_change (or the stage's STAGE_MIN_CHANGE) and a one-sided
+    Welch's t-test on the samples is significant at alpha. With a single
+    sample per side the change is only reported as "untested".
+
+    Args:
+        base: Baseline record
+        new: Record to check
+        alpha: Significance level
+        min_change: Smallest relative change of the median that is flagged
+
+    Returns:
+        Rows (case, metric, medians, change, p-value, status), the records'
+        environment differences and the number of regressions
+    """
+    base_cases = {case_key(case): case for case in base['cases']}
+    rows = []
+    for case in new['cases']:
+        base_case = base_cases.get(case_key(case))
+        if base_case is None:
+            continue
+        base_metrics = _metric_samples(base_case)
+        stage_min_change = max(min_change, STAGE_MIN_CHANGE.get(case['stage'], 0.0))
+        for metric, new_values in _metric_samples(case).items():
+            base_values = base_metrics.get(metric)
+            if not base_values:
+                continue
+            base_median, new_median = statistics.median(base_values), statistics.median(new_values)
+            if base_median == 0 and new_median == 0:
+                continue
+            change = (new_median - base_median) / base_median if base_median else math.inf
+            p_increase = welch_increase_p(base_values, new_values)
+            p_decrease = welch_increase_p(new_values, base_values)
+
+            if abs(change) <= stage_min_change:
+                status = 'unchanged'
+            elif p_increase is None:
+                status = 'untested'
+            elif change > 0 and p_increase < alpha:
+                status = 'regression'
+            elif change < 0 and p_decrease < alpha:
+                status = 'improvement'
+            else:
+                status = 'noise'
+            rows.append({
+                'stage': case['stage'],
+                'params': case['params'],
+                'metric': metric,
+                'baseMedian': base_median,
+                'newMedian': new_median,
+                'change': change,
+                'p': p_increase if change > 0 else p_decrease,
+                'status': status,
+            })
+
+    environment = {
+        key: (base.get(key), new.get(key))
+        for key in ('ffmpegVersion', 'settings')
+        if base.get(key) != new.get(key)
+    }
+    if base['machine'].get('id') != new['machine'].get('id'):
+        environment['machine'] = (base['machine'], new['machine'])
+
+    return {
+        'rows': rows,
+        'environment': environment,
+        'regressions': sum(1 for row in rows if row['status'] == 'regression'),
+    }
+
+
+def _format_value(metric: str, value: float) -> str:
+    if metric == 'peakRssKb':
+        return f"{value / 1024:.0f} MB"
+    if metric == 'outputBytes':
+        return f"{value / 1024:.0f} KB"
+    return f"{value * 1e6:.0f} µs" if value < 0.01 else f"{value:.2f} s"
+
+
+def print_comparison(result: Dict, show_all: bool = False):
+    """Print a comparison, regressions first"""
+    from render_benchmark import describe
+
+    for key, (base_value, new_value) in result['environment'].items():
+        print(f"⚠️  {key} differs between the records; timings may not be comparable")
+        print(f"   base: {base_value}")
+        print(f"   new:  {new_value}")
+
+    icons = {'regression': '🔴', 'improvement': '🟢', 'untested': '❔', 'noise': '·', 'unchanged': '·'}
+    order = ['regression', 'improvement', 'untested', 'noise', 'unchanged']
+    rows = sorted(result['rows'], key=lambda row: (order.index(row['status']), -abs(row['change'])))
+    for row in rows:
+        if not show_all and row['status'] in ('noise', 'unchanged'):
+            continue
+        p = f"p={row['p']:.3f}" if row['p'] is not None else "1 sample"
+        print(f"{icons[row['status']]} {row['stage']:<6} {describe(row['params'])} {row['metric']:<18} "
+              f"{_format_value(row['metric'], row['baseMedian']):>9} → "
+              f"{_format_value(row['metric'], row['newMedian']):>9} "
+              f"({row['change']:+.1%}, {p})")
+
+    counts = {}
+    for row in result['rows']:
+        counts[row['status']] = counts.get(row['status'], 0) + 1
+    print(f"📊 {len(result['rows'])} metric(s) compared: "
+          + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render benchmark history")
+    parser.add_argument('--dir', help=f"History directory (default: {HISTORY_DIR})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help="List stored records")
+
+    compare_parser = commands.add_parser('compare', help="Compare two records")
+    compare_parser.add_argument('base', nargs='?', help="Baseline record (default: second newest)")
+    compare_parser.add_argument('new', nargs='?', help="Record to check (default: newest)")
+    compare_parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                                help=f"Significance level (default: {DEFAULT_ALPHA})")
+    compare_parser.add_argument('--min-change', type=float, default=DEFAULT_MIN_CHANGE,
+                                help=f"Smallest relative change flagged (default: {DEFAULT_MIN_CHANGE})")
+    compare_parser.add_argument('--all', action='store_true', help="Also show unchanged metrics")
+    args = parser.parse_args()
+
+    records = list_records(args.dir)
+    if args.command == 'list':
+        for path in records:
+            record = load_record(path)
+            print(f"{Path(path).name}  {record.get('label') or '':<12} commit {record.get('commit')}  "
+                  f"{len(record['cases'])} case(s), {record['settings'].get('repeat')} sample(s) each")
+        return 0
+
+    if args.base and args.new:
+        base_path, new_path = args.base, args.new
+    elif args.base:
+        if not records:
+            parser.error("No records in the history directory")
+        base_path, new_path = args.base, records[-1]
+    elif len(records) >= 2:
+        base_path, new_path = records[-2], records[-1]
+    else:
+        parser.error("Need two records: pass their paths or save more benchmark runs")
+
+    print(f"📚 Base: {base_path}")
+    print(f"📚 New:  {new_path}")
+    result = compare(load_record(base_path), load_record(new_path), args.alpha, args.min_change)
+    print_comparison(result, args.all)
+    return 1 if result['regressions'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
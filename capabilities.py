@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - FFmpeg Capability Probes
+Each probe spawns FFmpeg at most once per process, on first use, so
+importing modules and constructing generators stays free of subprocesses
+"""
+
+import functools
+import re
+import subprocess
+from typing import FrozenSet, Optional
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_version() -> Optional[str]:
+    """First line of `ffmpeg -version`, or None if FFmpeg is not installed"""
+    try:
+        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return result.stdout.split('\n', 1)[0].strip()
+
+
+def require_ffmpeg():
+    """Raise if FFmpeg is missing (checked once per process)"""
+    if ffmpeg_version() is None:
+        raise RuntimeError("FFmpeg is not installed. Please install it first.")
+
+
+def _list_names(flag: str) -> FrozenSet[str]:
+    """Names from an `ffmpeg -encoders` / `-filters` listing"""
+    try:
+        result = subprocess.run(['ffmpeg', '-hide_banner', flag], capture_output=True, text=True)
+    except FileNotFoundError:
+        return frozenset()
+    names = set()
+    for line in result.stdout.splitlines():
+        # Entries are "<flags> <name> <description>"; legend lines are
+        # "<flag> = <meaning>" and encoders have a "------" separator
+        parts = line.split()
+        if len(parts) >= 3 and parts[1] != '=' and not re.fullmatch(r'-+', parts[0]):
+            names.add(parts[1])
+    return frozenset(names)
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_encoders() -> FrozenSet[str]:
+    """Encoders this FFmpeg build provides (e.g. libx264, aac)"""
+    return _list_names('-encoders')
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_filters() -> FrozenSet[str]:
+    """Filters this FFmpeg build provides (e.g. zoompan, drawtext, xfade)"""
+    return _list_names('-filters')
+
+
+def has_encoder(name: str) -> bool:
+    return name in ffmpeg_encoders()
+
+
+def has_filter(name: str) -> bool:
+    return name in ffmpeg_filters()
+
+
+if __name__ == "__main__":
+    print(f"🎥 {ffmpeg_version() or 'FFmpeg not found'}")
+    for name in ('libx264', 'aac'):
+        print(f"   {'✅' if has_encoder(name) else '❌'} encoder {name}")
+    for name in ('zoompan', 'drawtext', 'xfade', 'acrossfade', 'unsharp'):
+        print(f"   {'✅' if has_filter(name) else '❌'} filter {name}")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Caption Layout
+Classifies caption text in a single pass and splits it into on-screen
+chunks of balanced rendered width
+
+Every BMP codepoint's script and width (in ems of the font size) is
+precomputed into two lookup tables when the module loads, so classifying
+a caption is one walk over its characters with two table reads each: no
+per-script rescans, no separate word split, no unicodedata calls. Widths are estimates for
+typical caption fonts, good enough to keep chunks a similar size and
+inside the frame.
+"""
+
+import array
+import bisect
+import math
+import unicodedata
+from itertools import accumulate
+from typing import FrozenSet, List, Tuple
+
+
+# Scripts with a dedicated font, in the order a caption's script is chosen:
+# a caption with any Malayalam is 'malayalam', else any Devanagari 'hindi', ...
+SCRIPT_PRIORITY = ('malayalam', 'hindi', 'arabic', 'chinese', 'japanese', 'korean')
+
+# Codepoint ranges (inclusive) of those scripts
+SCRIPT_RANGES = (
+    (0x0D00, 0x0D7F, 'malayalam'),
+    (0x0900, 0x097F, 'hindi'),       # Devanagari
+    (0x0600, 0x06FF, 'arabic'),
+    (0x4E00, 0x9FFF, 'chinese'),     # CJK Unified Ideographs
+    (0x3400, 0x4DBF, 'chinese'),     # CJK Extension A
+    (0x3040, 0x309F, 'japanese'),    # Hiragana
+    (0x30A0, 0x30FF, 'japanese'),    # Katakana
+    (0xAC00, 0xD7AF, 'korean'),      # Hangul syllables
+)
+
+# Codepoints any Latin caption font covers: ASCII, Latin-1, dashes, quotes and ellipsis
+LATIN_RANGES = ((0x0000, 0x00FF), (0x2010, 0x2027))
+
+# Estimated advance widths in ems; ranges later in the list win
+WIDTH_RANGES = (
+    (0x0021, 0x007E, 0.62),          # ASCII letters and digits (refined below)
+    (0x00A1, 0x024F, 0.62),          # Latin-1 and Latin Extended
+    (0x0600, 0x06FF, 0.50),          # Arabic
+    (0x0900, 0x097F, 0.66),          # Devanagari
+    (0x0D00, 0x0D7F, 0.86),          # Malayalam
+    (0x1100, 0x115F, 1.0),           # Wide: Hangul Jamo, CJK, kana, Hangul, fullwidth forms
+    (0x2E80, 0xA4CF, 1.0),
+    (0xAC00, 0xD7A3, 1.0),
+    (0xF900, 0xFAFF, 1.0),
+    (0xFE30, 0xFE4F, 1.0),
+    (0xFF00, 0xFF60, 1.0),
+    (0xFFE0, 0xFFE6, 1.0),
+)
+DEFAULT_WIDTH = 0.62
+# Preferred width of a caption chunk: about three average words
+CAPTION_CHUNK_EMS = 10.0
+UPPERCASE_WIDTH = 0.72
+PUNCTUATION_WIDTH = 0.36
+SPACE_WIDTH = 0.32
+# Spacing vowel signs (e.g. Malayalam ാ) relative to their script's letters
+SPACING_MARK_FACTOR = 0.6
+
+# Script codes in the tables: higher wins when a word mixes scripts
+_LATIN, _OTHER = 0, 1
+_SCRIPT_NAMES = ('latin', 'other') + tuple(reversed(SCRIPT_PRIORITY))
+_SCRIPT_CODES = {name: code for code, name in enumerate(_SCRIPT_NAMES)}
+_SPACE = -1.0  # width table marker of whitespace (word separators)
+
+
+def _build_tables() -> Tuple[bytearray, array.array]:
+    """Script code and width of every BMP codepoint"""
+    scripts = bytearray([_OTHER]) * 0x10000
+    for first, last in LATIN_RANGES:
+        scripts[first:last + 1] = bytes([_LATIN]) * (last - first + 1)
+    for first, last, script in SCRIPT_RANGES:
+        scripts[first:last + 1] = bytes([_SCRIPT_CODES[script]]) * (last - first + 1)
+
+    widths = array.array('f', [DEFAULT_WIDTH]) * 0x10000
+    for first, last, width in WIDTH_RANGES:
+        widths[first:last + 1] = array.array('f', [width]) * (last - first + 1)
+    for cp in range(ord('A'), ord('Z') + 1):
+        widths[cp] = UPPERCASE_WIDTH
+    for char in '.,:;!?\'"()[]-|`':
+        widths[ord(char)] = PUNCTUATION_WIDTH
+
+    for cp in range(0x10000):
+        char = chr(cp)
+        if char.isspace():
+            widths[cp] = _SPACE
+            continue
+        category = unicodedata.category(char)
+        if category in ('Mn', 'Me', 'Cf', 'Cc', 'Cs'):
+            # Combining marks sit on the previous letter; format characters are invisible
+            widths[cp] = 0.0
+            if category in ('Cf', 'Cc') and scripts[cp] == _OTHER:
+                scripts[cp] = _LATIN  # needs no glyph
+        elif category == 'Mc':
+            widths[cp] *= SPACING_MARK_FACTOR
+    return scripts, widths
+
+
+_SCRIPTS, _WIDTHS = _build_tables()
+
+
+def _classify_astral(char: str) -> Tuple[int, float]:
+    """Script code and width of a codepoint beyond the BMP (emoji, rare ideographs)"""
+    if unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+        return _LATIN, 0.0
+    return _OTHER, 1.0 if unicodedata.east_asian_width(char) in ('W', 'F') else DEFAULT_WIDTH
+
+
+def classify_text(text: str) -> Tuple[str, List[Tuple[str, str, float]]]:
+    """
+    Script of a caption and its whitespace-separated words, in one pass
+
+    Args:
+        text: Caption text
+
+    Returns:
+        (script, words): the caption's script ('latin' unless it has
+        characters of a SCRIPT_PRIORITY script) and (word, script, width)
+        per word, width in ems. A word's script is 'latin', 'other'
+        (characters outside the known scripts) or a SCRIPT_PRIORITY script.
+    """
+    scripts, widths, names = _SCRIPTS, _WIDTHS, _SCRIPT_NAMES
+    words = []
+    caption_code = _LATIN
+    start = None
+    word_code = _LATIN
+    word_width = 0.0
+    for i, char in enumerate(text):
+        cp = ord(char)
+        if cp < 0x10000:
+            code, width = scripts[cp], widths[cp]
+        else:
+            code, width = _classify_astral(char)
+        if width == _SPACE:
+            if start is not None:
+                words.append((text[start:i], names[word_code], word_width))
+                if word_code > caption_code:
+                    caption_code = word_code
+                start = None
+        elif start is None:
+            start, word_code, word_width = i, code, width
+        else:
+            word_width += width
+            if code > word_code:
+                word_code = code
+    if start is not None:
+        words.append((text[start:], names[word_code], word_width))
+        if word_code > caption_code:
+            caption_code = word_code
+    return (names[caption_code] if caption_code > _OTHER else 'latin'), words
+
+
+def detect_script(text: str) -> str:
+    """Script of a caption (see classify_text)"""
+    return classify_text(text)[0]
+
+
+def _split_word(text: str, max_width: float) -> List[Tuple[str, float]]:
+    """Break a word (e.g. unspaced Chinese) into pieces of up to max_width between letters"""
+    pieces = []
+    start, width = 0, 0.0
+    for i, char in enumerate(text):
+        cp = ord(char)
+        char_width = _WIDTHS[cp] if cp < 0x10000 else _classify_astral(char)[1]
+        # Never separate a combining mark (zero width) from its letter
+        if char_width > 0 and i > start and width + char_width > max_width:
+            pieces.append((text[start:i], width))
+            start, width = i, 0.0
+        width += char_width
+    pieces.append((text[start:], width))
+    return pieces
+
+
+def chunk_words(words: List[Tuple[str, str, float]], target_width: float,
+                max_width: float) -> List[Tuple[str, FrozenSet[str], float]]:
+    """
+    Split classified words into chunks of about equal rendered width
+
+    The number of chunks is the total width over target_width, raised until
+    every chunk fits max_width; cuts go at the word boundaries nearest to
+    equal shares of the total width. Words wider than max_width on their own
+    are broken between letters into pieces of up to target_width.
+
+    Args:
+        words: (word, script, width) tuples from classify_text
+        target_width: Preferred chunk width in ems
+        max_width: Widest chunk that fits the frame, in ems
+
+    Returns:
+        (text, scripts, width) per chunk, in order
+    """
+    # (text, script, width, joins the previous piece without a space)
+    pieces = []
+    for word, script, width in words:
+        if width > max_width:
+            pieces.extend((text, script, piece_width, i > 0)
+                          for i, (text, piece_width) in enumerate(_split_word(word, target_width)))
+        else:
+            pieces.append((word, script, width, False))
+    if not pieces:
+        return []
+
+    # Width of the text up to the end of each piece, spaces included
+    ends = list(accumulate(width + (SPACE_WIDTH if i and not glued else 0.0)
+                           for i, (_, _, width, glued) in enumerate(pieces)))
+    total = ends[-1]
+    last_piece = len(pieces) - 1
+
+    count = max(1, math.ceil(total / target_width))
+    while True:
+        bounds = []  # (first, last) piece of each chunk
+        first = 0
+        for k in range(1, count):
+            goal = total * k / count
+            # Piece whose end is nearest to the goal (at least one piece per chunk)
+            cut = bisect.bisect_left(ends, goal, first)
+            if cut > first and (cut > last_piece or goal - ends[cut - 1] <= ends[cut] - goal):
+                cut -= 1
+            if cut >= last_piece:
+                break
+            bounds.append((first, cut))
+            first = cut + 1
+        bounds.append((first, last_piece))
+
+        chunks = []
+        for first, last in bounds:
+            width = ends[last] - (ends[first - 1] if first else 0.0)
+            if first and not pieces[first][3]:
+                width -= SPACE_WIDTH
+            text = ''.join(('' if i == first or pieces[i][3] else ' ') + pieces[i][0]
+                           for i in range(first, last + 1))
+            chunks.append((text, frozenset(pieces[i][1] for i in range(first, last + 1)), width))
+        if count >= len(pieces) or all(width <= max_width or first == last
+                                       for (first, last), (_, _, width) in zip(bounds, chunks)):
+            return chunks
+        count += 1
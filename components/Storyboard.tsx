@@ -132,7 +132,8 @@ const Storyboard: React.FC<StoryboardProps> = ({ scenes, updateScene, deleteScen
         0.5, // transition duration
         30,  // fps
         `ai-video-${Date.now()}.mp4`,
-        enableCaptions
+        enableCaptions,
+        (progress) => setRenderProgress(10 + 80 * progress.fraction)
       );
 
       setRenderProgress(90);
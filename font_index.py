@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Font Index
+Index of the system's fonts and the Unicode characters each one covers,
+built once per process, so caption rendering picks a font that has glyphs
+for its text instead of probing font paths per caption
+
+Coverage comes from each font's cmap table (the first face of a .ttc
+collection, the one FFmpeg's drawtext renders). The font of every script
+is chosen when the index is built; the font of a piece of text is looked
+up in a memo keyed by its characters, so only new character sets scan the
+index.
+
+Usage:
+    python font_index.py                 # list the fonts chosen per script
+    python font_index.py "Hello നമസ്കാരം"  # font for a caption
+"""
+
+import bisect
+import os
+import platform
+import struct
+import sys
+import threading
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from metrics import REGISTRY
+
+
+SYSTEM = platform.system()
+
+# Directories searched for fonts (recursively); FONT_DIRS adds more, searched first
+FONT_DIRS = {
+    'Darwin': ['/System/Library/Fonts', '/Library/Fonts', '~/Library/Fonts'],
+    'Linux': ['/usr/share/fonts', '/usr/local/share/fonts', '~/.local/share/fonts', '~/.fonts'],
+    'Windows': [os.path.join(os.getenv('WINDIR', 'C:\\Windows'), 'Fonts'),
+                os.path.join(os.getenv('LOCALAPPDATA', ''), 'Microsoft', 'Windows', 'Fonts')],
+}
+FONT_EXTENSIONS = ('.ttf', '.otf', '.ttc')
+
+# Characters a font must have to be used for a script
+SCRIPT_SAMPLES = {
+    'latin': 'AZaz09.,!?',
+    'malayalam': 'മലയാളം',
+    'hindi': 'हिन्दी',
+    'arabic': 'العربية',
+    'chinese': '中文汉字',
+    'japanese': 'ひらがなカタカナ',
+    'korean': '한국어',
+}
+
+# Fonts used for a script when installed and covering it (the look captions were designed with)
+PREFERRED_FONTS = {
+    'Darwin': {
+        'malayalam': ['/System/Library/Fonts/Supplemental/Malayalam Sangam MN.ttc'],
+        'hindi': ['/System/Library/Fonts/Supplemental/Devanagari Sangam MN.ttc'],
+        'arabic': ['/System/Library/Fonts/Supplemental/Baghdad.ttf'],
+        'chinese': ['/System/Library/Fonts/PingFang.ttc'],
+        'japanese': ['/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc'],
+        'korean': ['/System/Library/Fonts/AppleSDGothicNeo.ttc'],
+        'latin': ['/System/Library/Fonts/Helvetica.ttc'],
+        '*': ['/System/Library/Fonts/Supplemental/Arial Unicode.ttf'],
+    },
+    'Linux': {
+        'malayalam': ['/usr/share/fonts/truetype/noto/NotoSansMalayalam-Regular.ttf'],
+        'hindi': ['/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf'],
+        'arabic': ['/usr/share/fonts/truetype/noto/NotoSansArabic-Regular.ttf'],
+        'chinese': ['/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc',
+                    '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc'],
+        'japanese': ['/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc',
+                     '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc'],
+        'korean': ['/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc',
+                   '/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc'],
+        'latin': ['/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'],
+        '*': ['/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf'],
+    },
+    'Windows': {
+        'malayalam': ['C:\\Windows\\Fonts\\NirmalaB.ttf'],
+        'hindi': ['C:\\Windows\\Fonts\\NirmalaB.ttf'],
+        'arabic': ['C:\\Windows\\Fonts\\tahoma.ttf'],
+        'chinese': ['C:\\Windows\\Fonts\\msyh.ttc'],
+        'japanese': ['C:\\Windows\\Fonts\\msmincho.ttc'],
+        'korean': ['C:\\Windows\\Fonts\\malgun.ttf'],
+        'latin': ['C:\\Windows\\Fonts\\Arial.ttf'],
+        '*': [],
+    },
+}
+
+# Text lookups memoized before the memo is reset
+TEXT_MEMO_SIZE = 4096
+# Memo lookup default: a memoized None (no font covers the text) is still a hit
+_MISSING = object()
+
+# Shared with video_generator (the registry hands back the same counter)
+CACHE_LOOKUPS = REGISTRY.counter('video_cache_lookups_total',
+                                 "Lookups of the renderer's in-process caches", ['cache', 'outcome'])
+
+# Unicode categories that need no glyph (spaces, controls, joiners)
+_NO_GLYPH_CATEGORIES = ('Zs', 'Zl', 'Zp', 'Cc', 'Cf')
+
+
+class FontParseError(Exception):
+    """A font file is not a readable TrueType/OpenType font"""
+    pass
+
+
+def _merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _cmap_format4(data: bytes) -> List[Tuple[int, int]]:
+    """Codepoint ranges with a glyph in a format 4 (BMP) subtable"""
+    seg_count = struct.unpack_from('>H', data, 6)[0] // 2
+    ends = struct.unpack_from(f'>{seg_count}H', data, 14)
+    starts = struct.unpack_from(f'>{seg_count}H', data, 16 + 2 * seg_count)
+    deltas = struct.unpack_from(f'>{seg_count}h', data, 16 + 4 * seg_count)
+    range_offsets_at = 16 + 6 * seg_count
+    range_offsets = struct.unpack_from(f'>{seg_count}H', data, range_offsets_at)
+
+    ranges = []
+    for i in range(seg_count):
+        start, end = starts[i], ends[i]
+        if start == 0xFFFF or start > end:
+            continue
+        if range_offsets[i] == 0:
+            # Glyph is (code + delta) mod 65536: missing only where that is 0
+            zero = (-deltas[i]) & 0xFFFF
+            if start <= zero <= end:
+                if start < zero:
+                    ranges.append((start, zero - 1))
+                if zero < end:
+                    ranges.append((zero + 1, end))
+            else:
+                ranges.append((start, end))
+            continue
+        # Glyph ids come from glyphIdArray; 0 means the font has no glyph
+        glyphs_at = range_offsets_at + 2 * i + range_offsets[i]
+        run_start = None
+        for code in range(start, end + 1):
+            at = glyphs_at + 2 * (code - start)
+            glyph = struct.unpack_from('>H', data, at)[0] if at + 2 <= len(data) else 0
+            if glyph:
+                if run_start is None:
+                    run_start = code
+            elif run_start is not None:
+                ranges.append((run_start, code - 1))
+                run_start = None
+        if run_start is not None:
+            ranges.append((run_start, end))
+    return ranges
+
+
+def _cmap_format12(data: bytes) -> List[Tuple[int, int]]:
+    """Codepoint ranges of a format 12 (full Unicode) subtable"""
+    groups = struct.unpack_from('>I', data, 12)[0]
+    ranges = []
+    for i in range(groups):
+        start, end, glyph = struct.unpack_from('>III', data, 16 + 12 * i)
+        if glyph == 0:
+            start += 1  # a group mapping to glyph 0 starts with .notdef
+        if start <= end:
+            ranges.append((start, end))
+    return ranges
+
+
+def read_coverage(path: str) -> List[Tuple[int, int]]:
+    """
+    Unicode coverage of a font file
+
+    Args:
+        path: .ttf, .otf or .ttc file (the first face of a collection is read)
+
+    Returns:
+        Sorted, merged (first, last) codepoint ranges that have glyphs
+
+    Raises:
+        FontParseError: Not a font, or no Unicode cmap subtable
+    """
+    try:
+        with open(path, 'rb') as f:
+            def read(offset: int, size: int) -> bytes:
+                f.seek(offset)
+                data = f.read(size)
+                if len(data) < size:
+                    raise FontParseError(f"{path}: truncated")
+                return data
+
+            font_offset = 0
+            if read(0, 4) == b'ttcf':
+                font_offset = struct.unpack('>I', read(12, 4))[0]
+            num_tables = struct.unpack('>H', read(font_offset + 4, 2))[0]
+            records = read(font_offset + 12, 16 * num_tables)
+            cmap_at = None
+            for i in range(num_tables):
+                tag, _, offset, _ = struct.unpack_from('>4sIII', records, 16 * i)
+                if tag == b'cmap':
+                    cmap_at = offset
+                    break
+            if cmap_at is None:
+                raise FontParseError(f"{path}: no cmap table")
+
+            num_subtables = struct.unpack('>H', read(cmap_at + 2, 2))[0]
+            subtables = {}
+            for i in range(num_subtables):
+                platform_id, encoding_id, offset = struct.unpack('>HHI', read(cmap_at + 4 + 8 * i, 8))
+                subtables.setdefault((platform_id, encoding_id), cmap_at + offset)
+
+            # Full-repertoire subtables first, then BMP ones; symbol fonts last
+            for key in ((3, 10), (0, 6), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0), (3, 0)):
+                if key not in subtables:
+                    continue
+                at = subtables[key]
+                fmt = struct.unpack('>H', read(at, 2))[0]
+                if fmt == 12:
+                    length = struct.unpack('>I', read(at + 4, 4))[0]
+                    return _merge_ranges(_cmap_format12(read(at, length)))
+                if fmt == 4:
+                    length = struct.unpack('>H', read(at + 2, 2))[0]
+                    # Some fonts understate the length of big format 4 tables
+                    f.seek(at)
+                    return _merge_ranges(_cmap_format4(f.read(max(length, 0x10000))))
+    except (OSError, struct.error) as e:
+        raise FontParseError(f"{path}: {e}")
+    raise FontParseError(f"{path}: no Unicode cmap subtable")
+
+
+class FontEntry:
+    def __init__(self, path: str, ranges: List[Tuple[int, int]]):
+        """
+        An indexed font
+
+        Args:
+            path: Font file
+            ranges: Sorted, merged codepoint ranges with glyphs
+        """
+        self.path = path
+        self.ranges = ranges
+        self._starts = [start for start, _ in ranges]
+        self.size = sum(end - start + 1 for start, end in ranges)
+
+    def covers(self, codepoint: int) -> bool:
+        i = bisect.bisect_right(self._starts, codepoint) - 1
+        return i >= 0 and codepoint <= self.ranges[i][1]
+
+    def coverage_of(self, codepoints: Iterable[int]) -> int:
+        """How many of the codepoints have glyphs"""
+        return sum(1 for codepoint in codepoints if self.covers(codepoint))
+
+
+def glyph_codepoints(text: str) -> FrozenSet[int]:
+    """Characters of text that need a glyph"""
+    return frozenset(ord(char) for char in text
+                     if unicodedata.category(char) not in _NO_GLYPH_CATEGORIES)
+
+
+def font_dirs() -> List[str]:
+    """Directories to index: FONT_DIRS (os.pathsep-separated) first, then the system's"""
+    extra = [d for d in os.getenv('FONT_DIRS', '').split(os.pathsep) if d]
+    return [os.path.expanduser(d) for d in extra + FONT_DIRS.get(SYSTEM, FONT_DIRS['Linux'])]
+
+
+class FontIndex:
+    def __init__(self, dirs: Optional[List[str]] = None):
+        """
+        Fonts found under a set of directories, with their Unicode coverage
+
+        Args:
+            dirs: Directories to search recursively (default: font_dirs())
+        """
+        self.dirs = font_dirs() if dirs is None else dirs
+        self.fonts: Dict[str, FontEntry] = {}
+        self.skipped = 0  # unreadable font files
+        self._preferred = PREFERRED_FONTS.get(SYSTEM, PREFERRED_FONTS['Linux'])
+        self._rank: Dict[str, int] = {}
+        self._script_fonts: Dict[str, str] = {}
+        self._text_fonts: Dict[Tuple[str, FrozenSet[int]], str] = {}
+        self._lock = threading.Lock()
+
+        self._scan()
+        samples = {script: glyph_codepoints(text) for script, text in SCRIPT_SAMPLES.items()}
+        for script in SCRIPT_SAMPLES:
+            self._script_fonts[script] = self._choose(script, samples[script])
+        # Scripts each indexed font covers, for callers that know their text's scripts
+        self._font_scripts: Dict[str, FrozenSet[str]] = {
+            path: frozenset(script for script, codepoints in samples.items()
+                            if entry.coverage_of(codepoints) == len(codepoints))
+            for path, entry in self.fonts.items()
+        }
+        self._samples = samples
+        self._scripts_fonts: Dict[Tuple[str, FrozenSet[str]], Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.fonts)
+
+    def _scan(self):
+        for directory in self.dirs:
+            if not os.path.isdir(directory):
+                continue
+            for root, _, files in os.walk(directory):
+                for name in sorted(files):
+                    if not name.lower().endswith(FONT_EXTENSIONS):
+                        continue
+                    path = os.path.join(root, name)
+                    real = os.path.realpath(path)
+                    if real in self._rank:
+                        continue  # symlinked or listed twice
+                    try:
+                        ranges = read_coverage(path)
+                    except FontParseError:
+                        self.skipped += 1
+                        continue
+                    self._rank[real] = self._style_rank(name)
+                    self.fonts[path] = FontEntry(path, ranges)
+
+    @staticmethod
+    def _style_rank(name: str) -> int:
+        """Lower is a better caption face: sans before serif, upright before italic, mono last"""
+        name = name.lower()
+        rank = 0 if 'sans' in name else 1
+        if any(style in name for style in ('italic', 'oblique')):
+            rank += 2
+        if any(style in name for style in ('mono', 'code', 'symbol', 'emoji', 'awesome')):
+            rank += 4
+        return rank
+
+    def _choose(self, script: str, codepoints: FrozenSet[int]) -> Optional[str]:
+        """
+        Best font for a set of characters
+
+        Preferred fonts of the script that cover everything win; otherwise the
+        font covering the most characters, then the best face, then the
+        widest coverage. None if the index has no font with any of them.
+        """
+        for path in self._preferred.get(script, []) + self._preferred['*']:
+            entry = self.fonts.get(path)
+            if entry is not None and entry.coverage_of(codepoints) == len(codepoints):
+                return path
+        best, best_key = None, None
+        for path, entry in self.fonts.items():
+            covered = entry.coverage_of(codepoints)
+            if not covered and codepoints:
+                continue
+            key = (-covered, self._rank[os.path.realpath(path)], -entry.size, path)
+            if best_key is None or key < best_key:
+                best, best_key = path, key
+        return best
+
+    def font_for_script(self, script: str) -> Optional[str]:
+        """Font chosen for a script at build time (None if no installed font has it)"""
+        return self._script_fonts.get(script, self._script_fonts['latin'])
+
+    def scripts_covered(self, path: str) -> FrozenSet[str]:
+        """Scripts of SCRIPT_SAMPLES an indexed font has glyphs for (empty if not indexed)"""
+        return self._font_scripts.get(path, frozenset())
+
+    def font_for_scripts(self, scripts: FrozenSet[str], script: str = 'latin') -> Optional[str]:
+        """
+        Font covering several scripts of SCRIPT_SAMPLES (e.g. those of a caption chunk)
+
+        Memoized per set of scripts, so text whose scripts are known needs
+        no per-character lookup. The script's own font wins when it covers all.
+        """
+        primary = self.font_for_script(script)
+        if scripts <= self.scripts_covered(primary):
+            return primary
+        key = (script, scripts)
+        with self._lock:
+            hit = key in self._scripts_fonts
+            font = self._scripts_fonts.get(key)
+        if not hit:
+            codepoints = frozenset().union(*(self._samples[name] for name in scripts))
+            font = self._choose(script, codepoints) or primary
+            with self._lock:
+                self._scripts_fonts[key] = font
+        CACHE_LOOKUPS.inc(cache='font', outcome='hit' if hit else 'miss')
+        return font
+
+    def font_for_text(self, text: str, script: str = 'latin') -> Optional[str]:
+        """
+        Font with glyphs for every character of text
+
+        The script's font is used whenever it covers the text; mixed-script
+        text gets the font covering most of its characters.
+        """
+        codepoints = glyph_codepoints(text)
+        primary = self.font_for_script(script)
+        entry = self.fonts.get(primary) if primary else None
+        if entry is not None and all(entry.covers(codepoint) for codepoint in codepoints):
+            return primary
+
+        key = (script, codepoints)
+        with self._lock:
+            font = self._text_fonts.get(key, _MISSING)
+        hit = font is not _MISSING
+        if not hit:
+            font = self._choose(script, codepoints) or primary
+            with self._lock:
+                if len(self._text_fonts) >= TEXT_MEMO_SIZE:
+                    self._text_fonts.clear()
+                self._text_fonts[key] = font
+        CACHE_LOOKUPS.inc(cache='font', outcome='hit' if hit else 'miss')
+        return font
+
+
+_index: Optional[FontIndex] = None
+_index_lock = threading.Lock()
+
+
+def font_index() -> FontIndex:
+    """The process's font index, built on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FontIndex()
+        return _index
+
+
+if __name__ == "__main__":
+    index = font_index()
+    print(f"🔤 {len(index)} font(s) indexed in {', '.join(d for d in index.dirs if os.path.isdir(d))}"
+          + (f" ({index.skipped} unreadable)" if index.skipped else ""))
+    if len(sys.argv) > 1:
+        text = ' '.join(sys.argv[1:])
+        print(f"   {text!r}: {index.font_for_text(text) or 'no covering font'}")
+    else:
+        for script in SCRIPT_SAMPLES:
+            print(f"   {'✅' if index.font_for_script(script) else '❌'} {script}: "
+                  f"{index.font_for_script(script) or 'no font'}")
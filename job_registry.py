@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Job Registry
+In-memory registry of video generation jobs: status, stage, progress and
+log of every job, plus cancellation of running ones
+"""
+
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+
+# Final job statuses (jobs are 'queued', then 'running', then one of these)
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class Job:
+    def __init__(self, job_id: str, params: Dict):
+        """
+        State of one video generation job
+
+        Args:
+            job_id: Job identifier
+            params: Request parameters (topic, duration, aspect_ratio, ...)
+        """
+        self.job_id = job_id
+        self.params = params
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.progress = 0.0  # 0-1
+        self.messages: List[str] = []
+        self.output_path: Optional[str] = None
+        self.error: Optional[str] = None
+        # Measurements filled in by the runner (scene count, CPU time, ...)
+        self.metrics: Dict = {}
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        # Set by the runner: render context (to kill FFmpeg) and task (to
+        # stop pending provider calls)
+        self.context = None
+        self.task = None
+        self._listeners: List[Callable[['Job'], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def add_listener(self, callback: Callable[['Job'], None]):
+        """Call callback(job) on every stage, progress or status change"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"⚠️  Job listener failed for {self.job_id}: {e}")
+
+    def set_progress(self, stage: str, progress: Optional[float] = None):
+        """
+        Update the current stage and overall progress
+
+        Args:
+            stage: Human-readable stage ("storyboard", "scene 3/7", ...)
+            progress: Overall progress 0-1 (unchanged if None; never goes back)
+        """
+        with self._lock:
+            if self.finished:
+                return
+            self.status = 'running'
+            self.stage = stage
+            if progress is not None:
+                self.progress = max(self.progress, min(1.0, progress))
+        self._notify()
+
+    def finish(self, status: str, output_path: Optional[str] = None, error: Optional[str] = None):
+        """Mark the job completed, failed or cancelled"""
+        if status not in FINISHED_STATUSES:
+            raise ValueError(f"Not a final job status: {status}")
+        with self._lock:
+            if self.finished:
+                return
+            self.status = status
+            self.stage = status
+            self.output_path = output_path
+            self.error = error
+            self.finished_at = time.time()
+            if status == 'completed':
+                self.progress = 1.0
+            self.context = None
+            self.task = None
+        self._notify()
+
+    def cancel(self) -> bool:
+        """
+        Cancel the job: kill its FFmpeg processes and stop its pending work
+
+        Returns:
+            False if the job had already finished
+        """
+        with self._lock:
+            if self.finished:
+                return False
+            context, task = self.context, self.task
+        if context is not None:
+            context.cancel()
+        if task is not None:
+            task.cancel()
+        self.finish('cancelled', error="Cancelled by request")
+        return True
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable snapshot of the job"""
+        with self._lock:
+            return {
+                'jobId': self.job_id,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': round(self.progress, 3),
+                'params': self.params,
+                'outputPath': self.output_path,
+                'error': self.error,
+                'metrics': dict(self.metrics),
+                'createdAt': self.created_at,
+                'finishedAt': self.finished_at,
+            }
+
+
+class JobRegistry:
+    def __init__(self, max_finished: int = 100):
+        """
+        Args:
+            max_finished: Finished jobs kept for status queries (oldest
+                          are forgotten first)
+        """
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, params: Dict) -> Job:
+        """Register a new queued job"""
+        job = Job(uuid.uuid4().hex[:12], params)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        """All known jobs, newest first"""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job; False if unknown or already finished"""
+        job = self.get(job_id)
+        return job.cancel() if job is not None else False
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished (caller holds the lock)"""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished),
+            key=lambda job: job.finished_at
+        )
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.job_id]
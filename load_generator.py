@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Load Generator
+Drives /api/generate-video of a local API server with synthetic scenes (see
+render_benchmark.Fixtures) and reports latency percentiles, error rates and
+server-side resource usage
+
+Load is either closed-loop (a fixed number of clients, each sending its next
+request when the previous one returns) or open-loop (Poisson arrivals at a
+target rate, whether or not earlier requests have returned). Each load
+level runs in turn. During a level /api/metrics is sampled to record queue
+depth, render slots in use, FFmpeg and server CPU time, memory and free
+disk. No network access or API key is needed.
+
+Usage:
+    python load_generator.py --start-server --concurrency 5,20,50 --requests 50
+    python load_generator.py --rate 0.5,1,2 --requests 40 --json load.json
+    python load_generator.py --url http://localhost:5001 --scenes 6 --duration 8 --image-scale 2
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from render_benchmark import Fixtures, BASE_CASE
+
+
+# Latency percentiles reported per load level
+PERCENTILES = (50, 90, 95, 99)
+# Seconds a started server has to answer /api/health
+SERVER_START_TIMEOUT = 60
+
+_SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+(\S+)$')
+
+
+def build_payload(fixtures: Fixtures, scenes: int, duration: float, aspect_ratio: str,
+                  fps: int, captions: bool, image_scale: float = 1.0, words: int = 30) -> Dict:
+    """
+    Generate request with base64 data URIs of synthetic images and voice-overs
+
+    Images are JPEGs at the image provider's size times image_scale; audio is
+    24 kHz 16-bit mono PCM like the speech provider's, duration seconds per scene.
+    """
+    params = dict(BASE_CASE, scenes=scenes, duration=duration, aspect_ratio=aspect_ratio,
+                  image_scale=image_scale, words=words)
+    payload_scenes = []
+    for index in range(scenes):
+        scene = fixtures.scene(params, index)
+        with open(scene['image_path'], 'rb') as f:
+            image = base64.b64encode(f.read()).decode('ascii')
+        with open(scene['audio_path'], 'rb') as f:
+            audio = base64.b64encode(f.read()).decode('ascii')
+        payload_scenes.append({
+            'imageUrl': f"data:image/jpeg;base64,{image}",
+            'imageMimeType': 'image/jpeg',
+            'audioUrl': f"data:audio/wav;base64,{audio}",
+            'caption': scene['caption'],
+            'voiceOver': scene['caption'],
+        })
+    return {
+        'scenes': payload_scenes,
+        'aspectRatio': aspect_ratio,
+        'fps': fps,
+        'enableCaptions': captions,
+    }
+
+
+def send_request(url: str, body: bytes, timeout: float) -> Dict:
+    """POST one render request; returns its status (None if no response) and latency"""
+    request = urllib.request.Request(f"{url}/api/generate-video", data=body,
+                                     headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError) as e:
+        return {'status': None, 'error': str(e), 'latency': time.perf_counter() - started}
+    return {'status': status, 'latency': time.perf_counter() - started}
+
+
+def run_closed_loop(url: str, body: bytes, concurrency: int, requests: int, timeout: float) -> List[Dict]:
+    """`concurrency` clients send requests back to back until `requests` have been sent"""
+    results: List[Dict] = []
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def client():
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    return
+                remaining[0] -= 1
+            result = send_request(url, body, timeout)
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_open_loop(url: str, body: bytes, rate: float, requests: int, timeout: float,
+                  seed: int = 7) -> List[Dict]:
+    """Send `requests` requests with exponential gaps averaging 1/rate seconds"""
+    results: List[Dict] = []
+    lock = threading.Lock()
+    rng = random.Random(seed)
+
+    def send():
+        result = send_request(url, body, timeout)
+        with lock:
+            results.append(result)
+
+    threads = []
+    next_arrival = time.perf_counter()
+    for _ in range(requests):
+        time.sleep(max(0.0, next_arrival - time.perf_counter()))
+        thread = threading.Thread(target=send, daemon=True)
+        thread.start()
+        threads.append(thread)
+        next_arrival += rng.expovariate(rate)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    """Prometheus text exposition -> {'name{labels}': value} (histogram buckets skipped)"""
+    samples = {}
+    for line in text.splitlines():
+        match = _SAMPLE_LINE.match(line)
+        if not match or match.group(1).endswith('_bucket'):
+            continue
+        try:
+            samples[match.group(1) + (match.group(2) or '')] = float(match.group(3))
+        except ValueError:
+            continue
+    return samples
+
+
+class MetricsSampler:
+    def __init__(self, url: str, interval: float = 1.0):
+        """
+        Scrapes the server's /api/metrics in the background during a load level
+
+        Args:
+            url: Server base URL
+            interval: Seconds between scrapes
+        """
+        self.url = url
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+
+    def scrape(self) -> Optional[Dict[str, float]]:
+        try:
+            with urllib.request.urlopen(f"{self.url}/api/metrics", timeout=10) as response:
+                return parse_metrics(response.read().decode('utf-8'))
+        except (urllib.error.URLError, OSError):
+            return None
+
+    def _run(self):
+        while True:
+            sample = self.scrape()
+            if sample is not None:
+                self.samples.append(sample)
+            if self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        # A last scrape so counters cover the whole level
+        sample = self.scrape()
+        if sample is not None:
+            self.samples.append(sample)
+
+    def summary(self, wall_seconds: float) -> Dict:
+        """Server-side usage over the level (empty if the server exports no metrics)"""
+        if len(self.samples) < 2:
+            return {}
+        first, last = self.samples[0], self.samples[-1]
+
+        def delta(name: str) -> float:
+            return last.get(name, 0.0) - first.get(name, 0.0)
+
+        def peak(name: str) -> float:
+            return max(sample.get(name, 0.0) for sample in self.samples)
+
+        render_cpu = delta('video_render_cpu_seconds_total')
+        server_cpu = delta('process_cpu_seconds_total') + delta('process_children_cpu_seconds_total')
+        free_disk = [sample[name] for sample in self.samples for name in sample
+                     if name.startswith('video_disk_free_bytes')]
+        return {
+            'scrapes': len(self.samples),
+            'peakRunning': peak('video_jobs_running'),
+            'peakQueued': peak('video_jobs_queued'),
+            'meanQueued': statistics.mean(sample.get('video_jobs_queued', 0.0) for sample in self.samples),
+            'renderSlots': last.get('video_render_slots'),
+            'renderCpuSeconds': render_cpu,
+            'serverCpuSeconds': server_cpu,
+            'cpuCoresBusy': (render_cpu + server_cpu) / wall_seconds if wall_seconds else 0.0,
+            'peakRssBytes': peak('process_resident_memory_bytes'),
+            'minFreeDiskBytes': min(free_disk) if free_disk else None,
+            'uploadBytes': sum(value - first.get(name, 0.0) for name, value in last.items()
+                               if name.startswith('video_upload_bytes_total')),
+            'peakEventSubscribers': peak('video_event_subscribers'),
+        }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(results: List[Dict], wall_seconds: float, video_seconds: float) -> Dict:
+    """Outcome counts, error rate, throughput and latency percentiles of a level"""
+    statuses: Dict[str, int] = {}
+    for result in results:
+        key = str(result['status']) if result['status'] is not None else 'error'
+        statuses[key] = statuses.get(key, 0) + 1
+    completed = sorted(r['latency'] for r in results if r['status'] == 200)
+    failed = [r for r in results if r['status'] not in (200, 429)]
+    summary = {
+        'requests': len(results),
+        'wallSeconds': wall_seconds,
+        'statuses': statuses,
+        'completed': len(completed),
+        'rejected': statuses.get('429', 0),
+        'failed': len(failed),
+        'errorRate': len(failed) / len(results) if results else 0.0,
+        'rejectionRate': statuses.get('429', 0) / len(results) if results else 0.0,
+        'videosPerMinute': len(completed) / wall_seconds * 60 if wall_seconds else 0.0,
+        'videoSecondsPerSecond': len(completed) * video_seconds / wall_seconds if wall_seconds else 0.0,
+        'errors': sorted({r.get('error') or str(r['status']) for r in failed})[:5],
+    }
+    if completed:
+        summary['latency'] = {
+            'mean': statistics.mean(completed),
+            'max': completed[-1],
+            **{f"p{q}": percentile(completed, q) for q in PERCENTILES},
+        }
+    return summary
+
+
+def run_level(url: str, body: bytes, mode: str, level: float, requests: int, timeout: float,
+              video_seconds: float, sample_interval: float) -> Dict:
+    """Run one load level while sampling the server's metrics"""
+    sampler = MetricsSampler(url, sample_interval)
+    sampler.start()
+    started = time.perf_counter()
+    if mode == 'concurrency':
+        results = run_closed_loop(url, body, int(level), requests, timeout)
+    else:
+        results = run_open_loop(url, body, level, requests, timeout)
+    wall = time.perf_counter() - started
+    sampler.stop()
+    return {
+        'mode': mode,
+        'level': level,
+        'summary': summarize(results, wall, video_seconds),
+        'server': sampler.summary(wall),
+    }
+
+
+def print_level(level: Dict):
+    summary, server = level['summary'], level['server']
+    label = (f"{level['level']:g} concurrent" if level['mode'] == 'concurrency'
+             else f"{level['level']:g} req/s")
+    print(f"\n📊 {label}: {summary['requests']} request(s) in {summary['wallSeconds']:.1f}s")
+    print(f"   ✅ {summary['completed']} completed, ⏳ {summary['rejected']} rejected (429), "
+          f"❌ {summary['failed']} failed ({summary['errorRate']:.0%} errors)")
+    if 'latency' in summary:
+        latency = summary['latency']
+        percentiles = ', '.join(f"p{q} {latency[f'p{q}']:.1f}s" for q in PERCENTILES)
+        print(f"   Latency: mean {latency['mean']:.1f}s, {percentiles}, max {latency['max']:.1f}s")
+        print(f"   Throughput: {summary['videosPerMinute']:.1f} videos/min, "
+              f"{summary['videoSecondsPerSecond']:.2f}s of video per second")
+    if server:
+        print(f"   Server: peak {server['peakRunning']:.0f}/{server['renderSlots'] or 0:.0f} slots busy, "
+              f"queue peak {server['peakQueued']:.0f} (mean {server['meanQueued']:.1f}), "
+              f"{server['cpuCoresBusy']:.2f} cores busy "
+              f"(FFmpeg {server['renderCpuSeconds']:.0f}s, server {server['serverCpuSeconds']:.0f}s CPU)")
+        free = server['minFreeDiskBytes']
+        print(f"   Memory: {server['peakRssBytes'] / (1024**2):.0f} MB peak RSS (HTTP process), "
+              f"uploads {server['uploadBytes'] / (1024**2):.0f} MB"
+              + (f", min free disk {free / (1024**3):.1f} GB" if free is not None else ""))
+    for error in summary['errors']:
+        print(f"   ❌ {error}")
+
+
+def start_server(port: int, render_workers: int, work_dir: str) -> subprocess.Popen:
+    """
+    Start serve.py in a scratch directory and wait until it answers
+
+    Its uploads, videos, catalog and render metrics stay in work_dir.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'serve.py')
+    log = open(os.path.join(work_dir, 'server.log'), 'w')
+    process = subprocess.Popen(
+        [sys.executable, script, '--host', '127.0.0.1', '--port', str(port),
+         '--render-workers', str(render_workers)],
+        cwd=work_dir, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited early, see {log.name}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=2)
+            return process
+        except urllib.error.HTTPError:
+            return process  # answering, just not ready (e.g. low disk)
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Server did not answer within {SERVER_START_TIMEOUT}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the render API with synthetic requests")
+    parser.add_argument('--url', default='http://localhost:5001')
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--concurrency', default=None,
+                      help="Comma-separated client counts, one level each (default: 4)")
+    load.add_argument('--rate', help="Comma-separated arrival rates in requests/second (open loop)")
+    parser.add_argument('--requests', type=int, default=16, help="Requests per level (default: 16)")
+    parser.add_argument('--scenes', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=2.0, help="Seconds of audio per scene")
+    parser.add_argument('--image-scale', type=float, default=1.0,
+                        help="Image size relative to the provider's output (default: 1)")
+    parser.add_argument('--words', type=int, default=30, help="Caption words per scene")
+    parser.add_argument('--aspect-ratio', default='16:9')
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--no-captions', action='store_true')
+    parser.add_argument('--timeout', type=float, default=900, help="Seconds per request")
+    parser.add_argument('--sample-interval', type=float, default=1.0,
+                        help="Seconds between /api/metrics scrapes")
+    parser.add_argument('--start-server', action='store_true',
+                        help="Start serve.py in a scratch directory for the test")
+    parser.add_argument('--port', type=int, default=5099, help="Port of the started server")
+    parser.add_argument('--render-workers', type=int, default=2, help="Render workers of the started server")
+    parser.add_argument('--json', help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.rate:
+        mode, levels = 'rate', [float(value) for value in args.rate.split(',')]
+    else:
+        mode, levels = 'concurrency', [int(value) for value in (args.concurrency or '4').split(',')]
+
+    work_dir = tempfile.mkdtemp(prefix="load_generator_")
+    server = None
+    try:
+        payload = build_payload(Fixtures(work_dir), args.scenes, args.duration, args.aspect_ratio,
+                                args.fps, not args.no_captions, args.image_scale, args.words)
+        body = json.dumps(payload).encode('utf-8')
+        if args.start_server:
+            print(f"🚀 Starting a local server with {args.render_workers} render worker(s)...")
+            server = start_server(args.port, args.render_workers, work_dir)
+            args.url = f"http://127.0.0.1:{args.port}"
+
+        print(f"🚦 Load test of {args.url}: {args.requests} request(s) per level")
+        print(f"   {args.scenes} scene(s) x {args.duration:g}s, {args.aspect_ratio}, "
+              f"images x{args.image_scale:g}, {len(body) / (1024**2):.1f} MB per request")
+        report = {
+            'createdAt': datetime.now().isoformat(timespec='seconds'),
+            'url': args.url,
+            'payload': {'scenes': args.scenes, 'duration': args.duration, 'aspectRatio': args.aspect_ratio,
+                        'imageScale': args.image_scale, 'fps': args.fps, 'captions': not args.no_captions,
+                        'bytes': len(body)},
+            'levels': [],
+        }
+        for level in levels:
+            result = run_level(args.url, body, mode, level, args.requests, args.timeout,
+                               args.scenes * args.duration, args.sample_interval)
+            print_level(result)
+            report['levels'].append(result)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=SERVER_START_TIMEOUT)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report: {args.json}")
+    failed = sum(level['summary']['failed'] for level in report['levels'])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
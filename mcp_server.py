@@ -7,12 +7,16 @@ Provides MCP interface for generating AI-powered faceless videos
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import functools
 import os
 import sys
+import time
 import json
-import base64
+import threading
 from pathlib import Path
-from typing import Optional, Any
+from typing import Optional, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import traceback
 
@@ -28,190 +32,192 @@ SCRIPT_DIR = Path(__file__).parent.resolve()
 sys.path.insert(0, str(SCRIPT_DIR))
 
 # Import video generation modules
-from video_generator import VideoGenerator
-
-# Import environment variables
-from dotenv import load_dotenv
-load_dotenv(SCRIPT_DIR / '.env.local')
+from video_generator import VideoGenerator, RenderContext, RenderCancelled
+from video_catalog import VideoCatalog, probe_video, format_timings
+from admission import AdmissionController, AdmissionRejected
+from asset_pipeline import generate_scene_assets, get_provider_limits
+from asset_cache import AssetCache, format_hit_rate
+from providers import get_provider, sniff_image_type, IMAGE_EXTENSIONS
+from provider_scheduler import ProviderScheduler, get_rate_limits
+from job_registry import JobRegistry
+from tracing import span
 
 # Configuration - use absolute paths
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 OUTPUT_DIR = SCRIPT_DIR / "generated_videos"
 TEMP_DIR = SCRIPT_DIR / "temp_uploads"
-
-# Create directories if they don't exist
-OUTPUT_DIR.mkdir(exist_ok=True)
-TEMP_DIR.mkdir(exist_ok=True)
-
-# Global video generator instance
-video_generator = VideoGenerator(output_dir=str(OUTPUT_DIR))
-
-# MCP Server instance
-app = Server("ai-video-weaver")
-
-
-async def generate_storyboard(topic: str, duration: float) -> dict:
-    """
-    Generate storyboard using Gemini API
-
-    Args:
-        topic: Video topic
-        duration: Duration in minutes
-
-    Returns:
-        Dictionary with scenes and grounding chunks
-    """
-    try:
-        import google.generativeai as genai
-
-        genai.configure(api_key=GEMINI_API_KEY)
-
-        # Calculate parameters
-        total_words = round(duration * 150)
-        num_scenes = max(3, round(duration * 7))
-        words_per_scene = round(total_words / num_scenes)
-
-        prompt = f"""Create a video storyboard about "{topic}" with a total duration of approximately {duration} minute(s).
-The total word count for all voice-overs should be around {total_words} words.
-Break it down into {num_scenes} short, dynamic scenes. For each scene, provide:
-1. A voice-over script of about {words_per_scene} words. This will be displayed as on-screen text.
-2. A detailed image prompt for an AI image generator that visually represents the scene.
-3. A short caption (this will not be used, but include it for compatibility).
-Respond ONLY with a valid JSON object with a "scenes" key. The "scenes" key must contain an array of exactly {num_scenes} scene objects, each with "caption", "voiceOver", and "imagePrompt" properties. Do not wrap the JSON in markdown backticks."""
-
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=0.9,
-            )
+RENDER_QUEUE_TIMEOUT = 1800
+# Threads for the jobs' blocking file and cache I/O (temp files, asset cache, probes)
+IO_WORKERS = int(os.getenv('IO_WORKERS', '4'))
+
+# Shared services, created by init_runtime() on the first tool call (or
+# batch run) so the server answers the MCP handshake without touching the
+# disk, the provider SDK or FFmpeg
+catalog: Optional[VideoCatalog] = None
+admission: Optional[AdmissionController] = None
+provider = None
+scheduler: Optional[ProviderScheduler] = None
+SCENE_RETRIES = 2
+asset_cache: Optional[AssetCache] = None
+video_generator: Optional[VideoGenerator] = None
+PROVIDER_EXECUTOR: Optional[ThreadPoolExecutor] = None
+RENDER_EXECUTOR: Optional[ThreadPoolExecutor] = None
+IO_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_runtime_lock = threading.Lock()
+
+
+def init_runtime():
+    """Create the shared services once (safe to call from any thread)"""
+    global catalog, admission, provider, scheduler, SCENE_RETRIES, asset_cache
+    global video_generator, PROVIDER_EXECUTOR, RENDER_EXECUTOR, IO_EXECUTOR
+
+    with _runtime_lock:
+        if video_generator is not None:
+            return
+
+        # Import environment variables
+        from dotenv import load_dotenv
+        load_dotenv(SCRIPT_DIR / '.env.local')
+
+        # Create directories if they don't exist
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        TEMP_DIR.mkdir(exist_ok=True)
+
+        # Catalog of generated videos (shared with the API server)
+        catalog = VideoCatalog(str(OUTPUT_DIR / ".video_catalog.db"))
+        backfilled = catalog.backfill(str(OUTPUT_DIR))
+        if backfilled:
+            print(f"📚 Catalog backfilled {backfilled} existing video(s)", file=sys.stderr)
+
+        # Admission control for renders (shares calibration data with the API server)
+        admission = AdmissionController(
+            metrics_path=str(OUTPUT_DIR / "render_metrics.jsonl"),
+            disk_path=str(OUTPUT_DIR)
         )
 
-        # Clean response
-        clean_text = response.text.strip().replace('```json', '').replace('```', '').strip()
-        parsed = json.loads(clean_text)
-
-        # Add IDs and use voiceOver as caption
-        scenes = []
-        for index, scene in enumerate(parsed['scenes']):
-            scenes.append({
-                'id': index + 1,
-                'caption': scene['voiceOver'],
-                'voiceOver': scene['voiceOver'],
-                'imagePrompt': scene['imagePrompt']
-            })
-
-        return {'scenes': scenes, 'groundingChunks': []}
-
-    except Exception as e:
-        print(f"❌ Error generating storyboard: {e}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
-        raise
-
+        # Storyboard/image/speech backend (VIDEO_PROVIDER=local runs fully offline)
+        provider = get_provider(api_key=os.getenv('GEMINI_API_KEY'))
 
-async def generate_image(prompt: str, aspect_ratio: str = "16:9") -> tuple[bytes, str]:
-    """
-    Generate image using Google Imagen
-
-    Args:
-        prompt: Image generation prompt
-        aspect_ratio: Aspect ratio (16:9, 9:16, 1:1, etc.)
-
-    Returns:
-        Tuple of (image_bytes, mime_type)
-    """
-    try:
-        import google.generativeai as genai
-        from PIL import Image
-        import io
-
-        genai.configure(api_key=GEMINI_API_KEY)
+        # Paces provider requests of all jobs (STORYBOARD_RPM / IMAGE_RPM / SPEECH_RPM)
+        # and retries quota errors with backoff
+        scheduler = ProviderScheduler(get_rate_limits(provider))
+        SCENE_RETRIES = int(os.getenv('SCENE_RETRIES', '2'))
 
-        # Use Imagen 3 model
-        model = genai.ImageGenerationModel('imagen-3.0-generate-001')
-
-        # Generate image
-        result = model.generate_images(
-            prompt=prompt,
-            number_of_images=1,
-            aspect_ratio=aspect_ratio,
-            safety_filter_level="block_some",
-            person_generation="allow_adult"
+        # Cache of generated images and speech (disable with ASSET_CACHE=0)
+        asset_cache = AssetCache(
+            str(SCRIPT_DIR / "asset_cache"),
+            max_bytes=int(os.getenv('ASSET_CACHE_MB', '1024')) * 1024 * 1024,
+            enabled=os.getenv('ASSET_CACHE', '1') != '0'
         )
 
-        # Get the PIL image
-        pil_image = result.images[0]._pil_image
+        # The Gemini SDK, FFmpeg renders and file I/O block, so they run on dedicated
+        # thread pools (none on the loop's default executor) and the stdio event
+        # loop stays free to answer other tool calls
+        PROVIDER_EXECUTOR = ThreadPoolExecutor(
+            max_workers=sum(get_provider_limits().values()) + 2,
+            thread_name_prefix="provider"
+        )
+        RENDER_EXECUTOR = ThreadPoolExecutor(
+            max_workers=admission.max_concurrent,
+            thread_name_prefix="render"
+        )
+        IO_EXECUTOR = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
 
-        # Convert PIL image to bytes
-        img_byte_arr = io.BytesIO()
-        pil_image.save(img_byte_arr, format='JPEG', quality=95)
-        image_bytes = img_byte_arr.getvalue()
+        # Set last: other threads treat a generator as a finished runtime
+        video_generator = VideoGenerator(output_dir=str(OUTPUT_DIR), catalog=catalog,
+                                         cost_model=admission.model)
 
-        return image_bytes, 'image/jpeg'
 
-    except Exception as e:
-        print(f"❌ Error generating image: {e}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
-        raise
+# Video jobs of this server (status queries and cancellation)
+jobs = JobRegistry()
 
+# MCP Server instance
+app = Server("ai-video-weaver")
 
-async def generate_speech(text: str) -> bytes:
-    """
-    Generate speech using Gemini TTS
 
-    Args:
-        text: Text to convert to speech
+async def run_blocking(executor: Optional[ThreadPoolExecutor], func: Callable, *args, **kwargs):
+    """Run a blocking call on an executor and await its result (trace spans nest across)"""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(executor, functools.partial(context.run, func, *args, **kwargs))
 
-    Returns:
-        Audio bytes (WAV format)
-    """
-    try:
-        import google.generativeai as genai
 
-        genai.configure(api_key=GEMINI_API_KEY)
-
-        model = genai.GenerativeModel('gemini-2.0-flash-exp')
-
-        # Configure for audio output
-        generation_config = genai.GenerationConfig(
-            response_modalities=["AUDIO"]
-        )
+async def generate_storyboard(topic: str, duration: float) -> dict:
+    """Generate storyboard on the provider executor, within the model's rate limit"""
+    return await scheduler.call(provider.storyboard_model, lambda: run_blocking(
+        PROVIDER_EXECUTOR, provider.generate_storyboard, topic, duration
+    ))
 
-        response = model.generate_content(
-            f"Say with a clear and engaging tone: {text}",
-            generation_config=generation_config
-        )
 
-        # Extract audio data
-        if response.candidates and len(response.candidates) > 0:
-            candidate = response.candidates[0]
-            if candidate.content and candidate.content.parts:
-                for part in candidate.content.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        audio_b64 = part.inline_data.data
-                        audio_bytes = base64.b64decode(audio_b64)
-                        return audio_bytes
+async def generate_image(prompt: str, aspect_ratio: str = "16:9") -> tuple[bytes, str]:
+    """Generate image on the provider executor, within the model's rate limit"""
+    max_size = video_generator.get_source_size(aspect_ratio)
+    return await scheduler.call(provider.image_model, lambda: run_blocking(
+        PROVIDER_EXECUTOR, provider.generate_image, prompt, aspect_ratio, max_size
+    ))
 
-        raise Exception("No audio data in response")
 
-    except Exception as e:
-        print(f"❌ Error generating speech: {e}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
-        raise
+async def generate_speech(text: str) -> bytes:
+    """Generate speech on the provider executor, within the model's rate limit"""
+    return await scheduler.call(provider.speech_model, lambda: run_blocking(
+        PROVIDER_EXECUTOR, provider.generate_speech, text
+    ))
 
 
 async def save_file_from_bytes(data: bytes, extension: str) -> str:
-    """Save bytes to a temp file"""
+    """Save bytes to a temp file (written off the event loop)"""
     import uuid
     filename = f"{uuid.uuid4()}{extension}"
     filepath = TEMP_DIR / filename
 
-    with open(filepath, 'wb') as f:
-        f.write(data)
+    with span('save', bytes=len(data)):
+        await run_blocking(IO_EXECUTOR, filepath.write_bytes, data)
 
     return str(filepath)
 
 
+def remove_scene_files(scenes: list):
+    """Remove the temp image/audio files of processed scenes"""
+    for scene in scenes:
+        for key in ('image_path', 'audio_path'):
+            try:
+                os.remove(scene[key])
+            except OSError:
+                pass
+
+
+# Parameters of generate_video and start_video_job
+VIDEO_JOB_PROPERTIES = {
+    "topic": {
+        "type": "string",
+        "description": "The topic or subject for the video (e.g., 'The History of Space Exploration', 'How Photosynthesis Works')"
+    },
+    "duration": {
+        "type": "number",
+        "description": "Duration of the video in minutes (e.g., 1, 2, 3). Recommended: 1-3 minutes",
+        "default": 1,
+        "minimum": 0.5,
+        "maximum": 10
+    },
+    "aspect_ratio": {
+        "type": "string",
+        "description": "Video aspect ratio",
+        "enum": ["16:9", "9:16", "1:1", "4:3", "3:4"],
+        "default": "16:9"
+    },
+    "image_style": {
+        "type": "string",
+        "description": "Visual style for the images",
+        "enum": ["Default", "Photorealistic", "Cinematic", "Cartoon", "Anime", "Fantasy Art", "Watercolor", "Cyberpunk"],
+        "default": "Default"
+    },
+    "use_cache": {
+        "type": "boolean",
+        "description": "Reuse cached images and voiceovers for prompts generated before",
+        "default": True
+    }
+}
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available MCP tools"""
@@ -225,42 +231,97 @@ async def list_tools() -> list[Tool]:
 4. Compile everything into a final video with transitions and captions
 
 The process takes several minutes depending on video length.""",
+            inputSchema={
+                "type": "object",
+                "properties": VIDEO_JOB_PROPERTIES,
+                "required": ["topic"]
+            }
+        ),
+        Tool(
+            name="start_video_job",
+            description="""Start generating a video in the background and return a job id right away.
+Same parameters as generate_video. Progress is sent as log notifications; use get_job_status
+to check on the job and cancel_job to stop it.""",
+            inputSchema={
+                "type": "object",
+                "properties": VIDEO_JOB_PROPERTIES,
+                "required": ["topic"]
+            }
+        ),
+        Tool(
+            name="get_job_status",
+            description="Get the status, current stage, progress and recent log of a video job",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "topic": {
+                    "job_id": {
                         "type": "string",
-                        "description": "The topic or subject for the video (e.g., 'The History of Space Exploration', 'How Photosynthesis Works')"
-                    },
-                    "duration": {
-                        "type": "number",
-                        "description": "Duration of the video in minutes (e.g., 1, 2, 3). Recommended: 1-3 minutes",
-                        "default": 1,
-                        "minimum": 0.5,
-                        "maximum": 10
-                    },
-                    "aspect_ratio": {
+                        "description": "Job id returned by start_video_job"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+        Tool(
+            name="cancel_job",
+            description="Cancel a video job; its FFmpeg processes and pending AI requests are stopped",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
                         "type": "string",
-                        "description": "Video aspect ratio",
-                        "enum": ["16:9", "9:16", "1:1", "4:3", "3:4"],
-                        "default": "16:9"
+                        "description": "Job id returned by start_video_job"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+        Tool(
+            name="generate_batch",
+            description="""Generate every video listed in a JSONL manifest (one job per line with
+"topic" and optional "id", "duration", "aspect_ratio", "image_style", "use_cache").
+Jobs run concurrently and share the asset cache; a results JSONL with per-job status,
+output path and metrics is written as jobs finish.""",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "manifest_path": {
+                        "type": "string",
+                        "description": "Path of the JSONL manifest"
                     },
-                    "image_style": {
+                    "results_path": {
                         "type": "string",
-                        "description": "Visual style for the images",
-                        "enum": ["Default", "Photorealistic", "Cinematic", "Cartoon", "Anime", "Fantasy Art", "Watercolor", "Cyberpunk"],
-                        "default": "Default"
+                        "description": "Path of the results JSONL (default: <manifest>.results.jsonl)"
+                    },
+                    "max_parallel": {
+                        "type": "integer",
+                        "description": "Jobs in flight at once (default: render slots + 1)",
+                        "minimum": 1
                     }
                 },
-                "required": ["topic"]
+                "required": ["manifest_path"]
             }
         ),
         Tool(
             name="list_videos",
-            description="List all generated videos in the output directory",
+            description="List generated videos (newest first), one page at a time",
             inputSchema={
                 "type": "object",
-                "properties": {},
+                "properties": {
+                    "page": {
+                        "type": "integer",
+                        "description": "Page number, starting at 1",
+                        "default": 1,
+                        "minimum": 1
+                    },
+                    "page_size": {
+                        "type": "integer",
+                        "description": "Number of videos per page",
+                        "default": 20,
+                        "minimum": 1,
+                        "maximum": 100
+                    }
+                },
             }
         ),
         Tool(
@@ -285,8 +346,19 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
     """Handle tool calls"""
 
     try:
+        if video_generator is None:
+            await run_blocking(None, init_runtime)
+
         if name == "generate_video":
             return await handle_generate_video(arguments)
+        elif name == "start_video_job":
+            return await handle_start_video_job(arguments)
+        elif name == "get_job_status":
+            return await handle_get_job_status(arguments)
+        elif name == "cancel_job":
+            return await handle_cancel_job(arguments)
+        elif name == "generate_batch":
+            return await handle_generate_batch(arguments)
         elif name == "list_videos":
             return await handle_list_videos(arguments)
         elif name == "get_video_info":
@@ -299,88 +371,484 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent | ImageConten
         return [TextContent(type="text", text=error_msg)]
 
 
+def progress_notifier(session, progress_token=None, interval: float = 1.0) -> Callable:
+    """
+    Job listener that reports progress to the MCP client
+
+    Sends progress notifications when the client passed a progress token,
+    log message notifications otherwise (background jobs). Updates within
+    the same stage are throttled to one per interval seconds.
+    """
+    loop = asyncio.get_running_loop()
+    last = {'time': 0.0, 'stage': None}
+
+    async def send(job_id: str, stage: str, progress: float):
+        try:
+            if progress_token is not None:
+                await session.send_progress_notification(progress_token, round(progress * 100, 1), 100)
+            else:
+                await session.send_log_message(
+                    level="info", data=f"Job {job_id}: {stage} ({progress:.0%})", logger="video-job"
+                )
+        except Exception as e:
+            print(f"⚠️  Could not send progress for job {job_id}: {e}", file=sys.stderr)
+
+    def notify(job):
+        now = time.monotonic()
+        if job.stage == last['stage'] and not job.finished and now - last['time'] < interval:
+            return
+        last['time'], last['stage'] = now, job.stage
+        loop.create_task(send(job.job_id, job.stage, job.progress))
+
+    return notify
+
+
+def start_job(arguments: dict, admission_retries: int = 0):
+    """
+    Register a video job and start it in the background
+
+    Args:
+        arguments: Job parameters (topic, duration, aspect_ratio, ...)
+        admission_retries: Times the job waits out an admission rejection
+                           (keeping its storyboard) before failing
+    """
+    job = jobs.create({
+        'topic': arguments.get('topic'),
+        'duration': arguments.get('duration', 1),
+        'aspect_ratio': arguments.get('aspect_ratio', '16:9'),
+        'image_style': arguments.get('image_style', 'Default'),
+        'use_cache': arguments.get('use_cache', True),
+        'admission_retries': admission_retries,
+    })
+    job.task = asyncio.create_task(run_traced_job(job))
+    return job
+
+
+async def run_traced_job(job):
+    """Run a job inside its root trace span"""
+    with span('job', job_id=job.job_id, topic=job.params['topic']):
+        await run_video_job(job)
+
+
 async def handle_generate_video(arguments: dict) -> list[TextContent]:
-    """Handle video generation request"""
+    """Handle video generation request (waits for the job, with progress notifications)"""
+
+    if not arguments.get('topic'):
+        return [TextContent(type="text", text="❌ Error: 'topic' parameter is required")]
 
-    topic = arguments.get('topic')
-    duration = arguments.get('duration', 1)
-    aspect_ratio = arguments.get('aspect_ratio', '16:9')
-    image_style = arguments.get('image_style', 'Default')
+    job = start_job(arguments)
+    meta = app.request_context.meta
+    progress_token = meta.progressToken if meta else None
+    if progress_token is not None:
+        job.add_listener(progress_notifier(app.request_context.session, progress_token))
 
-    if not topic:
+    try:
+        await asyncio.shield(job.task)
+    except asyncio.CancelledError:
+        # The client gave up on the request: stop the job too
+        job.cancel()
+        raise
+
+    return [TextContent(type="text", text="\n".join(job.messages))]
+
+
+async def handle_start_video_job(arguments: dict) -> list[TextContent]:
+    """Start a video job in the background and return its id right away"""
+
+    if not arguments.get('topic'):
         return [TextContent(type="text", text="❌ Error: 'topic' parameter is required")]
 
-    output_messages = []
+    job = start_job(arguments)
+    job.add_listener(progress_notifier(app.request_context.session))
+
+    return [TextContent(type="text", text="\n".join([
+        f"🚀 Started video job {job.job_id} for topic: '{job.params['topic']}'",
+        f"Use get_job_status with job_id '{job.job_id}' to follow it, or cancel_job to stop it.",
+    ]))]
+
+
+async def handle_get_job_status(arguments: dict) -> list[TextContent]:
+    """Report the status, stage and progress of a video job"""
+
+    job_id = arguments.get('job_id')
+    job = jobs.get(job_id) if job_id else None
+    if job is None:
+        return [TextContent(type="text", text=f"❌ Unknown job: {job_id}")]
+
+    status = job.to_dict()
+    output_lines = [
+        f"📋 Job {job.job_id}: {status['status']}",
+        f"   Topic: {job.params['topic']}",
+        f"   Stage: {status['stage']}",
+        f"   Progress: {status['progress']:.0%}",
+        f"   Elapsed: {(status['finishedAt'] or time.time()) - status['createdAt']:.0f} seconds",
+    ]
+    if status['outputPath']:
+        output_lines.append(f"   Output file: {status['outputPath']}")
+    if status['error']:
+        output_lines.append(f"   Error: {status['error']}")
+
+    recent = [line for line in job.messages if line.strip()][-10:]
+    if recent:
+        output_lines.append("")
+        output_lines.append("Recent log:")
+        output_lines.extend(recent)
+
+    return [TextContent(type="text", text="\n".join(output_lines))]
+
+
+async def handle_cancel_job(arguments: dict) -> list[TextContent]:
+    """Cancel a running or queued video job"""
+
+    job_id = arguments.get('job_id')
+    job = jobs.get(job_id) if job_id else None
+    if job is None:
+        return [TextContent(type="text", text=f"❌ Unknown job: {job_id}")]
+    if not job.cancel():
+        return [TextContent(type="text", text=f"ℹ️  Job {job_id} already {job.status}")]
+    return [TextContent(type="text", text=f"🛑 Job {job_id} cancelled")]
+
+
+# Keys a batch manifest line may set (topic is required)
+MANIFEST_KEYS = ('id', 'topic', 'duration', 'aspect_ratio', 'image_style', 'use_cache')
+# Times a batch job turned away by admission control is retried
+BATCH_ADMISSION_RETRIES = 10
+
+
+def load_manifest(manifest_path: str) -> list:
+    """
+    Read a JSONL batch manifest
+
+    Blank lines and lines starting with '#' are skipped.
+
+    Returns:
+        List of (line number, job parameters or None, error or None)
+    """
+    entries = []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                entries.append((line_no, None, f"Invalid JSON: {e}"))
+                continue
+            if not isinstance(entry, dict) or not entry.get('topic'):
+                entries.append((line_no, None, "Missing 'topic'"))
+                continue
+            unknown = set(entry) - set(MANIFEST_KEYS)
+            if unknown:
+                entries.append((line_no, None, f"Unknown keys: {', '.join(sorted(unknown))}"))
+                continue
+            entries.append((line_no, entry, None))
+    return entries
+
+
+async def run_batch(manifest_path: str, results_path: Optional[str] = None,
+                    max_parallel: Optional[int] = None,
+                    on_job_done: Optional[Callable[[dict], None]] = None,
+                    use_cache: Optional[bool] = None) -> dict:
+    """
+    Generate every video of a JSONL manifest
+
+    Jobs run concurrently (up to max_parallel) through the shared provider
+    scheduler, asset cache and render pool, so one job's asset generation
+    overlaps another's encoding. One result line per manifest entry is
+    appended to the results file as soon as the entry finishes.
+
+    Args:
+        manifest_path: JSONL file, one job per line (see MANIFEST_KEYS)
+        results_path: Results JSONL (default: <manifest>.results.jsonl)
+        max_parallel: Jobs in flight at once (default: render slots + 1,
+                      capped by the admission queue size)
+        on_job_done: Called with each result record
+        use_cache: Overrides every entry's use_cache (False for cold timing runs)
+
+    Returns:
+        Summary with counts per status, wall time and results path
+    """
+    await run_blocking(None, init_runtime)
+    entries = await run_blocking(IO_EXECUTOR, load_manifest, manifest_path)
+    results_path = results_path or str(Path(manifest_path).with_suffix('.results.jsonl'))
+    max_parallel = min(max_parallel or admission.max_concurrent + 1, admission.max_queue)
+    semaphore = asyncio.Semaphore(max_parallel)
+    write_lock = asyncio.Lock()
+    counts = {}
+    batch_start = time.time()
+
+    # File I/O stays off the event loop, which keeps serving MCP requests
+    results_file = await run_blocking(IO_EXECUTOR, open, results_path, 'w', encoding='utf-8')
+
+    def write_result(record: dict):
+        results_file.write(json.dumps(record) + "\n")
+        results_file.flush()
+
+    async def run_entry(line_no: int, entry: Optional[dict], error: Optional[str]):
+        record = {'line': line_no, 'id': (entry or {}).get('id'), 'topic': (entry or {}).get('topic')}
+        if entry is None:
+            record.update({'status': 'invalid', 'error': error})
+        else:
+            async with semaphore:
+                job_start = time.time()
+                # A job turned away by admission control waits for the backlog
+                # to drain and retries with the storyboard it already has
+                if use_cache is not None:
+                    entry = dict(entry, use_cache=use_cache)
+                job = start_job(entry, admission_retries=BATCH_ADMISSION_RETRIES)
+                await job.task
+                status = job.to_dict()
+                record.update({
+                    'jobId': job.job_id,
+                    'status': status['status'],
+                    'outputPath': status['outputPath'],
+                    'error': status['error'],
+                    'wallSeconds': round(time.time() - job_start, 2),
+                    **status['metrics'],
+                })
+
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+        async with write_lock:
+            await run_blocking(IO_EXECUTOR, write_result, record)
+        if on_job_done:
+            on_job_done(record)
+
+    try:
+        await asyncio.gather(*(run_entry(*entry) for entry in entries))
+    finally:
+        await run_blocking(IO_EXECUTOR, results_file.close)
+
+    return {
+        'jobs': len(entries),
+        'counts': counts,
+        'wallSeconds': round(time.time() - batch_start, 2),
+        'maxParallel': max_parallel,
+        'resultsPath': os.path.abspath(results_path),
+    }
+
+
+async def handle_generate_batch(arguments: dict) -> list[TextContent]:
+    """Generate all videos of a JSONL manifest"""
+
+    manifest_path = arguments.get('manifest_path')
+    if not manifest_path:
+        return [TextContent(type="text", text="❌ Error: 'manifest_path' parameter is required")]
+    if not os.path.exists(manifest_path):
+        return [TextContent(type="text", text=f"❌ Manifest not found: {manifest_path}")]
+
+    meta = app.request_context.meta
+    progress_token = meta.progressToken if meta else None
+    session = app.request_context.session
+    done = []
+
+    async def send_progress(count: int):
+        try:
+            await session.send_progress_notification(progress_token, count, None)
+        except Exception as e:
+            print(f"⚠️  Could not send batch progress: {e}", file=sys.stderr)
+
+    def job_done(record: dict):
+        done.append(record)
+        if progress_token is not None:
+            asyncio.get_running_loop().create_task(send_progress(len(done)))
+
+    summary = await run_batch(manifest_path, arguments.get('results_path'),
+                              arguments.get('max_parallel'), on_job_done=job_done)
+
+    output_lines = [
+        f"📦 Batch finished: {summary['jobs']} job(s) in {summary['wallSeconds']:.0f} seconds "
+        f"({summary['maxParallel']} at a time)",
+    ]
+    for status, count in sorted(summary['counts'].items()):
+        output_lines.append(f"   - {status}: {count}")
+    output_lines.append(f"📄 Results: {summary['resultsPath']}")
+    output_lines.append("")
+    for record in sorted(done, key=lambda r: r['line']):
+        outcome = record['outputPath'] if record['status'] == 'completed' else record.get('error')
+        output_lines.append(f"{record['line']}. [{record['status']}] {record['topic']}: {outcome}")
+
+    return [TextContent(type="text", text="\n".join(output_lines))]
+
+
+async def run_video_job(job):
+    """Generate the video of a job, updating its stage, progress and log"""
+
+    params = job.params
+    topic = params['topic']
+    duration = params['duration']
+    aspect_ratio = params['aspect_ratio']
+    image_style = params['image_style']
+    use_cache = params['use_cache'] and asset_cache.enabled
+
+    output_messages = job.messages
     output_messages.append(f"🎬 Starting video generation for topic: '{topic}'")
     output_messages.append(f"⏱️  Duration: {duration} minute(s)")
     output_messages.append(f"📐 Aspect Ratio: {aspect_ratio}")
     output_messages.append(f"🎨 Image Style: {image_style}")
     output_messages.append("")
+    ticket = None
+    context = None
+    ready_scenes = []  # Scenes whose assets are on disk (removed again on failure)
+    cache_hits = {'image': 0, 'speech': 0}
+    encoded = []
+    loop = asyncio.get_running_loop()
 
     try:
         # Step 1: Generate storyboard
+        job.set_progress("storyboard", 0.0)
         output_messages.append("📝 Step 1/4: Generating storyboard with Gemini AI...")
-        storyboard = await generate_storyboard(topic, duration)
+        with span('storyboard'):
+            storyboard = await generate_storyboard(topic, duration)
         scenes = storyboard['scenes']
+        if not scenes:
+            output_messages.append("❌ The storyboard has no scenes")
+            job.finish('failed', error="The storyboard has no scenes")
+            return
         output_messages.append(f"✅ Generated {len(scenes)} scenes")
         output_messages.append("")
 
-        # Step 2: Generate images
-        output_messages.append("🖼️  Step 2/4: Generating images for each scene...")
-        processed_scenes = []
-
-        for i, scene in enumerate(scenes):
-            output_messages.append(f"   Scene {i+1}/{len(scenes)}: {scene['caption'][:50]}...")
-
-            # Generate image
+        # Reject before paying for images and speech if the render node is saturated
+        width, height = video_generator.get_dimensions(aspect_ratio)
+        cost = admission.estimate([duration * 60 / len(scenes)] * len(scenes), width, height, 30)
+        for attempt in range(params['admission_retries'] + 1):
+            try:
+                ticket = admission.enqueue(cost)
+                break
+            except AdmissionRejected as e:
+                if attempt < params['admission_retries']:
+                    job.set_progress(f"render node busy, retrying in {e.retry_after}s")
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                output_messages.append(f"⏳ Render node is busy: {e}")
+                output_messages.append(f"   Please retry in about {e.retry_after} seconds.")
+                job.metrics['retryAfter'] = e.retry_after
+                job.finish('failed', error=f"Render node is busy, retry in about {e.retry_after} seconds")
+                return
+        job.metrics['admissionRetries'] = attempt
+
+        # Step 2: Generate images and voiceovers concurrently. This is network-bound,
+        # so the job only holds its queue place: the render slots keep other jobs' renders busy
+        limits = get_provider_limits()
+        job.set_progress("generating scene assets", 0.05)
+        output_messages.append("🖼️  Step 2/4: Generating scene assets...")
+        output_messages.append(f"   (up to {limits['image']} image and {limits['speech']} speech requests at a time)")
+
+        async def cached(kind: str, key: str, generate: Callable) -> bytes:
+            # Cache hits skip the provider entirely
+            if use_cache:
+                with span('cache_get') as cache_span:
+                    data = await run_blocking(IO_EXECUTOR, asset_cache.get, key)
+                    cache_span.set(hit=data is not None)
+                if data is not None:
+                    cache_hits[kind] += 1
+                    return data
+            with span('provider', kind=kind):
+                data = await generate()
+            if use_cache:
+                with span('cache_put'):
+                    await run_blocking(IO_EXECUTOR, asset_cache.put, key, data)
+            return data
+
+        async def make_image(index: int, scene: dict) -> str:
             final_prompt = scene['imagePrompt']
             if image_style != 'Default':
                 final_prompt = f"{scene['imagePrompt']}, in a {image_style.lower()} style"
 
-            image_bytes, mime_type = await generate_image(final_prompt, aspect_ratio)
-            image_path = await save_file_from_bytes(image_bytes, '.jpg')
-
-            # Generate audio
-            audio_bytes = await generate_speech(scene['voiceOver'])
-            audio_path = await save_file_from_bytes(audio_bytes, '.wav')
-
-            processed_scenes.append({
-                'image_path': image_path,
-                'audio_path': audio_path,
-                'caption': scene['caption'],
-                'voice_over': scene['voiceOver']
-            })
+            async def generate() -> bytes:
+                image_bytes, mime_type = await generate_image(final_prompt, aspect_ratio)
+                return image_bytes
+
+            key = asset_cache.make_key('image', provider.image_model, scene['imagePrompt'], image_style, aspect_ratio)
+            image_bytes = await cached('image', key, generate)
+            extension = IMAGE_EXTENSIONS.get(sniff_image_type(image_bytes), '.jpg')
+            return await save_file_from_bytes(image_bytes, extension)
+
+        async def make_speech(index: int, scene: dict) -> str:
+            key = asset_cache.make_key('speech', provider.speech_model, provider.speech_voice, scene['voiceOver'])
+            audio_bytes = await cached('speech', key, lambda: generate_speech(scene['voiceOver']))
+            return await save_file_from_bytes(audio_bytes, '.wav')
+
+        def scene_ready(index: int, processed: dict):
+            # Asset generation takes 5-40% of the job
+            ready_scenes.append(processed)
+            job.set_progress("generating scene assets", 0.05 + 0.35 * len(ready_scenes) / len(scenes))
+            output_messages.append(
+                f"   ✅ Scene {index+1}/{len(scenes)} assets generated: {scenes[index]['caption'][:50]}..."
+            )
 
-            output_messages.append(f"   ✅ Scene {i+1} assets generated")
+        processed_scenes = await generate_scene_assets(
+            scenes, make_image, make_speech, limits,
+            on_scene_ready=scene_ready, scene_retries=SCENE_RETRIES
+        )
 
         output_messages.append("")
-        output_messages.append("✅ All scene assets generated successfully")
+        output_messages.append("✅ All scene assets generated")
         output_messages.append("")
 
-        # Step 3: Generate video
-        output_messages.append("🎞️  Step 3/4: Compiling video with FFmpeg...")
-        output_messages.append("   (This may take a few minutes...)")
-
-        filename = f"{topic.replace(' ', '_')[:50]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4"
-        output_path = video_generator.generate_video(
-            scenes=processed_scenes,
+        # Step 3: Encode and join the scenes, the only part that needs a render slot
+        job.set_progress("waiting for a render slot", 0.4)
+        with span('admission_wait'):
+            await admission.wait_for_slot_async(ticket, RENDER_QUEUE_TIMEOUT)
+        context = RenderContext(job_id=job.job_id)
+        job.context = context
+        # The job id keeps names unique when jobs on the same topic finish within a second
+        filename = f"{topic.replace(' ', '_')[:50]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{job.job_id[:6]}.mp4"
+
+        def update_render_progress(stage: str, fraction: float):
+            # Scenes take 40-85% of the job, assembly the rest
+            if stage == 'assembly':
+                job.set_progress("assembling video", 0.85 + 0.15 * fraction)
+            else:
+                job.set_progress(f"encoding {stage}/{len(scenes)}",
+                                 0.4 + 0.45 * (len(encoded) + fraction) / len(scenes))
+
+        def render_progress(stage: str, done: float, total: float):
+            # FFmpeg progress arrives on the render thread
+            fraction = min(1.0, done / total) if total else 0.0
+            loop.call_soon_threadsafe(update_render_progress, stage, fraction)
+
+        context.on_progress = render_progress
+
+        output_messages.append("🎞️  Step 3/4: Encoding scenes and compiling video with FFmpeg...")
+        scene_videos = []
+        for index, processed in enumerate(processed_scenes):
+            scene_videos.append(await run_blocking(
+                RENDER_EXECUTOR, video_generator.render_scene,
+                context, processed, index, aspect_ratio, 0.5, 30
+            ))
+            encoded.append(index)
+            output_messages.append(f"   🎞️  Scene {index+1}/{len(scenes)} encoded")
+        context.stage_timings['scenes'] = time.time() - context.start_time
+
+        job.set_progress("assembling video", 0.85)
+        output_path = await run_blocking(
+            RENDER_EXECUTOR,
+            video_generator.assemble_video,
+            context,
+            scene_videos,
             output_filename=filename,
             aspect_ratio=aspect_ratio,
             transition_duration=0.5,
-            fps=30
+            fps=30,
+            metadata={'topic': topic}
         )
+        context.cleanup()
+        admission.release(ticket)
+        ticket = None
+
+        # Feed the measured cost back into the model's calibration data
+        measured = admission.estimate(list(context.audio_durations.values()), width, height, 30)
+        admission.record(measured, context.cpu_seconds, context.temp_bytes,
+                         time.time() - context.start_time)
 
         output_messages.append(f"✅ Video compiled successfully!")
         output_messages.append("")
 
         # Step 4: Cleanup temp files
+        job.set_progress("cleaning up", 0.99)
         output_messages.append("🧹 Step 4/4: Cleaning up temporary files...")
-        for scene in processed_scenes:
-            try:
-                os.remove(scene['image_path'])
-                os.remove(scene['audio_path'])
-            except:
-                pass
+        remove_scene_files(ready_scenes)
 
         output_messages.append("✅ Cleanup complete")
         output_messages.append("")
@@ -392,42 +860,74 @@ async def handle_generate_video(arguments: dict) -> list[TextContent]:
         output_messages.append(f"   - Scenes: {len(scenes)}")
         output_messages.append(f"   - Duration: ~{duration} minute(s)")
         output_messages.append(f"   - Aspect Ratio: {aspect_ratio}")
+        if use_cache:
+            output_messages.append(
+                f"   - Cache hits: images {format_hit_rate(cache_hits['image'], len(scenes))}, "
+                f"voiceovers {format_hit_rate(cache_hits['speech'], len(scenes))}"
+            )
         output_messages.append(f"   - File size: {os.path.getsize(output_path) / (1024*1024):.1f} MB")
         output_messages.append("")
         output_messages.append(f"You can find the video at: {os.path.abspath(output_path)}")
-
-        return [TextContent(type="text", text="\n".join(output_messages))]
-
-    except Exception as e:
-        error_msg = f"❌ Error during video generation:\n{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
+        job.metrics.update({
+            'scenes': len(scenes),
+            'renderSeconds': round(time.time() - context.start_time, 2),
+            'stageTimings': {stage: round(seconds, 2) for stage, seconds in context.stage_timings.items()},
+            'cpuSeconds': round(context.cpu_seconds, 2),
+            'peakRssKb': context.peak_rss_kb,
+            'fileBytes': os.path.getsize(output_path),
+            'cacheHits': dict(cache_hits) if use_cache else None,
+        })
+        job.finish('completed', output_path=os.path.abspath(output_path))
+
+    except (Exception, asyncio.CancelledError) as e:
+        cancelled = isinstance(e, (asyncio.CancelledError, RenderCancelled)) or job.status == 'cancelled'
+        if context is not None:
+            context.cancel()
+            context.cleanup()
+        if ticket is not None:
+            admission.release(ticket)
+        remove_scene_files(ready_scenes)
         output_messages.append("")
-        output_messages.append(error_msg)
-        return [TextContent(type="text", text="\n".join(output_messages))]
+        if cancelled:
+            output_messages.append("🛑 Video generation cancelled")
+            job.finish('cancelled', error="Cancelled by request")
+        else:
+            error_msg = f"❌ Error during video generation:\n{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
+            output_messages.append(error_msg)
+            job.finish('failed', error=str(e))
 
 
 async def handle_list_videos(arguments: dict) -> list[TextContent]:
-    """List all generated videos"""
+    """List generated videos from the catalog"""
 
     try:
-        video_files = list(OUTPUT_DIR.glob("*.mp4"))
+        page = max(1, int(arguments.get('page', 1)))
+        page_size = min(100, max(1, int(arguments.get('page_size', 20))))
 
-        if not video_files:
-            return [TextContent(type="text", text="No videos found in the output directory.")]
+        # The catalog is SQLite shared with the API server: query it off the event loop
+        total = await run_blocking(IO_EXECUTOR, catalog.count)
+        videos = await run_blocking(IO_EXECUTOR, catalog.list, page=page, page_size=page_size)
 
-        # Sort by modification time (newest first)
-        video_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+        if not videos:
+            if total == 0:
+                return [TextContent(type="text", text="No videos found in the output directory.")]
+            return [TextContent(type="text", text=f"No videos on page {page} ({total} video(s) in total).")]
 
-        output_lines = [f"📹 Found {len(video_files)} video(s):", ""]
+        total_pages = (total + page_size - 1) // page_size
+        output_lines = [f"📹 Found {total} video(s) — page {page}/{total_pages}:", ""]
 
-        for i, video_file in enumerate(video_files, 1):
-            stat = video_file.stat()
-            size_mb = stat.st_size / (1024 * 1024)
-            modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        for i, video in enumerate(videos, (page - 1) * page_size + 1):
+            size_mb = video['size_bytes'] / (1024 * 1024)
+            created = datetime.fromtimestamp(video['created_at']).strftime('%Y-%m-%d %H:%M:%S')
 
-            output_lines.append(f"{i}. {video_file.name}")
+            output_lines.append(f"{i}. {video['filename']}")
+            if video['topic']:
+                output_lines.append(f"   Topic: {video['topic']}")
             output_lines.append(f"   Size: {size_mb:.1f} MB")
-            output_lines.append(f"   Modified: {modified}")
-            output_lines.append(f"   Path: {video_file.absolute()}")
+            if video['duration']:
+                output_lines.append(f"   Duration: {video['duration']:.1f} seconds")
+            output_lines.append(f"   Created: {created}")
+            output_lines.append(f"   Path: {video['path']}")
             output_lines.append("")
 
         return [TextContent(type="text", text="\n".join(output_lines))]
@@ -444,73 +944,68 @@ async def handle_get_video_info(arguments: dict) -> list[TextContent]:
         return [TextContent(type="text", text="❌ Error: 'filename' parameter is required")]
 
     try:
-        video_path = OUTPUT_DIR / filename
-
-        if not video_path.exists():
-            return [TextContent(type="text", text=f"❌ Video file not found: {filename}")]
-
-        stat = video_path.stat()
-        size_mb = stat.st_size / (1024 * 1024)
-        created = datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-        modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-
-        # Get video metadata using ffprobe
-        import subprocess
-        cmd = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format',
-            '-show_streams',
-            str(video_path)
-        ]
-
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        video = await run_blocking(IO_EXECUTOR, catalog.get, filename)
+
+        if video is None:
+            # Not cataloged yet (e.g. copied into the output directory by hand)
+            video_path = OUTPUT_DIR / filename
+            if not video_path.exists():
+                return [TextContent(type="text", text=f"❌ Video file not found: {filename}")]
+            info = await run_blocking(IO_EXECUTOR, probe_video, str(video_path)) or {}
+            await run_blocking(IO_EXECUTOR, catalog.add, str(video_path), **info)
+            video = await run_blocking(IO_EXECUTOR, catalog.get, filename)
+        elif video['format_name'] is None:
+            # Backfilled entry: probe once, then serve from the catalog
+            info = await run_blocking(IO_EXECUTOR, probe_video, video['path']) or {}
+            await run_blocking(IO_EXECUTOR, catalog.update, filename, **info)
+            video = await run_blocking(IO_EXECUTOR, catalog.get, filename)
+
+        size_mb = video['size_bytes'] / (1024 * 1024)
+        created = datetime.fromtimestamp(video['created_at']).strftime('%Y-%m-%d %H:%M:%S')
 
         output_lines = [
             f"📹 Video Information: {filename}",
             "=" * 60,
             f"📁 File Details:",
-            f"   Path: {video_path.absolute()}",
-            f"   Size: {size_mb:.2f} MB ({stat.st_size:,} bytes)",
+            f"   Path: {video['path']}",
+            f"   Size: {size_mb:.2f} MB ({video['size_bytes']:,} bytes)",
             f"   Created: {created}",
-            f"   Modified: {modified}",
-            ""
         ]
+        if video['topic']:
+            output_lines.append(f"   Topic: {video['topic']}")
+        output_lines.append("")
 
-        if result.returncode == 0:
-            metadata = json.loads(result.stdout)
-
-            # Format information
-            fmt = metadata.get('format', {})
-            duration = float(fmt.get('duration', 0))
-            bitrate = int(fmt.get('bit_rate', 0)) / 1000  # Convert to kbps
+        if video['format_name'] is not None:
+            duration = video['duration'] or 0
+            bitrate = (video['bit_rate'] or 0) / 1000  # Convert to kbps
 
             output_lines.append(f"🎬 Video Metadata:")
             output_lines.append(f"   Duration: {duration:.2f} seconds ({duration/60:.2f} minutes)")
             output_lines.append(f"   Bitrate: {bitrate:.0f} kbps")
-            output_lines.append(f"   Format: {fmt.get('format_name', 'unknown')}")
+            output_lines.append(f"   Format: {video['format_name']}")
             output_lines.append("")
 
-            # Video stream info
-            video_streams = [s for s in metadata.get('streams', []) if s.get('codec_type') == 'video']
-            if video_streams:
-                vs = video_streams[0]
-                output_lines.append(f"🎥 Video Stream:")
-                output_lines.append(f"   Codec: {vs.get('codec_name', 'unknown')}")
-                output_lines.append(f"   Resolution: {vs.get('width')}x{vs.get('height')}")
-                output_lines.append(f"   Frame Rate: {vs.get('r_frame_rate', 'unknown')} fps")
-                output_lines.append("")
-
-            # Audio stream info
-            audio_streams = [s for s in metadata.get('streams', []) if s.get('codec_type') == 'audio']
-            if audio_streams:
-                aus = audio_streams[0]
-                output_lines.append(f"🔊 Audio Stream:")
-                output_lines.append(f"   Codec: {aus.get('codec_name', 'unknown')}")
-                output_lines.append(f"   Sample Rate: {aus.get('sample_rate', 'unknown')} Hz")
-                output_lines.append(f"   Channels: {aus.get('channels', 'unknown')}")
-                output_lines.append("")
+        if video['video_codec'] is not None:
+            output_lines.append(f"🎥 Video Stream:")
+            output_lines.append(f"   Codec: {video['video_codec']}")
+            output_lines.append(f"   Resolution: {video['width']}x{video['height']}")
+            output_lines.append(f"   Frame Rate: {video['frame_rate']} fps")
+            output_lines.append("")
+
+        if video['audio_codec'] is not None:
+            output_lines.append(f"🔊 Audio Stream:")
+            output_lines.append(f"   Codec: {video['audio_codec']}")
+            output_lines.append(f"   Sample Rate: {video['sample_rate']} Hz")
+            output_lines.append(f"   Channels: {video['channels']}")
+            output_lines.append("")
+
+        if video['render_seconds'] is not None:
+            output_lines.append(f"⏱️  Render:")
+            output_lines.append(f"   Scenes: {video['scene_count']} ({video['aspect_ratio']})")
+            output_lines.append(f"   Total: {video['render_seconds']:.1f} seconds")
+            if video['stage_timings']:
+                output_lines.append(f"   Stages: {format_timings(video['stage_timings'])}")
+            output_lines.append("")
 
         return [TextContent(type="text", text="\n".join(output_lines))]
 
@@ -529,6 +1024,11 @@ async def main():
     print("=" * 60, file=sys.stderr)
 
     async with stdio_server() as (read_stream, write_stream):
+        # stdout now carries the MCP protocol; render logs printed from worker
+        # threads would corrupt it, so send them to stderr
+        sys.stdout = sys.stderr
+        # Warm the shared services up while the client runs the handshake
+        asyncio.get_running_loop().run_in_executor(None, init_runtime)
         await app.run(
             read_stream,
             write_stream,
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Metrics
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format, for capacity planning and autoscaling of render nodes
+
+Values are kept in process memory; each metric takes a lock per update, so
+instrumenting hot paths costs about a microsecond. Values that are cheaper
+to read than to track (queue depth, free disk) come from collectors, which
+run on every scrape.
+
+Usage:
+    from metrics import REGISTRY
+    JOBS = REGISTRY.counter('video_jobs_total', "Render jobs by outcome", ['outcome'])
+    JOBS.inc(outcome='completed')
+    text = REGISTRY.render()
+"""
+
+import math
+import os
+import sys
+import threading
+from typing import Callable, Dict, List, Sequence
+
+
+# Content type of the text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Default histogram buckets, in seconds (an upload takes milliseconds, a render minutes)
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Unlabeled series exist from the start, so they read 0 rather than missing
+            self._values[()] = self._empty()
+
+    def _empty(self):
+        return 0
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[tuple]:
+        """(suffix, labels, value) of every series"""
+        with self._lock:
+            return [('', dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in sorted(self._samples(), key=lambda sample: tuple(sample[1].values())):
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        """Add a non-negative amount to the series of these labels"""
+        if amount < 0:
+            raise ValueError("Counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels):
+        """Mirror a cumulative value kept elsewhere (e.g. the OS's CPU time), from a collector"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames)
+
+    def _empty(self):
+        # Per-bucket (not cumulative) counts, then sum
+        return [0] * len(self.buckets) + [0.0]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = self._empty()
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-1] += value
+
+    def _samples(self) -> List[tuple]:
+        samples = []
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._values.items()]
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                samples.append(('_bucket', dict(labels, le=_format_value(bound)), cumulative))
+            samples.append(('_sum', labels, series[-1]))
+            samples.append(('_count', labels, cumulative))
+        return samples
+
+    def render(self) -> List[str]:
+        # Keep the bucket, sum and count lines of a series together and in order
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        """Metrics of one process, rendered together"""
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                # Module reloads re-declare their metrics: hand back the live one
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Call collector() (which sets gauges) before every render"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"⚠️  Metrics collector failed: {e}")
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Registry of the process
+REGISTRY = Registry()
+
+
+def register_process_metrics(registry: Registry = REGISTRY):
+    """
+    Add the process's CPU time, memory and thread count (standard process_* names)
+
+    Children CPU covers subprocesses that have exited, e.g. FFmpeg runs of
+    in-process renders.
+    """
+    cpu = registry.counter('process_cpu_seconds_total', "CPU time of the server process")
+    children_cpu = registry.counter('process_children_cpu_seconds_total',
+                                    "CPU time of exited child processes")
+    resident = registry.gauge('process_resident_memory_bytes', "Resident memory of the server process")
+    max_resident = registry.gauge('process_max_resident_memory_bytes',
+                                  "Peak resident memory of the server process")
+    threads = registry.gauge('process_threads', "Threads of the server process")
+
+    def collect():
+        times = os.times()
+        cpu.set_total(times.user + times.system)
+        children_cpu.set_total(times.children_user + times.children_system)
+        threads.set(threading.active_count())
+        try:
+            with open('/proc/self/statm') as f:
+                resident.set(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE'))
+        except (OSError, ValueError, IndexError):
+            pass  # not Linux
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # Kilobytes on Linux, bytes on macOS
+            max_resident.set(peak if sys.platform == 'darwin' else peak * 1024)
+        except ImportError:
+            pass  # Windows
+
+    registry.add_collector(collect)
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Job Progress Events
+Per-job event feeds (stage transitions, encode progress with an ETA, the
+final result) served to browsers as server-sent events
+
+A feed keeps its stage and result events plus only the latest progress
+event, so it stays a few dozen entries long however often FFmpeg reports.
+Subscribers wake only when an event is published or a keep-alive is due.
+
+Under serve.py, EventServer serves every stream from one asyncio thread:
+an idle subscriber is a socket and a parked coroutine, not a server thread.
+Other servers stream from a WSGI thread per subscriber (open_stream), with
+a cap so subscribers can never take all of the server's threads.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+
+# Finished feeds stay readable this long, for late or reconnecting subscribers
+FEED_RETENTION_SECONDS = 600
+# Minimum seconds between two progress events of a job
+PROGRESS_INTERVAL = 0.5
+# Comment line sent to idle subscribers so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
+# Reconnection delay suggested to EventSource clients, in milliseconds
+RETRY_MS = 3000
+# Reconnection delay for a job whose render request has not arrived yet
+UNKNOWN_JOB_RETRY_MS = 1000
+# Event streams open at once when each holds a WSGI server thread
+MAX_SUBSCRIBERS = 32
+# Event streams open at once on the EventServer (one socket each, no thread)
+MAX_DISPATCHED_SUBSCRIBERS = 500
+# Seconds an EventServer client has to send its request line and headers
+REQUEST_TIMEOUT = 10
+
+# Path of a job's event stream
+EVENTS_PATH = re.compile(r'^/api/jobs/([A-Za-z0-9_-]{8,64})/events$')
+
+# Events that end a feed
+FINAL_EVENTS = ('completed', 'failed')
+
+
+def format_event(event_id: int, event: str, data: Dict) -> str:
+    """One event in the text/event-stream format"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def unknown_job_events() -> str:
+    """
+    Whole stream of a job with no feed (yet)
+
+    Clients may open the stream before their render request arrives. Rather
+    than holding the connection until it does, the stream ends at once and
+    EventSource reconnects by itself after UNKNOWN_JOB_RETRY_MS.
+    """
+    return f"retry: {UNKNOWN_JOB_RETRY_MS}\n\n: unknown job\n\n"
+
+
+class JobFeed:
+    def __init__(self, job_id: str):
+        """
+        Events of one job, in publication order
+
+        Args:
+            job_id: Job the events belong to
+        """
+        self.job_id = job_id
+        self.finished_at: Optional[float] = None
+        self._events: List[tuple] = []  # (id, event, data)
+        self._next_id = 1
+        self._condition = threading.Condition()
+        self._listeners = set()  # wake-up callbacks of EventServer streams
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def publish(self, event: str, data: Dict):
+        """
+        Append an event and wake the subscribers
+
+        A progress event replaces a progress event right before it, so slow
+        subscribers skip straight to the latest progress.
+        """
+        with self._condition:
+            if self.finished:
+                return
+            if event == 'progress' and self._events and self._events[-1][1] == 'progress':
+                self._events.pop()
+            self._events.append((self._next_id, event, data))
+            self._next_id += 1
+            if event in FINAL_EVENTS:
+                self.finished_at = time.time()
+            self._condition.notify_all()
+            for wake in self._listeners:
+                wake()
+
+    def add_listener(self, wake):
+        """Call wake() (from the publishing thread) whenever an event is published"""
+        with self._condition:
+            self._listeners.add(wake)
+
+    def remove_listener(self, wake):
+        with self._condition:
+            self._listeners.discard(wake)
+
+    def read(self, after: int, timeout: float) -> List[tuple]:
+        """
+        Events newer than an event id, waiting up to timeout for the first one
+
+        Returns:
+            (id, event, data) tuples; empty on timeout or once the feed is
+            finished and fully read (a timeout of 0 never blocks)
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                events = [entry for entry in self._events if entry[0] > after]
+                if events or self.finished:
+                    return events
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._condition.wait(remaining)
+
+    def last(self) -> Optional[tuple]:
+        """Latest event, if any"""
+        with self._condition:
+            return self._events[-1] if self._events else None
+
+
+class EventStream:
+    def __init__(self, events: Iterator[str], on_close):
+        """
+        Open event stream of one subscriber (a WSGI response body)
+
+        Args:
+            events: Server-sent event chunks
+            on_close: Called once when the stream ends or the client leaves
+        """
+        self._events = events
+        self._on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._events)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        """Free the subscriber slot (the server calls this even if the stream never started)"""
+        if not self._closed:
+            self._closed = True
+            self._events.close()
+            self._on_close()
+
+
+class ProgressBroker:
+    def __init__(self, retention: float = FEED_RETENTION_SECONDS,
+                 max_subscribers: int = MAX_SUBSCRIBERS):
+        """
+        Registry of job feeds
+
+        Args:
+            retention: Seconds a finished feed stays available
+            max_subscribers: Event streams open at once; more are refused
+        """
+        self.retention = retention
+        self.max_subscribers = max_subscribers
+        self._feeds: Dict[str, JobFeed] = {}
+        self._subscribers = 0
+        self._condition = threading.Condition()
+
+    def _expire(self):
+        """Drop feeds finished longer than the retention ago (lock held)"""
+        cutoff = time.time() - self.retention
+        for job_id in [job_id for job_id, feed in self._feeds.items()
+                       if feed.finished and feed.finished_at < cutoff]:
+            del self._feeds[job_id]
+
+    def create(self, job_id: str) -> JobFeed:
+        """
+        Register the feed of a new job
+
+        Raises:
+            ValueError: A job with this id already has a feed
+        """
+        with self._condition:
+            self._expire()
+            if job_id in self._feeds:
+                raise ValueError(f"Job {job_id} already exists")
+            feed = self._feeds[job_id] = JobFeed(job_id)
+            return feed
+
+    def get(self, job_id: str) -> Optional[JobFeed]:
+        """Feed of a job, or None if it was never created (or has expired)"""
+        with self._condition:
+            return self._feeds.get(job_id)
+
+    def publish(self, job_id: str, event: str, data: Dict):
+        """Publish to a job's feed (ignored for unknown jobs)"""
+        with self._condition:
+            feed = self._feeds.get(job_id)
+        if feed is not None:
+            feed.publish(event, data)
+
+    @property
+    def subscribers(self) -> int:
+        """Open event streams served by WSGI threads"""
+        with self._condition:
+            return self._subscribers
+
+    def open_stream(self, feed: JobFeed, last_event_id: int = 0,
+                    keepalive: float = KEEPALIVE_SECONDS) -> Optional[EventStream]:
+        """
+        Server-sent event stream of a feed, until its final event
+
+        The stream blocks the WSGI thread iterating it while idle; serve.py
+        uses EventServer instead.
+
+        Args:
+            feed: Job feed
+            last_event_id: Resume after this event (the Last-Event-ID header)
+            keepalive: Seconds between keep-alive comments while idle
+
+        Returns:
+            The stream, or None if max_subscribers streams are already open
+        """
+        with self._condition:
+            if self._subscribers >= self.max_subscribers:
+                return None
+            self._subscribers += 1
+        return EventStream(self._events(feed, last_event_id, keepalive), self._unsubscribe)
+
+    def _unsubscribe(self):
+        with self._condition:
+            self._subscribers -= 1
+
+    @staticmethod
+    def _events(feed: JobFeed, last_event_id: int, keepalive: float) -> Iterator[str]:
+        """Event chunks of a feed after last_event_id, with keep-alives while idle"""
+        yield f"retry: {RETRY_MS}\n\n"
+        cursor = last_event_id
+        while True:
+            events = feed.read(cursor, keepalive)
+            if not events:
+                if feed.finished:
+                    return
+                yield ": keepalive\n\n"
+                continue
+            for event_id, event, data in events:
+                yield format_event(event_id, event, data)
+                cursor = event_id
+                if event in FINAL_EVENTS:
+                    return
+
+
+class EventServer:
+    def __init__(self, broker: ProgressBroker, host: str = '0.0.0.0', port: int = 0,
+                 max_subscribers: int = MAX_DISPATCHED_SUBSCRIBERS,
+                 keepalive: float = KEEPALIVE_SECONDS):
+        """
+        Event streams of all subscribers, served by one asyncio thread
+
+        A minimal HTTP server for GET /api/jobs/<id>/events only. Each open
+        stream is a coroutine parked until its feed publishes (feeds wake the
+        loop through a listener) or a keep-alive is due, so hundreds of idle
+        subscribers cost sockets, not threads.
+
+        Args:
+            broker: Registry of the job feeds
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one; see self.port after start())
+            max_subscribers: Streams open at once; more get 503
+            keepalive: Seconds between keep-alive comments while idle
+        """
+        self.broker = broker
+        self.host = host
+        self.port = port
+        self.max_subscribers = max_subscribers
+        self.keepalive = keepalive
+        self._subscribers = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def subscribers(self) -> int:
+        """Open event streams (only changed on the server's loop)"""
+        return self._subscribers
+
+    def start(self):
+        """
+        Start listening in a background thread
+
+        Raises:
+            OSError: The port could not be bound
+        """
+        self._thread = threading.Thread(target=self._run, name="event-server", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._error is not None:
+            raise self._error
+
+    def stop(self):
+        """Close all streams and stop the server thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            self._error = e
+            self._started.set()
+            loop.close()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(server.wait_closed())
+            loop.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer one connection (one request; streams end with the connection)"""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+            lines = head.decode('latin-1').split("\r\n")
+            method, target = (lines[0].split(' ') + [''])[:2]
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            match = EVENTS_PATH.match(target.split('?', 1)[0])
+
+            if method == 'OPTIONS':
+                self._write_head(writer, "204 No Content", {
+                    'Access-Control-Allow-Methods': 'GET',
+                    'Access-Control-Allow-Headers': 'Last-Event-ID, Cache-Control',
+                })
+            elif method != 'GET' or match is None:
+                self._write_head(writer, "404 Not Found", {'Content-Type': 'text/plain'})
+                writer.write(b"Not found\n")
+            elif self._subscribers >= self.max_subscribers:
+                self._write_head(writer, "503 Service Unavailable",
+                                 {'Content-Type': 'text/plain', 'Retry-After': '5'})
+                writer.write(b"Too many open event streams, retry later\n")
+            else:
+                last_event_id = headers.get('last-event-id', '')
+                self._subscribers += 1
+                try:
+                    await self._stream(writer, match.group(1),
+                                       int(last_event_id) if last_event_id.isdigit() else 0)
+                finally:
+                    self._subscribers -= 1
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                ConnectionError):
+            # Slow, malformed or departed client
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_head(writer: asyncio.StreamWriter, status: str, headers: Dict[str, str]):
+        # The body runs until the connection closes
+        headers = dict(headers, **{'Access-Control-Allow-Origin': '*', 'Connection': 'close'})
+        writer.write((f"HTTP/1.1 {status}\r\n"
+                      + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+                      + "\r\n").encode('latin-1'))
+
+    async def _stream(self, writer: asyncio.StreamWriter, job_id: str, last_event_id: int):
+        """Write a feed's events after last_event_id until its final event"""
+        self._write_head(writer, "200 OK", {
+            'Content-Type': 'text/event-stream; charset=utf-8',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+        feed = self.broker.get(job_id)
+        if feed is None:
+            writer.write(unknown_job_events().encode())
+            return
+
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def wake():
+            loop.call_soon_threadsafe(changed.set)
+
+        feed.add_listener(wake)
+        try:
+            writer.write(f"retry: {RETRY_MS}\n\n".encode())
+            cursor = last_event_id
+            while True:
+                changed.clear()
+                events = feed.read(cursor, 0)
+                if not events:
+                    if feed.finished:
+                        return
+                    await writer.drain()
+                    try:
+                        await asyncio.wait_for(changed.wait(), self.keepalive)
+                    except asyncio.TimeoutError:
+                        writer.write(b": keepalive\n\n")
+                    continue
+                for event_id, event, data in events:
+                    writer.write(format_event(event_id, event, data).encode())
+                    cursor = event_id
+                    if event in FINAL_EVENTS:
+                        return
+                await writer.drain()
+        finally:
+            feed.remove_listener(wake)
+
+
+class RenderProgress:
+    def __init__(self, feed: JobFeed, context, scene_count: int,
+                 interval: float = PROGRESS_INTERVAL):
+        """
+        RenderContext.on_progress callback publishing a job's stage and progress events
+
+        Scene encodes and the final assembly (or, for HLS renders, the
+        streamed pieces) each encode the whole video once, so overall
+        progress counts seconds of audio encoded out of twice the video's
+        length, and the ETA extrapolates the render's elapsed time.
+
+        Args:
+            feed: Feed of the job
+            context: RenderContext of the job (audio durations, streamed
+                     pieces, start time)
+            scene_count: Scenes in the video
+            interval: Minimum seconds between progress events
+        """
+        self.feed = feed
+        self.context = context
+        self.scene_count = scene_count
+        self.interval = interval
+        self._stage = None
+        self._last_publish = 0.0
+
+    def _fraction(self, kind: str, scene: Optional[int], done: float) -> float:
+        durations = self.context.audio_durations
+        video_seconds = sum(durations.values())
+        if not video_seconds:
+            return 0.0
+        pieces = len(self.context.stream_pieces)
+        streamed = sum(seconds for index, seconds in durations.items() if index < pieces)
+        if kind == 'assembly':
+            # Joining streamed pieces is a stream copy: their encodes already count
+            encoded = video_seconds + max(streamed, done)
+        else:
+            scenes_encoded = scene + 1 if kind == 'stream' else scene
+            encoded = (sum(seconds for index, seconds in durations.items() if index < scenes_encoded)
+                       + streamed + done)
+        return min(1.0, max(0.0, encoded / (2 * video_seconds)))
+
+    def __call__(self, stage: str, done: float, total: float):
+        # Stages: "scene N", "stream N" (HLS piece ending with scene N) and "assembly"
+        kind, _, number = stage.partition(' ')
+        scene = int(number) - 1 if number else None
+        if kind not in ('scene', 'stream'):
+            kind, scene = 'assembly', None
+        if stage != self._stage:
+            self._stage = stage
+            self.feed.publish('stage', {
+                'stage': kind,
+                'scene': None if scene is None else scene + 1,
+                'scenes': self.scene_count,
+                'scenesEncoded': (self.scene_count if scene is None
+                                  else scene + 1 if kind == 'stream' else scene),
+            })
+
+        now = time.time()
+        if now - self._last_publish < self.interval and done < total:
+            return
+        self._last_publish = now
+
+        fraction = self._fraction(kind, scene, min(done, total) if total else done)
+        elapsed = now - self.context.start_time
+        eta = elapsed * (1 - fraction) / fraction if fraction >= 0.02 else None
+        self.feed.publish('progress', {
+            'stage': kind,
+            'scene': None if scene is None else scene + 1,
+            'stageFraction': round(min(1.0, done / total), 4) if total else None,
+            'fraction': round(fraction, 4),
+            'elapsedSeconds': round(elapsed, 1),
+            'etaSeconds': round(eta, 1) if eta is not None else None,
+        })
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Asset Providers
+Backends that write storyboards and generate scene images and speech:
+Google Gemini for production, and a local deterministic stand-in for
+offline load tests and benchmarks
+"""
+
+import base64
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import struct
+import sys
+import threading
+import time
+import traceback
+import wave
+from typing import Dict, Optional, Tuple
+
+
+# Output size of generated images per aspect ratio (Imagen 3 sizes)
+IMAGE_SIZES = {
+    '16:9': (1408, 768),
+    '9:16': (768, 1408),
+    '1:1': (1024, 1024),
+    '4:3': (1280, 896),
+    '3:4': (896, 1280),
+}
+
+
+# Image formats the renderer reads as-is, by leading magic bytes
+IMAGE_SIGNATURES = {
+    b'\xff\xd8\xff': 'image/jpeg',
+    b'\x89PNG\r\n\x1a\n': 'image/png',
+}
+IMAGE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+}
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """MIME type of encoded image bytes, or None if not a format the renderer takes as-is"""
+    for signature, mime_type in IMAGE_SIGNATURES.items():
+        if data.startswith(signature):
+            return mime_type
+    return None
+
+
+def encode_image(pil_image, max_size: Optional[Tuple[int, int]] = None) -> Tuple[bytes, str]:
+    """
+    Encode a decoded image once, as JPEG, no larger than the render reads it
+
+    Args:
+        pil_image: PIL image
+        max_size: Largest (width, height) the render's zoom/pan input uses; a
+                  larger image is shrunk until it just covers it. Smaller
+                  images are left alone: the renderer's scale filter
+                  enlarges them in the pass that crops them anyway.
+
+    Returns:
+        Tuple of (image_bytes, mime_type)
+    """
+    from PIL import Image
+
+    if max_size:
+        scale = max(max_size[0] / pil_image.width, max_size[1] / pil_image.height)
+        if scale < 1:
+            pil_image = pil_image.resize((math.ceil(pil_image.width * scale),
+                                          math.ceil(pil_image.height * scale)), Image.LANCZOS)
+    if pil_image.mode != 'RGB':
+        pil_image = pil_image.convert('RGB')
+
+    buffer = io.BytesIO()
+    pil_image.save(buffer, format='JPEG', quality=92)
+    return buffer.getvalue(), 'image/jpeg'
+
+
+def get_storyboard_plan(duration: float) -> Tuple[int, int, int]:
+    """
+    Size a storyboard for a video duration
+
+    Args:
+        duration: Duration in minutes
+
+    Returns:
+        Tuple of (total_words, num_scenes, words_per_scene)
+    """
+    total_words = round(duration * 150)
+    num_scenes = max(3, round(duration * 7))
+    words_per_scene = round(total_words / num_scenes)
+    return total_words, num_scenes, words_per_scene
+
+
+class ProviderError(Exception):
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        """
+        A provider request failed
+
+        Args:
+            message: Error description
+            retryable: The same request may succeed later (quota, overload)
+            retry_after: Seconds the provider asked us to wait, if known
+        """
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class AssetProvider:
+    """
+    Interface of a storyboard/image/speech backend
+
+    Methods block (they run on the MCP server's provider executor) and must
+    be safe to call from several threads at once. image_model, speech_model
+    and speech_voice identify the generated assets in the asset cache.
+    """
+
+    name = 'base'
+    storyboard_model = ''
+    image_model = ''
+    speech_model = ''
+    speech_voice = ''
+
+    def generate_storyboard(self, topic: str, duration: float) -> Dict:
+        """
+        Write a storyboard
+
+        Args:
+            topic: Video topic
+            duration: Duration in minutes
+
+        Returns:
+            Dictionary with scenes (id, caption, voiceOver, imagePrompt)
+            and grounding chunks
+        """
+        raise NotImplementedError
+
+    def generate_image(self, prompt: str, aspect_ratio: str = "16:9",
+                       max_size: Optional[Tuple[int, int]] = None) -> Tuple[bytes, str]:
+        """
+        Generate a scene image
+
+        Args:
+            prompt: Image generation prompt
+            aspect_ratio: Aspect ratio (16:9, 9:16, 1:1, etc.)
+            max_size: Largest (width, height) the render uses (see
+                      VideoGenerator.get_source_size); applies only when
+                      the image has to be encoded anyway
+
+        Returns:
+            Tuple of (image_bytes, mime_type); JPEG or PNG
+        """
+        raise NotImplementedError
+
+    def generate_speech(self, text: str) -> bytes:
+        """
+        Generate a voice-over
+
+        Returns:
+            Audio bytes (WAV format)
+        """
+        raise NotImplementedError
+
+
+class GeminiProvider(AssetProvider):
+    """Google Gemini storyboards, Imagen images and Gemini TTS"""
+
+    name = 'gemini'
+    storyboard_model = 'gemini-2.0-flash-exp'
+    image_model = 'imagen-3.0-generate-001'
+    speech_model = 'gemini-2.0-flash-exp'
+    speech_voice = 'clear and engaging'
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key
+        self._genai = None
+        self._genai_lock = threading.Lock()
+
+    def _client(self):
+        """The google.generativeai module, imported and configured on first use"""
+        with self._genai_lock:
+            if self._genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=self.api_key)
+                self._genai = genai
+            return self._genai
+
+    def generate_storyboard(self, topic: str, duration: float) -> Dict:
+        try:
+            genai = self._client()
+
+            # Calculate parameters
+            total_words, num_scenes, words_per_scene = get_storyboard_plan(duration)
+
+            prompt = f"""Create a video storyboard about "{topic}" with a total duration of approximately {duration} minute(s).
+The total word count for all voice-overs should be around {total_words} words.
+Break it down into {num_scenes} short, dynamic scenes. For each scene, provide:
+1. A voice-over script of about {words_per_scene} words. This will be displayed as on-screen text.
+2. A detailed image prompt for an AI image generator that visually represents the scene.
+3. A short caption (this will not be used, but include it for compatibility).
+Respond ONLY with a valid JSON object with a "scenes" key. The "scenes" key must contain an array of exactly {num_scenes} scene objects, each with "caption", "voiceOver", and "imagePrompt" properties. Do not wrap the JSON in markdown backticks."""
+
+            model = genai.GenerativeModel(self.storyboard_model)
+            response = model.generate_content(
+                prompt,
+                generation_config=genai.GenerationConfig(
+                    temperature=0.9,
+                )
+            )
+
+            # Clean response
+            clean_text = response.text.strip().replace('```json', '').replace('```', '').strip()
+            parsed = json.loads(clean_text)
+
+            # Add IDs and use voiceOver as caption
+            scenes = []
+            for index, scene in enumerate(parsed['scenes']):
+                scenes.append({
+                    'id': index + 1,
+                    'caption': scene['voiceOver'],
+                    'voiceOver': scene['voiceOver'],
+                    'imagePrompt': scene['imagePrompt']
+                })
+
+            return {'scenes': scenes, 'groundingChunks': []}
+
+        except Exception as e:
+            print(f"❌ Error generating storyboard: {e}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            raise
+
+    def generate_image(self, prompt: str, aspect_ratio: str = "16:9",
+                       max_size: Optional[Tuple[int, int]] = None) -> Tuple[bytes, str]:
+        try:
+            genai = self._client()
+
+            # Use Imagen 3 model
+            model = genai.ImageGenerationModel(self.image_model)
+
+            # Generate image
+            result = model.generate_images(
+                prompt=prompt,
+                number_of_images=1,
+                aspect_ratio=aspect_ratio,
+                safety_filter_level="block_some",
+                person_generation="allow_adult"
+            )
+
+            # Keep Imagen's encoded bytes whenever the renderer can read them: it
+            # scales them at its zoom/pan input anyway, so decoding and re-encoding
+            # here would cost CPU, disk and quality for nothing
+            image_bytes = result.images[0].image_bytes
+            mime_type = sniff_image_type(image_bytes)
+            if mime_type:
+                return image_bytes, mime_type
+
+            from PIL import Image
+            return encode_image(Image.open(io.BytesIO(image_bytes)), max_size)
+
+        except Exception as e:
+            print(f"❌ Error generating image: {e}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            raise
+
+    def generate_speech(self, text: str) -> bytes:
+        try:
+            genai = self._client()
+
+            model = genai.GenerativeModel(self.speech_model)
+
+            # Configure for audio output
+            generation_config = genai.GenerationConfig(
+                response_modalities=["AUDIO"]
+            )
+
+            response = model.generate_content(
+                f"Say with a {self.speech_voice} tone: {text}",
+                generation_config=generation_config
+            )
+
+            # Extract audio data
+            if response.candidates and len(response.candidates) > 0:
+                candidate = response.candidates[0]
+                if candidate.content and candidate.content.parts:
+                    for part in candidate.content.parts:
+                        if hasattr(part, 'inline_data') and part.inline_data:
+                            audio_b64 = part.inline_data.data
+                            audio_bytes = base64.b64decode(audio_b64)
+                            return audio_bytes
+
+            raise ProviderError("No audio data in response")
+
+        except Exception as e:
+            print(f"❌ Error generating speech: {e}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            raise
+
+
+# Filler vocabulary of local storyboards
+LOCAL_WORDS = [
+    'light', 'history', 'journey', 'science', 'ocean', 'city', 'future', 'discovery',
+    'energy', 'nature', 'people', 'story', 'change', 'world', 'motion', 'signal',
+    'pattern', 'river', 'machine', 'garden', 'season', 'market', 'bridge', 'horizon',
+]
+
+
+class LocalProvider(AssetProvider):
+    """
+    Offline stand-in that synthesizes every asset locally
+
+    Outputs depend only on the inputs (same topic, same storyboard; same
+    prompt, same image), so runs are reproducible. Latency and failures are
+    injected to mimic a remote service under load.
+    """
+
+    name = 'local'
+    storyboard_model = 'local-storyboard'
+    image_model = 'local-gradient'
+    speech_model = 'local-tone'
+    speech_voice = 'sine'
+
+    SAMPLE_RATE = 24000
+    WORDS_PER_SECOND = 2.5
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None,
+                 quota_rpm: float = 0, quota_window: float = 60.0):
+        """
+        Args:
+            latency: Seconds each request takes
+            failure_rate: Probability (0-1) that a request raises ProviderError
+            seed: Seed of the failure draws (None: unpredictable)
+            quota_rpm: Requests per minute allowed per model (0: no quota);
+                       requests beyond it fail like a 429
+            quota_window: Window over which the quota is counted (seconds)
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.quota_rpm = quota_rpm
+        self.quota_window = quota_window
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._quota_windows: Dict[str, list] = {}  # model -> [window start, requests]
+
+    @staticmethod
+    def _digest(*parts) -> bytes:
+        """Stable hash of the inputs (Python's hash() is salted per process)"""
+        return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).digest()
+
+    def _request(self, model: str):
+        """Simulate the round-trip: enforce the quota, wait, then maybe fail"""
+        with self._lock:
+            if self.quota_rpm > 0:
+                now = time.monotonic()
+                window = self._quota_windows.setdefault(model, [now, 0])
+                if now - window[0] >= self.quota_window:
+                    window[0], window[1] = now, 0
+                if window[1] >= self.quota_rpm * self.quota_window / 60:
+                    raise ProviderError(f"429 quota exceeded for {model}", retryable=True,
+                                        retry_after=self.quota_window - (now - window[0]))
+                window[1] += 1
+            failed = self._rng.random() < self.failure_rate
+
+        if self.latency > 0:
+            time.sleep(self.latency)
+        if failed:
+            raise ProviderError(f"Simulated {model} failure", retryable=True)
+
+    def generate_storyboard(self, topic: str, duration: float) -> Dict:
+        self._request(self.storyboard_model)
+        total_words, num_scenes, words_per_scene = get_storyboard_plan(duration)
+        rng = random.Random(self._digest(topic, duration))
+
+        scenes = []
+        for index in range(num_scenes):
+            words = [rng.choice(LOCAL_WORDS) for _ in range(max(1, words_per_scene - 1))]
+            voice_over = f"{topic}: " + " ".join(words) + "."
+            scenes.append({
+                'id': index + 1,
+                'caption': voice_over,
+                'voiceOver': voice_over,
+                'imagePrompt': f"{topic}, scene {index + 1}, {' '.join(words[:4])}"
+            })
+
+        return {'scenes': scenes, 'groundingChunks': []}
+
+    def generate_image(self, prompt: str, aspect_ratio: str = "16:9",
+                       max_size: Optional[Tuple[int, int]] = None) -> Tuple[bytes, str]:
+        from PIL import Image, ImageDraw, ImageOps
+
+        self._request(self.image_model)
+        digest = self._digest(prompt, aspect_ratio)
+        width, height = IMAGE_SIZES.get(aspect_ratio, IMAGE_SIZES['16:9'])
+
+        # Diagonal-ish two-colour gradient with a few shapes, so zoom/pan
+        # effects and the encoder have real detail to work on
+        gradient = Image.linear_gradient('L').rotate(digest[0] % 360).resize((width, height))
+        image = ImageOps.colorize(gradient, tuple(digest[1:4]), tuple(digest[4:7]))
+        draw = ImageDraw.Draw(image)
+        for i in range(6):
+            x, y = digest[8 + i] * width // 256, digest[14 + i] * height // 256
+            radius = 40 + digest[20 + i] % 160
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius),
+                         fill=tuple(digest[(i * 3) % 29:(i * 3) % 29 + 3]))
+
+        return encode_image(image, max_size)
+
+    def generate_speech(self, text: str) -> bytes:
+        self._request(self.speech_model)
+        digest = self._digest(text)
+
+        # As long as the text would take to read aloud
+        seconds = max(1.5, len(text.split()) / self.WORDS_PER_SECOND)
+        frequency = 180 + digest[0] % 200
+        num_samples = int(seconds * self.SAMPLE_RATE)
+
+        # Square-ish pulse tone generated per 10 ms block (cheap, no numpy)
+        block = self.SAMPLE_RATE // 100
+        period = max(2, self.SAMPLE_RATE // frequency)
+        pattern = b''.join(
+            struct.pack('<h', 6000 if (i % period) < period // 2 else -6000) for i in range(period)
+        )
+        tone = (pattern * (block // period + 2))[:block * 2]
+        silence = b'\x00\x00' * block
+        frames = bytearray()
+        for i in range(num_samples // block):
+            # 0.2 s pauses every second, like gaps between phrases
+            frames += silence if i % 100 >= 80 else tone
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.SAMPLE_RATE)
+            wav.writeframes(bytes(frames))
+        return buffer.getvalue()
+
+
+def get_provider(name: Optional[str] = None, api_key: Optional[str] = None) -> AssetProvider:
+    """
+    Create the configured provider backend
+
+    Args:
+        name: "gemini" or "local" (default: VIDEO_PROVIDER env, else "gemini")
+        api_key: Gemini API key
+
+    The local backend reads LOCAL_PROVIDER_LATENCY (seconds),
+    LOCAL_PROVIDER_FAILURE_RATE (0-1), LOCAL_PROVIDER_SEED and
+    LOCAL_PROVIDER_RPM (simulated per-model quota).
+    """
+    name = (name or os.getenv('VIDEO_PROVIDER', 'gemini')).lower()
+    if name == 'gemini':
+        return GeminiProvider(api_key)
+    if name == 'local':
+        seed = os.getenv('LOCAL_PROVIDER_SEED')
+        return LocalProvider(
+            latency=float(os.getenv('LOCAL_PROVIDER_LATENCY', '0')),
+            failure_rate=float(os.getenv('LOCAL_PROVIDER_FAILURE_RATE', '0')),
+            seed=int(seed) if seed is not None else None,
+            quota_rpm=float(os.getenv('LOCAL_PROVIDER_RPM', '0'))
+        )
+    raise ValueError(f"Unknown provider: {name}")
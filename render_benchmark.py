@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Render Benchmark
+Times the FFmpeg render pipeline of VideoGenerator on synthetic fixtures
+(Pillow images, generated PCM WAVs, multilingual captions), so it runs
+offline without an API key.
+
+Stages:
+    text    _create_text_filter (caption -> drawtext filter string)
+    scene   _create_scene_video (one scene clip)
+    concat  _concatenate_videos_with_transitions (crossfade assembly)
+    full    generate_video (all scenes + assembly)
+
+Each stage is swept one parameter at a time around a base case (scene
+count, scene duration, aspect ratio, caption length and language, image
+size) and reports wall time, CPU time (Python + FFmpeg) and the encoder's
+speed factor (seconds of video per second of wall time).
+
+Usage:
+    python render_benchmark.py
+    python render_benchmark.py --quick --stages scene,full
+    python render_benchmark.py --repeat 3 --json benchmark.json
+    python render_benchmark.py --repeat 5 --save --label baseline
+    python render_benchmark.py --profile-filters          # CPU per filter and effect
+"""
+
+import argparse
+import array
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from capabilities import ffmpeg_version, has_filter, require_ffmpeg
+from providers import IMAGE_SIZES
+from video_generator import VideoGenerator, RenderContext
+
+
+STAGES = ('text', 'scene', 'concat', 'full')
+ASPECT_RATIOS = ('16:9', '9:16', '1:1')
+
+# One voice-over sentence per script; unspaced scripts are repeated by character
+CAPTION_SAMPLES = {
+    'latin': "The ancient river carved a deep canyon through layers of red stone over millions of years",
+    'hindi': "प्राचीन नदी ने लाखों वर्षों में लाल पत्थर की परतों के बीच एक गहरी घाटी बनाई",
+    'malayalam': "പുരാതന നദി ദശലക്ഷക്കണക്കിന് വർഷങ്ങൾ കൊണ്ട് ചുവന്ന പാറകളിലൂടെ ആഴമുള്ള മലയിടുക്ക് രൂപപ്പെടുത്തി",
+    'arabic': "نحت النهر القديم واديا عميقا عبر طبقات الحجر الأحمر على مدى ملايين السنين",
+    'chinese': "古老的河流在数百万年间穿过层层红色岩石刻出了一道深谷",
+    'japanese': "古代の川は何百万年もかけて赤い岩の層に深い峡谷を刻んだ",
+    'korean': "고대의 강은 수백만 년에 걸쳐 붉은 암석층을 깎아 깊은 협곡을 만들었다",
+    'mixed': "The ancient river നദി carved a deep घाटी through layers of red stone الحجر over millions "
+             "of years 古老的河流 and the canyon 협곡 remains",
+}
+
+# Words of a long voice-over (several minutes of speech in one scene)
+LONG_VOICE_OVER_WORDS = 600
+
+# Base case of every sweep; each sweep varies one parameter
+BASE_CASE = {
+    'scenes': 3,
+    'duration': 4.0,
+    'aspect_ratio': '16:9',
+    'words': 30,
+    'language': 'latin',
+    'image_scale': 1.0,
+}
+
+SWEEPS = {
+    'text': {'words': [5, 30, 120], 'language': list(CAPTION_SAMPLES), 'aspect_ratio': list(ASPECT_RATIOS)},
+    'scene': {'duration': [2.0, 4.0, 8.0], 'aspect_ratio': list(ASPECT_RATIOS),
+              'image_scale': [0.5, 1.0, 2.0], 'words': [0, 30, 120]},
+    'concat': {'scenes': [2, 4, 8], 'duration': [2.0, 4.0, 8.0]},
+    'full': {'scenes': [1, 3, 6], 'aspect_ratio': list(ASPECT_RATIOS)},
+}
+
+QUICK_SWEEPS = {
+    'text': {'words': [5, 120], 'language': ['latin', 'hindi', 'chinese', 'mixed']},
+    'scene': {'duration': [2.0], 'aspect_ratio': ['16:9', '9:16']},
+    'concat': {'scenes': [2, 4]},
+    'full': {'scenes': [2]},
+}
+
+# Cases outside the one-parameter sweeps: long voice-overs in every script
+EXTRA_CASES = {
+    'text': [{'words': LONG_VOICE_OVER_WORDS, 'language': language} for language in CAPTION_SAMPLES],
+}
+
+# Calls per sample of the (pure Python) text filter stage
+TEXT_FILTER_CALLS = 200
+
+
+class Fixtures:
+    """Synthetic scene assets, generated once per parameter set into a directory"""
+
+    def __init__(self, root: str, seed: int = 7):
+        self.root = root
+        self.seed = seed
+        self._paths: Dict[tuple, str] = {}
+
+    def image(self, aspect_ratio: str, scale: float = 1.0, variant: int = 0) -> str:
+        """JPEG at the provider's size for the aspect ratio, times scale"""
+        key = ('image', aspect_ratio, scale, variant)
+        if key not in self._paths:
+            from PIL import Image, ImageDraw, ImageFilter
+
+            base_width, base_height = IMAGE_SIZES[aspect_ratio]
+            width, height = int(base_width * scale), int(base_height * scale)
+            rng = random.Random(self.seed + variant)
+            # Gradient, shapes and grain: detail for the encoder like a real photo
+            image = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+            tint = Image.new('RGB', (width, height), tuple(rng.randrange(256) for _ in range(3)))
+            image = Image.blend(image, tint, 0.5)
+            draw = ImageDraw.Draw(image)
+            for _ in range(40):
+                x, y = rng.randrange(width), rng.randrange(height)
+                radius = rng.randrange(max(2, min(width, height) // 6))
+                draw.ellipse((x - radius, y - radius, x + radius, y + radius),
+                             fill=tuple(rng.randrange(256) for _ in range(3)))
+            image = image.filter(ImageFilter.GaussianBlur(2))
+            grain = Image.effect_noise((width, height), 24).convert('RGB')
+            image = Image.blend(image, grain, 0.15)
+
+            path = os.path.join(self.root, f"image_{aspect_ratio.replace(':', 'x')}_{scale}_{variant}.jpg")
+            image.save(path, 'JPEG', quality=92)
+            self._paths[key] = path
+        return self._paths[key]
+
+    def audio(self, seconds: float, sample_rate: int = 24000) -> str:
+        """16-bit mono PCM WAV of a warbling tone (like the speech provider's output)"""
+        key = ('audio', seconds, sample_rate)
+        if key not in self._paths:
+            samples = array.array('h', (
+                int(8000 * math.sin(2 * math.pi * (220 + 40 * math.sin(n / sample_rate * 3)) * n / sample_rate))
+                for n in range(int(seconds * sample_rate))
+            ))
+            if sys.byteorder == 'big':
+                samples.byteswap()
+            path = os.path.join(self.root, f"audio_{seconds}s.wav")
+            with wave.open(path, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(sample_rate)
+                wav_file.writeframes(samples.tobytes())
+            self._paths[key] = path
+        return self._paths[key]
+
+    @staticmethod
+    def caption(language: str, words: int) -> str:
+        """Caption of about `words` words in a script (characters for unspaced scripts)"""
+        tokens = CAPTION_SAMPLES[language].split()
+        if len(tokens) == 1:
+            text = CAPTION_SAMPLES[language]
+            return (text * (words // len(text) + 1))[:words]
+        return ' '.join(tokens[i % len(tokens)] for i in range(words))
+
+    def scene(self, params: Dict, index: int = 0) -> Dict:
+        """Scene dictionary as passed to VideoGenerator"""
+        return {
+            'image_path': self.image(params['aspect_ratio'], params['image_scale'], index % 4),
+            'audio_path': self.audio(params['duration']),
+            'caption': self.caption(params['language'], max(1, params['words'])),
+        }
+
+
+def build_cases(stages: List[str], quick: bool = False) -> List[Dict]:
+    """Base case plus one case per swept value (and the extra cases), for each stage"""
+    sweeps = QUICK_SWEEPS if quick else SWEEPS
+    cases = []
+    for stage in stages:
+        seen = set()
+        variants = [dict(BASE_CASE)]
+        for name, values in sweeps[stage].items():
+            variants.extend(dict(BASE_CASE, **{name: value}) for value in values)
+        if not quick:
+            variants.extend(dict(BASE_CASE, **extra) for extra in EXTRA_CASES.get(stage, []))
+        for params in variants:
+            key = tuple(sorted(params.items()))
+            if key not in seen:
+                seen.add(key)
+                cases.append({'stage': stage, 'params': params})
+    return cases
+
+
+class RenderBenchmark:
+    def __init__(self, work_dir: str, fps: int = 30, captions: bool = True):
+        """
+        Args:
+            work_dir: Directory for fixtures and rendered clips
+            fps: Frames per second of every render
+            captions: Burn in captions (needs FFmpeg's drawtext filter)
+        """
+        self.work_dir = work_dir
+        self.fps = fps
+        self.captions = captions
+        self.fixtures = Fixtures(os.path.join(work_dir, "fixtures"))
+        os.makedirs(self.fixtures.root, exist_ok=True)
+        self.generator = VideoGenerator(output_dir=os.path.join(work_dir, "output"))
+
+    def run_case(self, stage: str, params: Dict) -> Dict:
+        """Time one case; returns wall/CPU seconds, speed factor, peak memory and output size"""
+        # Fixtures are built before the clock starts
+        scenes = [self.fixtures.scene(params, i) for i in range(params['scenes'])]
+        width, height = self.generator.get_dimensions(params['aspect_ratio'])
+        enable_captions = self.captions and params['words'] > 0
+        ctx = RenderContext(temp_root=self.work_dir)
+        try:
+            if stage == 'concat':
+                # Scene clips are inputs here, not part of the measurement
+                clips = [self.generator._create_scene_video(
+                    ctx, scene, i, width, height, self.fps, 0.5, enable_captions=False
+                ) for i, scene in enumerate(scenes)]
+                ctx.cpu_seconds = 0.0
+                ctx.peak_rss_kb = 0
+
+            cpu_start = time.process_time()
+            wall_start = time.perf_counter()
+            if stage == 'text':
+                for _ in range(TEXT_FILTER_CALLS):
+                    self.generator._create_text_filter(scenes[0]['caption'], width, height,
+                                                       params['duration'], 0)
+                media_seconds = 0.0
+                output_path = None
+            elif stage == 'scene':
+                output_path = self.generator._create_scene_video(
+                    ctx, scenes[0], 0, width, height, self.fps, 0.5, enable_captions=enable_captions
+                )
+                media_seconds = params['duration']
+            elif stage == 'concat':
+                output_path = os.path.join(ctx.temp_dir, "assembled.mp4")
+                self.generator._concatenate_videos_with_transitions(ctx, clips, output_path, self.fps, 0.5)
+                media_seconds = sum(scene['duration'] for scene in ctx.timeline) - 0.5 * (len(clips) - 1)
+            else:
+                output_path = self.generator.generate_video(
+                    scenes, output_filename=f"benchmark_{ctx.job_id[:8]}.mp4",
+                    aspect_ratio=params['aspect_ratio'], fps=self.fps,
+                    enable_captions=enable_captions, context=ctx
+                )
+                media_seconds = params['duration'] * len(scenes) - 0.5 * (len(scenes) - 1)
+            wall = time.perf_counter() - wall_start
+            python_cpu = time.process_time() - cpu_start
+            # Scene and concat outputs live in the temp directory
+            output_bytes = os.path.getsize(output_path) if output_path else 0
+        finally:
+            ctx.cleanup()
+
+        if stage == 'text':
+            wall /= TEXT_FILTER_CALLS
+            python_cpu /= TEXT_FILTER_CALLS
+
+        sample = {
+            'wallSeconds': wall,
+            'cpuSeconds': python_cpu + ctx.cpu_seconds,
+            'speed': media_seconds / wall if media_seconds and wall > 0 else None,
+            'peakRssKb': ctx.peak_rss_kb,
+            'outputBytes': output_bytes,
+        }
+        if stage == 'full':
+            os.remove(output_path)
+            sample['stageTimings'] = dict(ctx.stage_timings)
+        return sample
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    """Median of every measurement over the samples of a case"""
+    summary = {}
+    for key in samples[0]:
+        if isinstance(samples[0][key], dict):
+            continue
+        values = [sample[key] for sample in samples if sample[key] is not None]
+        summary[key] = statistics.median(values) if values else None
+    return summary
+
+
+def describe(params: Dict) -> str:
+    """Short label of a case's parameters"""
+    return (f"{params['scenes']}x{params['duration']:g}s {params['aspect_ratio']:>4} "
+            f"{params['words']:>4}w {params['language']:<9} img×{params['image_scale']:g}")
+
+
+def run_benchmark(stages: List[str], quick: bool = False, repeat: int = 1, fps: int = 30,
+                  work_dir: Optional[str] = None, on_case_done=None) -> Dict:
+    """
+    Run every case of the selected stages
+
+    Args:
+        stages: Stages to run (see STAGES)
+        quick: Use the short sweeps
+        repeat: Samples per case (the summary is their median), taken in
+                rounds over all cases
+        fps: Frames per second of every render
+        work_dir: Directory for fixtures and renders (temporary if omitted)
+        on_case_done: Called with each finished case
+
+    Returns:
+        Report with FFmpeg version, settings and one entry per case
+    """
+    if any(stage != 'text' for stage in stages):
+        require_ffmpeg()
+    captions = has_filter('drawtext')
+    owns_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="render_benchmark_")
+    benchmark = RenderBenchmark(work_dir, fps=fps, captions=captions)
+
+    cases = [dict(case, samples=[]) for case in build_cases(stages, quick)]
+    try:
+        # Repeats run in rounds over all cases rather than back to back, so
+        # machine drift during the run shows up as variance within each case
+        # instead of as a difference between cases or runs
+        for round_index in range(repeat):
+            for case in cases:
+                # The generator's progress logs would drown the report
+                with contextlib.redirect_stdout(io.StringIO()):
+                    case['samples'].append(benchmark.run_case(case['stage'], case['params']))
+                if round_index == repeat - 1:
+                    case['summary'] = summarize(case['samples'])
+                    if on_case_done:
+                        on_case_done(case)
+    finally:
+        if owns_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'createdAt': datetime.now().isoformat(timespec='seconds'),
+        'ffmpegVersion': ffmpeg_version(),
+        'fps': fps,
+        'repeat': repeat,
+        'captions': captions,
+        'cases': cases,
+    }
+
+
+def profile_filters(repeat: int = 1, fps: int = 30, seconds: float = 3.0,
+                    work_dir: Optional[str] = None) -> Dict:
+    """
+    Per-filter CPU cost of a base-case scene, for every zoom/pan effect
+    (see VideoGenerator.profile_scene_filters)
+    """
+    require_ffmpeg()
+    captions = has_filter('drawtext')
+    owns_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="render_benchmark_")
+    try:
+        benchmark = RenderBenchmark(work_dir, fps=fps, captions=captions)
+        params = dict(BASE_CASE, duration=seconds)
+        with contextlib.redirect_stdout(io.StringIO()):
+            effects = benchmark.generator.profile_scene_filters(
+                benchmark.fixtures.scene(params), params['aspect_ratio'], fps,
+                seconds=seconds, repeat=repeat, enable_captions=captions
+            )
+    finally:
+        if owns_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'createdAt': datetime.now().isoformat(timespec='seconds'),
+        'ffmpegVersion': ffmpeg_version(),
+        'fps': fps,
+        'repeat': repeat,
+        'captions': captions,
+        'params': params,
+        'effects': effects,
+    }
+
+
+def print_filter_profile(report: Dict):
+    """Print the hot filters of each effect, most expensive first"""
+    for effect, profile in report['effects'].items():
+        print(f"\n🔥 {effect}: {profile['msPerFrame']:.1f} ms/frame over {profile['frames']} frames "
+              f"({profile['cpuSeconds']:.2f}s CPU)")
+        for cost in profile['filters']:
+            print(f"   {cost['filter']:<10} {cost['msPerFrame']:7.1f} ms/frame {cost['share']:>6.0%}")
+        other = profile['otherSeconds']
+        print(f"   {'other':<10} {other * 1000 / profile['frames']:7.1f} ms/frame "
+              f"{other / profile['cpuSeconds'] if profile['cpuSeconds'] else 0:>6.0%}")
+
+
+def print_case(case: Dict):
+    """Print one finished case"""
+    summary = case['summary']
+    if case['stage'] == 'text':
+        timing = f"{summary['wallSeconds'] * 1e6:8.0f} µs wall {summary['cpuSeconds'] * 1e6:7.0f} µs CPU"
+    else:
+        timing = f"{summary['wallSeconds']:8.2f} s wall  {summary['cpuSeconds']:7.2f} s CPU"
+    speed = f"{summary['speed']:5.2f}x" if summary['speed'] else "     -"
+    print(f"   {case['stage']:<6} {describe(case['params'])}  {timing}  {speed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the FFmpeg render pipeline offline")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages (default: {','.join(STAGES)})")
+    parser.add_argument('--quick', action='store_true', help="Short sweeps (a few minutes)")
+    parser.add_argument('--repeat', type=int, default=1, help="Samples per case (default: 1)")
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--work-dir', help="Keep fixtures and renders here (default: temporary)")
+    parser.add_argument('--json', help="Also write the report as JSON")
+    parser.add_argument('--save', action='store_true',
+                        help="Add the run to the benchmark history (see benchmark_history.py)")
+    parser.add_argument('--label', help="Label of the saved history record")
+    parser.add_argument('--history-dir', help="History directory (default: benchmark_history/)")
+    parser.add_argument('--profile-filters', action='store_true',
+                        help="Instead of the sweeps, rank the scene filters by CPU cost per effect")
+    args = parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    print("⏱️  AI Video Weaver - Render Benchmark")
+    print("=" * 50)
+    print(f"🎥 {ffmpeg_version() or 'FFmpeg not found'}")
+    if not has_filter('drawtext'):
+        print("⚠️  FFmpeg has no drawtext filter: scenes are rendered without captions")
+
+    if args.profile_filters:
+        report = profile_filters(args.repeat, args.fps, work_dir=args.work_dir)
+        print_filter_profile(report)
+    else:
+        report = run_benchmark(stages, args.quick, args.repeat, args.fps, args.work_dir,
+                               on_case_done=print_case)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📄 Report: {args.json}")
+    if args.save and not args.profile_filters:
+        from benchmark_history import make_record, save_record
+        path = save_record(make_record(report, args.label), args.history_dir)
+        print(f"📚 History record: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Render Workers
+Runs renders in a pool of prewarmed worker processes, apart from the HTTP
+server's request threads
+
+Workers are started with the spawn method and warmed by the pool's
+initializer before their first job: modules imported, FFmpeg's version,
+encoders and filters probed, fonts indexed and the cost model calibrated.
+After workers x max_jobs_per_worker jobs the pool starts and warms a new
+set of workers in the background and switches to it, while the old ones
+finish their running jobs. That bounds the memory a long-lived render
+process can accumulate, and no job ever waits for a cold worker. A worker
+that dies abruptly breaks the whole executor; the pool then replaces it.
+Progress events of jobs travel back to the server over a queue.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+from admission import CostModel, load_metric_records
+from capabilities import ffmpeg_encoders, ffmpeg_filters, ffmpeg_version
+from font_index import font_index
+from progress_events import RenderProgress
+from video_catalog import VideoCatalog
+from video_generator import VideoGenerator, RenderContext
+
+
+# Jobs per render worker (on average) before the workers are replaced; 0 keeps them
+MAX_JOBS_PER_WORKER = int(os.getenv('RENDER_WORKER_MAX_JOBS', '20'))
+
+# Seconds prefork() waits for all workers to be up
+PREFORK_TIMEOUT = 120
+
+# ProcessPoolExecutor.shutdown() takes cancel_futures from Python 3.9
+CANCELS_FUTURES = sys.version_info >= (3, 9)
+
+# State of a worker process, set by _init_worker
+_generator: Optional[VideoGenerator] = None
+_events = None
+_prefork_barrier = None
+
+
+def render_job(generator: VideoGenerator, job_id: str, scenes: List[Dict], render_options: Dict,
+               feed=None, **kwargs) -> Dict:
+    """
+    Render one job and return its measurements
+
+    Used both in worker processes and in-process by the development server.
+
+    Args:
+        generator: VideoGenerator to render with
+        job_id: Job ID (names the render context)
+        scenes: Processed scenes (local image/audio paths)
+        render_options: Keyword arguments for VideoGenerator.generate_video
+        feed: Progress feed of the job (anything with publish(event, data))
+        **kwargs: Extra keyword arguments for VideoGenerator.generate_video
+
+    Returns:
+        Dictionary with output_path, cpu_seconds, temp_bytes,
+        audio_durations, stage_timings and the rendering pid
+    """
+    context = RenderContext(job_id)
+    if feed is not None:
+        context.on_progress = RenderProgress(feed, context, len(scenes))
+    output_path = generator.generate_video(
+        scenes=scenes,
+        context=context,
+        **render_options,
+        **kwargs
+    )
+    return {
+        'output_path': output_path,
+        'cpu_seconds': context.cpu_seconds,
+        'temp_bytes': context.temp_bytes,
+        'audio_durations': dict(context.audio_durations),
+        'stage_timings': dict(context.stage_timings),
+        'pid': os.getpid(),
+    }
+
+
+class _QueueFeed:
+    """Progress feed of a job in a worker: events are queued for the server process"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+
+    def publish(self, event: str, data: Dict):
+        _events.put((self.job_id, event, data))
+
+
+def _init_worker(output_dir: str, catalog_path: str, metrics_path: str, events, prefork_barrier):
+    """Warm a fresh worker process (runs once per process, before its first task)"""
+    global _generator, _events, _prefork_barrier
+    _events = events
+    _prefork_barrier = prefork_barrier
+
+    # Cached per process: probe now rather than inside the first job
+    ffmpeg_version()
+    ffmpeg_encoders()
+    ffmpeg_filters()
+
+    cost_model = CostModel()
+    cost_model.calibrate(load_metric_records(metrics_path))
+    _generator = VideoGenerator(output_dir=output_dir, catalog=VideoCatalog(catalog_path),
+                                cost_model=cost_model)
+    font_index()
+
+
+def _warm_up() -> int:
+    # Holding each warm-up task until all have started makes every worker take exactly one
+    try:
+        _prefork_barrier.wait(PREFORK_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    return os.getpid()
+
+
+def _render_in_worker(job_id: str, scenes: List[Dict], render_options: Dict, kwargs: Dict) -> Dict:
+    return render_job(_generator, job_id, scenes, render_options, _QueueFeed(job_id), **kwargs)
+
+
+class RenderPool:
+    def __init__(self, workers: int, output_dir: str, catalog_path: str, metrics_path: str,
+                 max_jobs_per_worker: int = MAX_JOBS_PER_WORKER,
+                 on_event: Optional[Callable[[str, str, Dict], None]] = None):
+        """
+        Pool of render worker processes
+
+        Args:
+            workers: Worker processes (renders that can run at once)
+            output_dir: Directory for generated videos
+            catalog_path: Video catalog database the workers record renders in
+            metrics_path: Render metrics JSONL the workers' cost models are calibrated from
+            max_jobs_per_worker: Jobs per worker (on average) before the
+                                 workers are replaced; 0 keeps them
+            on_event: Called as on_event(job_id, event, data) in the server
+                      process for every progress event of a job
+        """
+        self.workers = workers
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._on_event = on_event
+        self._initargs = (output_dir, catalog_path, metrics_path)
+        # Executors replaced after a worker died abruptly (killed, out of memory)
+        self.restarts = 0
+        # Executors replaced after max_jobs_per_worker jobs per worker
+        self.recycles = 0
+        self._context = multiprocessing.get_context('spawn')
+        self._events = self._context.Queue()
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._jobs = 0  # jobs submitted to the current executor
+        self._recycling = False
+        self._closed = False
+        self._relay = threading.Thread(target=self._relay_events, name="render-events", daemon=True)
+        self._relay.start()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        """Executor of fresh, lazily started workers"""
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=self._initargs + (self._events, self._context.Barrier(self.workers))
+        )
+
+    def _warm(self, executor: ProcessPoolExecutor) -> list:
+        """Start every worker of an executor; jobs submitted later queue behind the warm-ups"""
+        # The pool starts a process per submitted task while none is idle
+        return [executor.submit(_warm_up) for _ in range(self.workers)]
+
+    def prefork(self) -> List[int]:
+        """
+        Start and warm every worker now instead of on the first requests
+
+        Returns:
+            PIDs of the workers
+        """
+        return [future.result() for future in self._warm(self._executor)]
+
+    def _recycle(self):
+        """Replace the workers with warmed ones; the old ones finish their running jobs"""
+        executor = self._new_executor()
+        try:
+            pids = [future.result() for future in self._warm(executor)]
+        except Exception as e:
+            print(f"⚠️  Could not start replacement render workers: {e}")
+            executor.shutdown(wait=False)
+            with self._executor_lock:
+                self._recycling = False
+            return
+
+        with self._executor_lock:
+            self._recycling = False
+            if self._closed:
+                # The pool was shut down meanwhile
+                old = executor
+            else:
+                old, self._executor = self._executor, executor
+                self._jobs = 0
+                self.recycles += 1
+        if old is executor:
+            executor.shutdown(wait=True)
+            return
+        print(f"♻️  Render workers replaced (pids {', '.join(str(pid) for pid in sorted(set(pids)))})")
+        old.shutdown(wait=True)
+
+    def render(self, job_id: str, scenes: List[Dict], render_options: Dict, **kwargs) -> Dict:
+        """
+        Render a job in a worker process and wait for it (see render_job)
+
+        Raises:
+            Whatever the render raised in the worker
+        """
+        with self._executor_lock:
+            executor = self._executor
+            self._jobs += 1
+            if (self.max_jobs_per_worker and not self._recycling and not self._closed
+                    and self._jobs >= self.workers * self.max_jobs_per_worker):
+                # The current workers have had their share: warm their replacements meanwhile
+                self._recycling = True
+                threading.Thread(target=self._recycle, name="render-recycle", daemon=True).start()
+        try:
+            future = executor.submit(_render_in_worker, job_id, scenes, render_options, kwargs)
+            return future.result()
+        except BrokenProcessPool:
+            # Every job on the broken executor fails; the next ones get new workers,
+            # which start warming right away
+            with self._executor_lock:
+                if self._executor is executor and not self._closed:
+                    print("⚠️  A render worker died; starting new render workers")
+                    self._executor = self._new_executor()
+                    self._jobs = 0
+                    self._warm(self._executor)
+                    self.restarts += 1
+            executor.shutdown(wait=False)
+            raise
+
+    def _relay_events(self):
+        """Hand progress events from the workers to on_event"""
+        while True:
+            item = self._events.get()
+            if item is None:
+                return
+            if self._on_event is not None:
+                try:
+                    self._on_event(*item)
+                except Exception as e:
+                    print(f"⚠️  Progress event relay failed: {e}")
+
+    def shutdown(self):
+        """Finish running renders, stop the workers and the event relay"""
+        with self._executor_lock:
+            self._closed = True
+        if CANCELS_FUTURES:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            self._executor.shutdown(wait=True)
+        self._events.put(None)
+        self._relay.join(timeout=5)
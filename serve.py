@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Production Server
+Serves the API with waitress (a production WSGI server) instead of Flask's
+development server, with renders in separate worker processes
+
+HTTP requests (uploads, downloads, renders) are handled by a fixed pool of
+waitress threads in this process, which also owns the render queue, progress
+feeds and metrics. Requests that hold a thread for long are all bounded
+(waiting and running renders by admission control), and the pool has room
+for all of them plus spare threads for short requests. Progress event
+streams are redirected to an event server on --events-port, which serves
+all of them from one thread. Renders run in a pool of prewarmed worker
+processes (one per render slot).
+
+Usage:
+    python serve.py
+    python serve.py --port 8000 --render-workers 4 --max-jobs-per-worker 10
+    python load_generator.py --concurrency 8 --requests 32   # measure throughput
+"""
+
+import argparse
+import signal
+import sys
+
+from waitress import create_server
+
+from progress_events import MAX_DISPATCHED_SUBSCRIBERS, EventServer
+from render_workers import MAX_JOBS_PER_WORKER, RenderPool
+
+
+# Threads for short requests (health, metrics, downloads) on top of the long-held ones
+SPARE_THREADS = 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API server with render worker processes")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--render-workers', type=int,
+                        help="Render worker processes (default: MAX_CONCURRENT_RENDERS, one per 4 cores)")
+    parser.add_argument('--max-jobs-per-worker', type=int, default=MAX_JOBS_PER_WORKER,
+                        help=f"Jobs per worker before the workers are replaced by warmed ones "
+                             f"(default: {MAX_JOBS_PER_WORKER}; 0 keeps them)")
+    parser.add_argument('--threads', type=int,
+                        help=f"HTTP threads (default: render slots + render queue + {SPARE_THREADS})")
+    parser.add_argument('--events-port', type=int,
+                        help="Port of the progress event server (default: --port + 1)")
+    parser.add_argument('--max-event-streams', type=int, default=MAX_DISPATCHED_SUBSCRIBERS,
+                        help=f"Event streams open at once (default: {MAX_DISPATCHED_SUBSCRIBERS}; "
+                             f"each uses a file descriptor)")
+    args = parser.parse_args()
+
+    import api_server
+    api_server.init_app()
+
+    # One worker per render slot: admission control decides when a job may start
+    if args.render_workers:
+        api_server.admission.max_concurrent = args.render_workers
+    workers = api_server.admission.max_concurrent
+    threads = args.threads or workers + api_server.admission.max_queue + SPARE_THREADS
+
+    print("🎬 AI Video Weaver API Server (production)")
+    print("=" * 50)
+    if args.max_jobs_per_worker:
+        print(f"🏭 Starting {workers} render worker(s), replaced every {args.max_jobs_per_worker} jobs each...")
+    else:
+        print(f"🏭 Starting {workers} render worker(s)...")
+    pool = RenderPool(
+        workers,
+        output_dir=str(api_server.OUTPUT_FOLDER),
+        catalog_path=api_server.catalog.db_path,
+        metrics_path=str(api_server.admission.metrics_path),
+        max_jobs_per_worker=args.max_jobs_per_worker,
+        on_event=api_server.progress.publish
+    )
+    pids = pool.prefork()
+    print(f"✅ Render workers warm (pids {', '.join(str(pid) for pid in sorted(set(pids)))})")
+    api_server.render_pool = pool
+
+    events = EventServer(api_server.progress, host=args.host,
+                         port=args.events_port or args.port + 1,
+                         max_subscribers=args.max_event_streams)
+    events.start()
+    api_server.event_server = events
+
+    api_server.startup_cleanup()
+
+    server = create_server(api_server.app, host=args.host, port=args.port, threads=threads)
+
+    def stop(signum, frame):
+        # Further signals must not interrupt the shutdown below
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    print(f"🚀 Serving on http://{args.host}:{args.port} with {threads} threads")
+    print(f"📡 Event streams on port {events.port} (up to {events.max_subscribers}, one thread for all)")
+    try:
+        # Returns on Ctrl+C / SIGTERM (waitress catches the KeyboardInterrupt and stops its threads)
+        server.run()
+    finally:
+        print("\n🛑 Shutting down (waiting for running renders)...")
+        server.close()
+        events.stop()
+        pool.shutdown()
+        api_server.storage.stop_janitor()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,41 @@ interface VideoGenerationError {
   details?: string;
 }
 
+export interface RenderProgress {
+  stage: 'uploading' | 'queued' | 'scene' | 'assembly';
+  scene?: number | null;
+  scenes?: number;
+  fraction: number;           // 0..1 of the whole render
+  etaSeconds?: number | null;
+}
+
+/**
+ * Subscribe to a render job's server-sent progress events
+ * @returns Function closing the subscription
+ */
+const subscribeToRenderProgress = (
+  jobId: string,
+  onProgress: (progress: RenderProgress) => void
+): (() => void) => {
+  const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+  let last: RenderProgress = { stage: 'uploading', fraction: 0 };
+
+  // Stage events carry no fraction: keep the last one
+  const update = (event: Event) => {
+    last = { ...last, ...JSON.parse((event as MessageEvent).data) };
+    onProgress(last);
+  };
+  source.addEventListener('stage', update);
+  source.addEventListener('progress', update);
+  source.addEventListener('completed', () => {
+    onProgress({ ...last, fraction: 1, etaSeconds: 0 });
+    source.close();
+  });
+  source.addEventListener('failed', () => source.close());
+
+  return () => source.close();
+};
+
 /**
  * Generate video using Python FFmpeg backend
  * @param scenes Array of scenes with images and audio
@@ -22,6 +57,7 @@ interface VideoGenerationError {
  * @param fps Frames per second
  * @param filename Output filename
  * @param enableCaptions Whether to display captions on video
+ * @param onProgress Called with live render progress (stage, fraction, ETA)
  * @returns Promise with video URL
  */
 export const generateVideoWithFFmpeg = async (
@@ -30,8 +66,13 @@ export const generateVideoWithFFmpeg = async (
   transitionDuration: number = 0.5,
   fps: number = 30,
   filename: string = 'ai-video.mp4',
-  enableCaptions: boolean = true
+  enableCaptions: boolean = true,
+  onProgress?: (progress: RenderProgress) => void
 ): Promise<string> => {
+  // Our own job id lets us subscribe to progress before the render request returns
+  const jobId = crypto.randomUUID().replace(/-/g, '');
+  const unsubscribe = onProgress ? subscribeToRenderProgress(jobId, onProgress) : () => {};
+
   try {
     const response = await fetch(`${API_BASE_URL}/generate-video`, {
       method: 'POST',
@@ -51,6 +92,7 @@ export const generateVideoWithFFmpeg = async (
         fps,
         filename,
         enableCaptions,
+        jobId,
       }),
     });
 
@@ -66,6 +108,8 @@ export const generateVideoWithFFmpeg = async (
   } catch (error) {
     console.error('Error generating video with FFmpeg:', error);
     throw error;
+  } finally {
+    unsubscribe();
   }
 };
 
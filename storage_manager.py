@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Storage Manager
+Tracks generated outputs, uploads and cache artifacts in a persistent index
+with reference counts, and evicts them from a background janitor thread
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class StorageManager:
+    def __init__(self, index_path: str,
+                 quotas: Optional[Dict[str, float]] = None,
+                 max_ages: Optional[Dict[str, float]] = None,
+                 min_free_gb: float = 3.0,
+                 adopt_grace: float = 3600,
+                 janitor_interval: float = 60):
+        """
+        Initialize the storage manager
+
+        Args:
+            index_path: JSON file holding the index of tracked artifacts
+            quotas: Disk quota per kind in GB (e.g. {"output": 10, "cache": 2})
+            max_ages: Maximum idle time per kind in seconds; unreferenced
+                      entries not accessed for longer are evicted
+            min_free_gb: Evict least recently used outputs/cache entries while
+                         the disk has less free space than this
+            adopt_grace: Untracked files found on disk are only adopted into
+                         the index once they are older than this (seconds), so
+                         files another process is still writing are left alone
+            janitor_interval: Seconds between background janitor passes
+        """
+        self.index_path = Path(index_path)
+        self.quotas = quotas or {}
+        self.max_ages = max_ages or {}
+        self.min_free_gb = min_free_gb
+        self.adopt_grace = adopt_grace
+        self.janitor_interval = janitor_interval
+
+        self._entries: Dict[str, Dict] = {}
+        self._roots: List[tuple] = []
+        self._evict_callbacks: List[Callable[[str, str], None]] = []
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._stop_event = threading.Event()
+        self._janitor_thread = None
+
+        self._load_index()
+
+    def _load_index(self):
+        """Load the index from disk (reference counts never survive a restart)"""
+        if not self.index_path.exists():
+            return
+
+        try:
+            with open(self.index_path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read storage index {self.index_path}: {e}")
+            return
+
+        for path, entry in entries.items():
+            entry['refs'] = 0
+            self._entries[path] = entry
+
+    def _save_index(self):
+        """Write the index atomically (caller holds the lock)"""
+        if not self._dirty:
+            return
+
+        entries = {
+            path: {key: value for key, value in entry.items() if key != 'refs'}
+            for path, entry in self._entries.items()
+        }
+        tmp_path = self.index_path.with_suffix('.tmp')
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️  Could not write storage index {self.index_path}: {e}")
+
+    @staticmethod
+    def _get_size(path: Path) -> int:
+        """Size of a file, or total size of a directory tree"""
+        if path.is_dir():
+            return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+        return path.stat().st_size
+
+    def add_root(self, directory: str, kind: str, pattern: str = '*'):
+        """
+        Watch a directory so untracked artifacts are adopted by reconcile()
+
+        Args:
+            directory: Directory holding artifacts of this kind
+            kind: Artifact kind ("output", "upload", "cache", ...)
+            pattern: Glob pattern selecting artifacts inside the directory
+        """
+        self._roots.append((Path(directory), kind, pattern))
+
+    def on_evict(self, callback: Callable[[str, str], None]):
+        """Call callback(path, kind) after the janitor deletes an artifact"""
+        self._evict_callbacks.append(callback)
+
+    def register(self, path: str, kind: str, acquire: bool = False):
+        """
+        Start tracking a file or directory
+
+        Args:
+            path: Path of the artifact
+            kind: Artifact kind ("output", "upload", "cache", ...)
+            acquire: Take a reference right away so the janitor can never
+                     evict the artifact before its user acquires it
+        """
+        key = str(Path(path).resolve())
+        try:
+            size = self._get_size(Path(key))
+        except OSError:
+            size = 0
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {'kind': kind, 'created': now, 'refs': 0}
+                self._entries[key] = entry
+            entry['size'] = size
+            entry['last_access'] = now
+            if acquire:
+                entry['refs'] += 1
+            self._dirty = True
+
+    def acquire(self, path: str):
+        """Take a reference: the artifact is in use and must not be evicted"""
+        key = str(Path(path).resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['refs'] += 1
+                entry['last_access'] = time.time()
+
+    def release(self, path: str):
+        """Drop a reference taken by register(acquire=True) or acquire()"""
+        key = str(Path(path).resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['refs'] = max(0, entry['refs'] - 1)
+                entry['last_access'] = time.time()
+                self._dirty = True
+
+    def touch(self, path: str):
+        """Record an access (e.g. a download) for LRU ordering"""
+        key = str(Path(path).resolve())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['last_access'] = time.time()
+                self._dirty = True
+
+    def usage(self, kind: Optional[str] = None) -> int:
+        """Tracked bytes, for one kind or all kinds"""
+        with self._lock:
+            return sum(
+                entry['size'] for entry in self._entries.values()
+                if kind is None or entry['kind'] == kind
+            )
+
+    def reconcile(self):
+        """
+        Sync the index with the watched directories
+
+        Drops entries whose files are gone and adopts untracked artifacts older
+        than adopt_grace. This is the only directory scan; it runs at startup
+        and from the janitor, never on the request path.
+        """
+        now = time.time()
+        found = []
+        for directory, kind, pattern in self._roots:
+            if not directory.exists():
+                continue
+            for path in directory.glob(pattern):
+                try:
+                    mtime = path.stat().st_mtime
+                except OSError:
+                    continue
+                found.append((str(path.resolve()), kind, mtime))
+
+        with self._lock:
+            for key in list(self._entries):
+                if self._entries[key]['refs'] == 0 and not os.path.exists(key):
+                    del self._entries[key]
+                    self._dirty = True
+
+            for key, kind, mtime in found:
+                if key in self._entries or now - mtime < self.adopt_grace:
+                    continue
+                try:
+                    size = self._get_size(Path(key))
+                except OSError:
+                    continue
+                self._entries[key] = {
+                    'kind': kind, 'size': size, 'created': mtime,
+                    'last_access': mtime, 'refs': 0
+                }
+                self._dirty = True
+
+    def _select_evictions(self) -> List[str]:
+        """Pick unreferenced entries to evict (caller holds the lock)"""
+        now = time.time()
+        victims = set()
+
+        # Idle entries past their kind's maximum age
+        for key, entry in self._entries.items():
+            max_age = self.max_ages.get(entry['kind'])
+            if max_age is not None and entry['refs'] == 0 and now - entry['last_access'] > max_age:
+                victims.add(key)
+
+        # Least recently used entries while a kind is over its quota
+        for kind, quota_gb in self.quotas.items():
+            candidates = sorted(
+                (entry['last_access'], key) for key, entry in self._entries.items()
+                if entry['kind'] == kind and key not in victims
+            )
+            usage = sum(
+                self._entries[key]['size'] for _, key in candidates
+            )
+            quota = quota_gb * (1024**3)
+            for _, key in candidates:
+                if usage <= quota:
+                    break
+                if self._entries[key]['refs'] == 0:
+                    victims.add(key)
+                    usage -= self._entries[key]['size']
+
+        # Least recently used outputs/cache entries while the disk is nearly full
+        try:
+            free = shutil.disk_usage(str(self.index_path.parent)).free
+        except OSError:
+            free = None
+        if free is not None:
+            shortfall = self.min_free_gb * (1024**3) - free
+            shortfall -= sum(self._entries[key]['size'] for key in victims)
+            if shortfall > 0:
+                candidates = sorted(
+                    (entry['last_access'], key) for key, entry in self._entries.items()
+                    if entry['kind'] in ('output', 'cache') and entry['refs'] == 0
+                    and key not in victims
+                )
+                for _, key in candidates:
+                    if shortfall <= 0:
+                        break
+                    victims.add(key)
+                    shortfall -= self._entries[key]['size']
+
+        return list(victims)
+
+    def collect(self) -> Dict[str, int]:
+        """
+        Run one janitor pass: reconcile, evict and persist the index
+
+        Returns:
+            Number of evicted artifacts per kind
+        """
+        self.reconcile()
+
+        with self._lock:
+            victims = [(key, self._entries[key]['kind']) for key in self._select_evictions()]
+            # Forget victims before deleting so nobody can acquire them meanwhile
+            for key, _ in victims:
+                del self._entries[key]
+            if victims:
+                self._dirty = True
+
+        evicted: Dict[str, int] = {}
+        for key, kind in victims:
+            try:
+                if os.path.isdir(key):
+                    shutil.rmtree(key)
+                elif os.path.exists(key):
+                    os.remove(key)
+                evicted[kind] = evicted.get(kind, 0) + 1
+            except OSError as e:
+                print(f"⚠️  Could not remove {key}: {e}")
+                continue
+            for callback in self._evict_callbacks:
+                try:
+                    callback(key, kind)
+                except Exception as e:
+                    print(f"⚠️  Eviction callback failed for {key}: {e}")
+
+        with self._lock:
+            self._save_index()
+
+        if evicted:
+            summary = ", ".join(f"{count} {kind}" for kind, count in evicted.items())
+            print(f"🧹 Storage janitor evicted: {summary}")
+        return evicted
+
+    def _janitor_loop(self):
+        """Background janitor thread body"""
+        while not self._stop_event.wait(self.janitor_interval):
+            try:
+                self.collect()
+            except Exception as e:
+                print(f"⚠️  Storage janitor error: {e}")
+
+    def start_janitor(self):
+        """Start the background janitor thread (idempotent)"""
+        if self._janitor_thread and self._janitor_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._janitor_thread = threading.Thread(
+            target=self._janitor_loop, name="storage-janitor", daemon=True
+        )
+        self._janitor_thread.start()
+
+    def stop_janitor(self):
+        """Stop the janitor thread and persist the index"""
+        self._stop_event.set()
+        if self._janitor_thread:
+            self._janitor_thread.join(timeout=5)
+        with self._lock:
+            self._save_index()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Responsiveness test of the MCP server while renders are running
+
+Starts video jobs with the offline provider and a render that blocks its
+thread for a long time, then checks that list_videos still answers
+promptly. Skipped when the MCP SDK is not installed.
+Run with: python -m pytest test_mcp_responsiveness.py
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip('mcp')
+pytest.importorskip('dotenv')
+
+import mcp_server
+from admission import AdmissionController
+from asset_cache import AssetCache
+from providers import LocalProvider
+from provider_scheduler import ProviderScheduler, get_rate_limits
+from video_catalog import VideoCatalog
+from video_generator import VideoGenerator
+
+
+# list_videos must answer within this many seconds while renders run
+LIST_VIDEOS_BOUND = 1.0
+JOBS = 4
+
+
+@pytest.fixture
+def runtime(tmp_path, monkeypatch):
+    """MCP runtime with one render slot and a render that blocks until released"""
+    release_render = threading.Event()
+    render_started = threading.Event()
+
+    def long_render(*args, **kwargs):
+        render_started.set()
+        release_render.wait(30)
+        raise RuntimeError("Fake render stopped")
+
+    generator = VideoGenerator(output_dir=str(tmp_path / "output"))
+    generator.render_scene = long_render
+    provider = LocalProvider()
+
+    executors = {
+        'PROVIDER_EXECUTOR': ThreadPoolExecutor(max_workers=4, thread_name_prefix="provider"),
+        'RENDER_EXECUTOR': ThreadPoolExecutor(max_workers=1, thread_name_prefix="render"),
+        'IO_EXECUTOR': ThreadPoolExecutor(max_workers=2, thread_name_prefix="io"),
+    }
+    services = {
+        'OUTPUT_DIR': tmp_path / "output",
+        'TEMP_DIR': tmp_path,
+        'catalog': VideoCatalog(str(tmp_path / "catalog.db")),
+        'admission': AdmissionController(metrics_path=str(tmp_path / "metrics.jsonl"),
+                                         disk_path=str(tmp_path), max_concurrent=1,
+                                         max_queue=8, min_free_gb=0),
+        'provider': provider,
+        'scheduler': ProviderScheduler(get_rate_limits(provider)),
+        'asset_cache': AssetCache(str(tmp_path / "cache")),
+        'video_generator': generator,
+        **executors,
+    }
+    for name, value in services.items():
+        monkeypatch.setattr(mcp_server, name, value)
+
+    yield render_started, release_render
+
+    release_render.set()
+    for executor in executors.values():
+        executor.shutdown(wait=True)
+
+
+def test_list_videos_answers_during_long_render(runtime):
+    render_started, release_render = runtime
+
+    async def scenario():
+        jobs = [mcp_server.start_job({'topic': f"topic {i}", 'duration': 0.5}) for i in range(JOBS)]
+        # A finished job drops its task, so keep them for the teardown
+        tasks = [job.task for job in jobs]
+        try:
+            # One job holds the render slot, the others wait for it
+            while not render_started.is_set():
+                await asyncio.sleep(0.05)
+
+            start = time.monotonic()
+            result = await asyncio.wait_for(mcp_server.handle_list_videos({}), LIST_VIDEOS_BOUND * 5)
+            elapsed = time.monotonic() - start
+            assert "No videos found" in result[0].text
+            assert elapsed < LIST_VIDEOS_BOUND, f"list_videos took {elapsed:.2f}s during a render"
+            assert not any(job.finished for job in jobs)
+        finally:
+            release_render.set()
+            for job in jobs:
+                job.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(scenario())
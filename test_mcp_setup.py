@@ -5,8 +5,32 @@ Test script to validate MCP server setup
 
 import sys
 import os
+import json
+import subprocess
 from pathlib import Path
 
+# Cold-start budget for importing the MCP server (override with STARTUP_BUDGET_SECONDS)
+STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', '1.5'))
+
+# Run in a fresh interpreter: time the server import and a VideoGenerator
+# construction, and count the subprocesses (e.g. FFmpeg) they start
+STARTUP_PROBE = """
+import json, subprocess, sys, tempfile, time
+spawned = []
+original_init = subprocess.Popen.__init__
+def counting_init(self, args, *rest, **kwargs):
+    spawned.append(args if isinstance(args, str) else ' '.join(map(str, args)))
+    original_init(self, args, *rest, **kwargs)
+subprocess.Popen.__init__ = counting_init
+start = time.perf_counter()
+import mcp_server
+import_seconds = time.perf_counter() - start
+start = time.perf_counter()
+mcp_server.VideoGenerator(output_dir=tempfile.mkdtemp())
+init_seconds = time.perf_counter() - start
+print(json.dumps({'import': import_seconds, 'init': init_seconds, 'spawned': spawned}))
+"""
+
 def check_python_version():
     """Check if Python version is 3.8+"""
     print("Checking Python version...")
@@ -132,6 +156,32 @@ def check_mcp_server():
     return True
 
 
+def check_startup_time():
+    """Check that the MCP server imports within the cold-start budget"""
+    print("\nChecking server startup time...")
+    result = subprocess.run([sys.executable, '-c', STARTUP_PROBE],
+                            capture_output=True, text=True,
+                            cwd=str(Path(__file__).parent.resolve()))
+    if result.returncode != 0:
+        print("❌ Could not import mcp_server.py:")
+        print(f"   {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'no output'}")
+        return False
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    print(f"   import: {timings['import'] * 1000:.0f} ms, "
+          f"VideoGenerator(): {timings['init'] * 1000:.1f} ms")
+
+    if timings['spawned']:
+        print(f"❌ Startup spawned subprocesses: {', '.join(timings['spawned'])}")
+        return False
+    if timings['import'] + timings['init'] > STARTUP_BUDGET_SECONDS:
+        print(f"❌ Startup is over the {STARTUP_BUDGET_SECONDS:.1f}s budget")
+        return False
+
+    print(f"✅ Server starts within {STARTUP_BUDGET_SECONDS:.1f}s without spawning FFmpeg")
+    return True
+
+
 def print_next_steps():
     """Print next steps for user"""
     print("\n" + "="*60)
@@ -169,6 +219,7 @@ def main():
         check_env_file(),
         check_directories(),
         check_mcp_server(),
+        check_startup_time(),
     ]
 
     print("\n" + "="*60)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test of VideoGenerator: many jobs on one shared instance
+
+FFmpeg is stubbed out (_run_ffmpeg writes a placeholder output file after
+a short random delay), so the test runs anywhere and exercises only the
+generator's own per-job state: temp directories, scene clips, artifacts
+and cleanup. Run with: python -m pytest test_render_concurrency.py
+"""
+
+import os
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import video_generator
+from video_generator import RenderContext, VideoGenerator
+
+
+JOBS = 8
+SCENES_PER_JOB = 4
+
+
+def make_generator(tmp_path, monkeypatch):
+    """Shared generator whose FFmpeg runs are simulated"""
+    monkeypatch.setattr(video_generator, 'require_ffmpeg', lambda: None)
+    generator = VideoGenerator(output_dir=str(tmp_path / "output"))
+    generator._check_disk_space = lambda required_gb=2.0: True
+    generator._get_audio_duration = lambda audio_path: 2.0
+    generator._get_video_duration = lambda video_path: 2.0
+
+    missing_inputs = []
+    lock = threading.Lock()
+
+    def fake_run_ffmpeg(ctx, cmd, stage=None, duration=0.0):
+        # Yield to the other jobs mid-render so their steps interleave
+        time.sleep(random.uniform(0, 0.01))
+        inputs = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == '-i']
+        with lock:
+            missing_inputs.extend((ctx.job_id, path) for path in inputs if not os.path.exists(path))
+        with open(cmd[-1], 'w') as f:
+            f.write(ctx.job_id)
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    generator._run_ffmpeg = fake_run_ffmpeg
+    return generator, missing_inputs
+
+
+def render(generator, tmp_path, job: int):
+    """Render one job; returns its context and a snapshot of its files"""
+    scenes = []
+    for i in range(SCENES_PER_JOB):
+        image_path = tmp_path / f"job{job}_scene{i}.png"
+        audio_path = tmp_path / f"job{job}_scene{i}.wav"
+        image_path.write_bytes(b"")
+        audio_path.write_bytes(b"")
+        scenes.append({'image_path': str(image_path), 'audio_path': str(audio_path),
+                       'caption': f"Job {job} scene {i}"})
+
+    context = RenderContext(f"job{job:02d}-{os.urandom(4).hex()}")
+    snapshot = {}
+
+    # Record the job's files right before its temp directory is removed
+    cleanup = context.cleanup
+
+    def snapshot_and_cleanup():
+        snapshot['files'] = sorted(os.listdir(context.temp_dir))
+        snapshot['artifacts'] = list(context.artifacts)
+        cleanup()
+
+    context.cleanup = snapshot_and_cleanup
+    output_path = generator.generate_video(
+        scenes, output_filename=f"job{job}.mp4", enable_captions=False, context=context
+    )
+    return context, snapshot, output_path
+
+
+def test_shared_generator_isolates_concurrent_jobs(tmp_path, monkeypatch):
+    generator, missing_inputs = make_generator(tmp_path, monkeypatch)
+
+    with ThreadPoolExecutor(max_workers=JOBS) as pool:
+        results = list(pool.map(lambda job: render(generator, tmp_path, job), range(JOBS)))
+
+    # No job ever read a file another job had already cleaned up
+    assert missing_inputs == []
+
+    temp_dirs = [context.temp_dir for context, _, _ in results]
+    assert len(set(temp_dirs)) == JOBS
+
+    for job, (context, snapshot, output_path) in enumerate(results):
+        # Every artifact lives in the job's own temp directory
+        assert len(snapshot['artifacts']) == SCENES_PER_JOB
+        for artifact in snapshot['artifacts']:
+            assert os.path.dirname(artifact) == context.temp_dir
+        assert snapshot['files'] == [f"scene_{i:03d}.mp4" for i in range(SCENES_PER_JOB)]
+
+        # The output was written by this job and its temp directory is gone
+        with open(output_path) as f:
+            assert f.read() == context.job_id
+        assert not os.path.exists(context.temp_dir)
+        assert [entry['index'] for entry in context.timeline] == list(range(SCENES_PER_JOB))
+
+
+def test_failed_job_cleans_up_only_itself(tmp_path, monkeypatch):
+    generator, missing_inputs = make_generator(tmp_path, monkeypatch)
+    run_ffmpeg = generator._run_ffmpeg
+
+    def failing_run_ffmpeg(ctx, cmd, stage=None, duration=0.0):
+        if ctx.job_id.startswith('job00') and stage == 'scene 2':
+            return subprocess.CompletedProcess(cmd, 1, '', 'simulated failure')
+        return run_ffmpeg(ctx, cmd, stage, duration)
+
+    generator._run_ffmpeg = failing_run_ffmpeg
+
+    def render_or_error(job):
+        try:
+            return render(generator, tmp_path, job)
+        except RuntimeError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=JOBS) as pool:
+        results = list(pool.map(render_or_error, range(JOBS)))
+
+    assert isinstance(results[0], RuntimeError)
+    assert missing_inputs == []
+    for context, snapshot, output_path in results[1:]:
+        assert len(snapshot['artifacts']) == SCENES_PER_JOB
+        assert os.path.exists(output_path)
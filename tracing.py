@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Tracing
+Lightweight stage spans (job id, scene index, stage name) appended as JSON
+lines to a local trace file, and a summarizer that prints the critical path
+of every job
+
+Tracing is off unless TRACE_FILE is set (or configure() is called); span()
+then returns a shared no-op context manager, so instrumented code costs one
+function call per stage.
+
+Usage:
+    TRACE_FILE=trace.jsonl python api_server.py
+    python tracing.py trace.jsonl               # critical path of every job
+    python tracing.py trace.jsonl --job 3f2a    # jobs whose id starts with 3f2a
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+_UNSET = object()
+_trace_path = _UNSET
+_trace_file = None
+_write_lock = threading.Lock()
+# Innermost open span of the current thread / asyncio task
+_current_span: ContextVar = ContextVar('trace_span', default=None)
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def configure(path: Optional[str]):
+    """Trace to path from now on (None disables tracing)"""
+    global _trace_path, _trace_file
+    with _write_lock:
+        if _trace_file is not None:
+            _trace_file.close()
+            _trace_file = None
+        _trace_path = path
+
+
+def enabled() -> bool:
+    """Whether spans are recorded (reads TRACE_FILE on first use)"""
+    if _trace_path is _UNSET:
+        configure(os.getenv('TRACE_FILE') or None)
+    return _trace_path is not None
+
+
+def span(name: str, job_id: Optional[str] = None, scene: Optional[int] = None, **attrs):
+    """
+    Context manager timing one stage
+
+    Job id and scene index default to those of the enclosing span (same
+    thread or asyncio task); work handed to another thread passes them
+    explicitly.
+
+    Args:
+        name: Stage name ("upload", "scene_encode", ...)
+        job_id: Job the stage belongs to
+        scene: Scene index, for per-scene stages
+        **attrs: Extra fields for the trace record (sizes, cache hits, ...)
+    """
+    if not enabled():
+        return _NOOP_SPAN
+    return Span(name, job_id, scene, attrs)
+
+
+class Span:
+    __slots__ = ('name', 'job_id', 'scene', 'attrs', 'span_id', 'parent_id',
+                 'start', '_started', '_token')
+
+    def __init__(self, name: str, job_id: Optional[str], scene: Optional[int], attrs: Dict):
+        self.name = name
+        self.job_id = job_id
+        self.scene = scene
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Add fields to the span's record"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        if parent is not None:
+            self.job_id = self.job_id or parent.job_id
+            self.scene = parent.scene if self.scene is None else self.scene
+        self.parent_id = parent.span_id if parent is not None and parent.job_id == self.job_id else None
+        self.span_id = os.urandom(8).hex()
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in another context (e.g. a different asyncio task)
+            _current_span.set(None)
+        record = {
+            'name': self.name,
+            'job': self.job_id,
+            'scene': self.scene,
+            'start': self.start,
+            'duration': duration,
+            'id': self.span_id,
+            'parent': self.parent_id,
+            'pid': os.getpid(),
+            'thread': threading.current_thread().name,
+        }
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.attrs)
+        _write(record)
+        return False
+
+
+def _write(record: Dict):
+    global _trace_file
+    line = json.dumps(record, default=str) + '\n'
+    with _write_lock:
+        if _trace_path is None:
+            return
+        if _trace_file is None:
+            _trace_file = open(_trace_path, 'a', encoding='utf-8', buffering=1)
+        _trace_file.write(line)
+
+
+def load_spans(path: str) -> List[Dict]:
+    """Read a trace file (skipping torn lines)"""
+    spans = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            record['end'] = record['start'] + record['duration']
+            spans.append(record)
+    return spans
+
+
+def _critical_segments(node: Dict, children: Dict[str, List[Dict]], until: float) -> List[tuple]:
+    """
+    (span, seconds) pieces of the critical path through a span
+
+    Walks back from the span's end: the child that finished last before the
+    cursor is on the path, the cursor jumps to that child's start, and time
+    not covered by any child is the span's own.
+    """
+    segments = []
+    cursor = min(node['end'], until)
+    for child in sorted(children.get(node['id'], []), key=lambda span: span['end'], reverse=True):
+        if cursor <= node['start']:
+            break
+        if child['start'] >= cursor:
+            continue
+        child_end = min(child['end'], cursor)
+        if cursor > child_end:
+            segments.append((node, cursor - child_end))
+        segments.extend(_critical_segments(child, children, child_end))
+        cursor = child['start']
+    if cursor > node['start']:
+        segments.append((node, cursor - node['start']))
+    return segments
+
+
+def summarize_job(spans: List[Dict]) -> Dict:
+    """
+    Critical path and total time per stage of one job's spans
+
+    Spans without a (recorded) parent, e.g. ones started on worker threads,
+    hang off a synthetic root covering the whole job; its own time shows up
+    as "(untraced)".
+    """
+    root = {
+        'id': None, 'name': '(untraced)',
+        'start': min(span['start'] for span in spans),
+        'end': max(span['end'] for span in spans),
+    }
+    ids = {span['id'] for span in spans}
+    children: Dict[str, List[Dict]] = {}
+    for span in spans:
+        parent = span.get('parent') if span.get('parent') in ids else None
+        children.setdefault(parent, []).append(span)
+
+    stages: Dict[str, Dict] = {}
+    for span in spans:
+        stage = stages.setdefault(span['name'], {'critical': 0.0, 'total': 0.0, 'count': 0, 'errors': 0})
+        stage['total'] += span['duration']
+        stage['count'] += 1
+        stage['errors'] += 1 if 'error' in span else 0
+    stages.setdefault(root['name'], {'critical': 0.0, 'total': 0.0, 'count': 0, 'errors': 0})
+    for node, seconds in _critical_segments(root, children, root['end']):
+        stages[node['name']]['critical'] += seconds
+
+    return {
+        'wallSeconds': root['end'] - root['start'],
+        'spans': len(spans),
+        'start': root['start'],
+        'stages': stages,
+    }
+
+
+def print_summary(job_id: str, summary: Dict):
+    """Print one job's critical-path breakdown"""
+    wall = summary['wallSeconds']
+    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(summary['start']))
+    print(f"🧵 Job {job_id}: {wall:.2f}s, {summary['spans']} span(s), started {started}")
+    print(f"   {'stage':<18} {'spans':>5} {'critical':>10} {'share':>6} {'total':>10}")
+    ranked = sorted(summary['stages'].items(), key=lambda item: item[1]['critical'], reverse=True)
+    for name, stage in ranked:
+        if stage['critical'] < 0.0005 and stage['count'] == 0:
+            continue
+        share = stage['critical'] / wall if wall > 0 else 0
+        errors = f"  ❌ {stage['errors']} failed" if stage['errors'] else ""
+        print(f"   {name:<18} {stage['count']:>5} {stage['critical']:>9.2f}s {share:>6.0%} "
+              f"{stage['total']:>9.2f}s{errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-job critical path of a trace file")
+    parser.add_argument('trace', nargs='?', default=os.getenv('TRACE_FILE'),
+                        help="Trace JSONL (default: $TRACE_FILE)")
+    parser.add_argument('--job', help="Only jobs whose id starts with this")
+    parser.add_argument('--last', type=int, help="Only the N most recent jobs")
+    args = parser.parse_args()
+    if not args.trace:
+        parser.error("No trace file given and TRACE_FILE is not set")
+
+    jobs: Dict[str, List[Dict]] = {}
+    for record in load_spans(args.trace):
+        job_id = record.get('job') or '(no job)'
+        if args.job and not job_id.startswith(args.job):
+            continue
+        jobs.setdefault(job_id, []).append(record)
+
+    summaries = sorted(((job_id, summarize_job(spans)) for job_id, spans in jobs.items()),
+                       key=lambda item: item[1]['start'])
+    if args.last:
+        summaries = summaries[-args.last:]
+    if not summaries:
+        print("No matching spans")
+        return 1
+    for job_id, summary in summaries:
+        print_summary(job_id, summary)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
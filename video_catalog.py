@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+AI Video Weaver - Video Catalog
+SQLite index of generated videos, filled at render time so listings and
+video info never have to glob the output directory or spawn ffprobe
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Columns stored for every video (besides filename, the primary key)
+CATALOG_COLUMNS = [
+    'path', 'topic', 'created_at', 'size_bytes', 'duration', 'bit_rate',
+    'format_name', 'video_codec', 'width', 'height', 'frame_rate',
+    'audio_codec', 'sample_rate', 'channels', 'scene_count', 'aspect_ratio',
+    'render_seconds', 'stage_timings'
+]
+
+
+def probe_video(video_path: str) -> Optional[Dict]:
+    """
+    Read container and stream metadata of a video with a single ffprobe call
+
+    Args:
+        video_path: Path to the video file
+
+    Returns:
+        Dictionary with catalog metadata columns, or None if ffprobe failed
+    """
+    cmd = [
+        'ffprobe',
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_format',
+        '-show_streams',
+        str(video_path)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+
+    metadata = json.loads(result.stdout)
+    fmt = metadata.get('format', {})
+    info = {
+        'duration': float(fmt.get('duration', 0)),
+        'bit_rate': int(fmt.get('bit_rate', 0)),
+        'format_name': fmt.get('format_name', 'unknown'),
+    }
+
+    video_streams = [s for s in metadata.get('streams', []) if s.get('codec_type') == 'video']
+    if video_streams:
+        vs = video_streams[0]
+        info.update({
+            'video_codec': vs.get('codec_name', 'unknown'),
+            'width': vs.get('width'),
+            'height': vs.get('height'),
+            'frame_rate': vs.get('r_frame_rate', 'unknown'),
+        })
+
+    audio_streams = [s for s in metadata.get('streams', []) if s.get('codec_type') == 'audio']
+    if audio_streams:
+        aus = audio_streams[0]
+        info.update({
+            'audio_codec': aus.get('codec_name', 'unknown'),
+            'sample_rate': aus.get('sample_rate', 'unknown'),
+            'channels': aus.get('channels'),
+        })
+
+    return info
+
+
+class VideoCatalog:
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the catalog database
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS videos ("
+                "filename TEXT PRIMARY KEY, path TEXT, topic TEXT, created_at REAL, "
+                "size_bytes INTEGER, duration REAL, bit_rate INTEGER, format_name TEXT, "
+                "video_codec TEXT, width INTEGER, height INTEGER, frame_rate TEXT, "
+                "audio_codec TEXT, sample_rate TEXT, channels INTEGER, scene_count INTEGER, "
+                "aspect_ratio TEXT, render_seconds REAL, stage_timings TEXT)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS videos_created_at ON videos (created_at DESC)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection (the API and MCP servers may share the database)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        """Convert a row to a dictionary, decoding the stage timings"""
+        video = dict(row)
+        video['stage_timings'] = json.loads(video['stage_timings']) if video['stage_timings'] else {}
+        return video
+
+    def add(self, video_path: str, **metadata):
+        """
+        Insert or replace the catalog entry of a video
+
+        Args:
+            video_path: Path to the video file
+            **metadata: Catalog columns (see CATALOG_COLUMNS); size and
+                        creation time default to the file's stat
+        """
+        path = Path(video_path)
+        record = {column: None for column in CATALOG_COLUMNS}
+        record.update({key: value for key, value in metadata.items() if key in record})
+        record['path'] = str(path.resolve())
+
+        stat = path.stat()
+        if record['size_bytes'] is None:
+            record['size_bytes'] = stat.st_size
+        if record['created_at'] is None:
+            record['created_at'] = stat.st_mtime
+        if isinstance(record['stage_timings'], dict):
+            record['stage_timings'] = json.dumps(record['stage_timings'])
+
+        columns = ['filename'] + CATALOG_COLUMNS
+        values = [path.name] + [record[column] for column in CATALOG_COLUMNS]
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO videos ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                values
+            )
+
+    def update(self, filename: str, **metadata):
+        """Update selected columns of an existing entry"""
+        fields = {key: value for key, value in metadata.items() if key in CATALOG_COLUMNS}
+        if not fields:
+            return
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"UPDATE videos SET {assignments} WHERE filename = ?",
+                list(fields.values()) + [filename]
+            )
+
+    def remove(self, filename: str):
+        """Drop the entry of a deleted video"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM videos WHERE filename = ?", (filename,))
+
+    def get(self, filename: str) -> Optional[Dict]:
+        """
+        Get the catalog entry of a video
+
+        Returns:
+            Entry dictionary, or None if unknown or the file is gone
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM videos WHERE filename = ?", (filename,)).fetchone()
+
+        if row is None:
+            return None
+        if not os.path.exists(row['path']):
+            self.remove(filename)
+            return None
+        return self._to_dict(row)
+
+    def count(self) -> int:
+        """Number of cataloged videos"""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def list(self, page: int = 1, page_size: int = 20) -> List[Dict]:
+        """
+        List videos, newest first
+
+        Only the requested page is read, and only its files are checked for
+        existence (entries of deleted files are pruned as they are seen).
+
+        Args:
+            page: 1-based page number
+            page_size: Videos per page
+
+        Returns:
+            List of entry dictionaries
+        """
+        page = max(1, int(page))
+        page_size = max(1, int(page_size))
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM videos ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                (page_size, (page - 1) * page_size)
+            ).fetchall()
+
+        videos = []
+        for row in rows:
+            if os.path.exists(row['path']):
+                videos.append(self._to_dict(row))
+            else:
+                self.remove(row['filename'])
+        return videos
+
+    def backfill(self, directory: str, pattern: str = '*.mp4') -> int:
+        """
+        Catalog videos that predate the catalog (stat only, no ffprobe)
+
+        Stream metadata of backfilled entries is probed lazily the first time
+        the video's details are requested.
+
+        Returns:
+            Number of videos added
+        """
+        with self._connect() as conn:
+            known = {row[0] for row in conn.execute("SELECT filename FROM videos")}
+
+        added = 0
+        for video_file in Path(directory).glob(pattern):
+            if video_file.name in known:
+                continue
+            try:
+                self.add(str(video_file))
+                added += 1
+            except OSError:
+                continue
+
+        return added
+
+
+def format_timings(stage_timings: Dict[str, float]) -> str:
+    """Format render stage timings as 'stage 1.2s, ...'"""
+    return ", ".join(f"{stage} {seconds:.1f}s" for stage, seconds in stage_timings.items())
+
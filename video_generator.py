@@ -7,27 +7,165 @@ Generates videos with image transitions, text overlays, and audio sync
 import subprocess
 import os
 import json
+import re
 import tempfile
+import threading
+import time
+import uuid
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, FrozenSet, List, Dict, Optional
 import shutil
 
+from admission import CostModel
+from caption_layout import CAPTION_CHUNK_EMS, chunk_words, classify_text, detect_script
+from capabilities import ffmpeg_version, require_ffmpeg
+from font_index import PREFERRED_FONTS, SYSTEM, font_index
+from metrics import REGISTRY
+from tracing import span
+from video_catalog import probe_video
+
+
+# Progressive output modes supported by generate_video(streaming_output=...)
+STREAMING_MODES = (None, 'hls', 'fmp4')
+HLS_PLAYLIST_NAME = "playlist.m3u8"
+HLS_SEGMENT_SECONDS = 4
+# Extra free space required on top of a job's estimated disk footprint
+DISK_SAFETY_MARGIN_GB = 0.5
+# Largest factor scene images are scaled to (relative to the video size) before zoom/pan
+MAX_ZOOM_SCALE = 2
+# Zoom/pan effects cycled through by scene index, with their display names
+SCENE_EFFECTS = ('pan_right', 'pan_left', 'dynamic', 'zoom_out')
+SCENE_EFFECT_NAMES = {
+    'pan_right': 'Pan right with zoom',
+    'pan_left': 'Pan left with zoom',
+    'dynamic': 'Dynamic zoom & pan',
+    'zoom_out': 'Smooth zoom out'
+}
+# Widest caption chunk, as a fraction of the frame width
+CAPTION_MAX_WIDTH = 0.9
+# Scripts already reported as having no installed font
+_MISSING_FONT_WARNED = set()
+# Hits and misses of the font and audio-duration caches (see metrics.py)
+CACHE_LOOKUPS = REGISTRY.counter('video_cache_lookups_total',
+                                 "Lookups of the renderer's in-process caches", ['cache', 'outcome'])
+
+
+class RenderCancelled(Exception):
+    """The job was cancelled while rendering"""
+
+
+class RenderContext:
+    def __init__(self, job_id: Optional[str] = None, temp_root: Optional[str] = None):
+        """
+        Per-job render state
+
+        Everything a render writes or measures lives here instead of on the
+        VideoGenerator, so one generator instance can run many jobs at once
+        (threads or processes) without jobs overwriting each other's files.
+
+        Args:
+            job_id: Job identifier (random if omitted)
+            temp_root: Parent directory for the job's temp directory
+                       (system temp directory if omitted)
+        """
+        self.job_id = job_id or uuid.uuid4().hex
+        self.temp_dir = tempfile.mkdtemp(prefix=f"video_gen_{self.job_id[:8]}_", dir=temp_root)
+        # One entry per scene: index, duration and start offset in the final video
+        self.timeline: List[Dict] = []
+        # Intermediate files (scene clips, concat lists) owned by this job
+        self.artifacts: List[str] = []
+        self.stage_timings: Dict[str, float] = {}
+        self.start_time = time.time()
+        # Audio duration per scene index, probed once per job
+        self.audio_durations: Dict[int, float] = {}
+        # Scene clip duration per scene index, probed once per job
+        self.clip_durations: Dict[int, float] = {}
+        # Encoded pieces of the final video written to the HLS stream so far
+        self.stream_pieces: List[str] = []
+        # Resource usage measured from FFmpeg's -benchmark report
+        self.cpu_seconds = 0.0
+        self.peak_rss_kb = 0
+        # Peak disk footprint (scene clips + output), measured before cleanup
+        self.temp_bytes = 0
+        # Called as on_progress(stage, seconds_done, seconds_total) while FFmpeg
+        # runs (from the render thread)
+        self.on_progress: Optional[Callable[[str, float, float], None]] = None
+        self._cancelled = threading.Event()
+        self._processes = set()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Stop the render: kill running FFmpeg processes and refuse to start new ones"""
+        self._cancelled.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+    def check_cancelled(self):
+        """Raise RenderCancelled if the job was cancelled"""
+        if self._cancelled.is_set():
+            raise RenderCancelled(f"Job {self.job_id} was cancelled")
+
+    def report_progress(self, stage: str, done: float, total: float):
+        """Forward FFmpeg progress to the job's listener, if any"""
+        if self.on_progress is not None:
+            try:
+                self.on_progress(stage, done, total)
+            except Exception as e:
+                print(f"⚠️  Progress callback failed: {e}")
+
+    def record_process(self, stderr: str):
+        """Add the CPU time and memory of a finished FFmpeg run (-benchmark output)"""
+        cpu = re.search(r'bench: utime=([\d.]+)s stime=([\d.]+)s', stderr or '')
+        rss = re.search(r'bench: maxrss=(\d+)', stderr or '')
+        with self._lock:
+            if cpu:
+                self.cpu_seconds += float(cpu.group(1)) + float(cpu.group(2))
+            if rss:
+                self.peak_rss_kb = max(self.peak_rss_kb, int(rss.group(1)))
+
+    def get_temp_bytes(self) -> int:
+        """Current size of the job's temp directory"""
+        return sum(f.stat().st_size for f in Path(self.temp_dir).rglob('*') if f.is_file())
+
+    def scene_path(self, index: int) -> str:
+        """Path of the intermediate clip for a scene"""
+        return os.path.join(self.temp_dir, f"scene_{index:03d}.mp4")
+
+    def cleanup(self):
+        """Remove the job's temp directory"""
+        if self.temp_dir and os.path.exists(self.temp_dir):
+            # A cancelled FFmpeg may still be releasing its files
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
 
 class VideoGenerator:
-    def __init__(self, output_dir: str = "./output"):
+    def __init__(self, output_dir: str = "./output", catalog=None,
+                 cost_model: Optional[CostModel] = None):
         """
         Initialize the video generator
 
         Args:
             output_dir: Directory to save output videos
+            catalog: Optional VideoCatalog that every generated video is
+                     recorded in (metadata and render timings)
+            cost_model: Cost model used to size the disk space check
+                        (e.g. the calibrated model of an AdmissionController)
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.temp_dir = None
-
-        # Check if ffmpeg is installed
-        if not self._check_ffmpeg():
-            raise RuntimeError("FFmpeg is not installed. Please install it first.")
+        self.catalog = catalog
+        self.cost_model = cost_model or CostModel()
+        # FFmpeg is checked on the first render rather than here, so servers
+        # start without spawning it (see capabilities.py)
 
     def _check_disk_space(self, required_gb: float = 2.0) -> bool:
         """
@@ -51,14 +189,8 @@ class VideoGenerator:
         return True
 
     def _check_ffmpeg(self) -> bool:
-        """Check if FFmpeg is installed"""
-        try:
-            subprocess.run(['ffmpeg', '-version'],
-                         capture_output=True,
-                         check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        """Check if FFmpeg is installed (probed once per process)"""
+        return ffmpeg_version() is not None
 
     def _get_audio_duration(self, audio_path: str) -> float:
         """Get duration of audio file in seconds"""
@@ -120,6 +252,74 @@ class VideoGenerator:
                 return duration
             raise RuntimeError("Could not determine audio duration")
 
+    def _get_scene_audio_duration(self, ctx: RenderContext, scene: Dict, index: int) -> float:
+        """Get a scene's audio duration, probing each file only once per job"""
+        hit = index in ctx.audio_durations
+        CACHE_LOOKUPS.inc(cache='audio_duration', outcome='hit' if hit else 'miss')
+        if not hit:
+            with span('probe', job_id=ctx.job_id, scene=index):
+                ctx.audio_durations[index] = self._get_audio_duration(scene['audio_path'])
+        return ctx.audio_durations[index]
+
+    def _run_ffmpeg(self, ctx: Optional[RenderContext], cmd: List[str],
+                    stage: Optional[str] = None, duration: float = 0.0) -> subprocess.CompletedProcess:
+        """
+        Run an FFmpeg command and account its CPU time and memory to the job
+
+        With a context, FFmpeg's progress is reported to ctx.on_progress and
+        the process is killed if the job is cancelled.
+
+        Args:
+            ctx: Render context of the job (None to skip accounting)
+            cmd: FFmpeg command line (starting with 'ffmpeg')
+            stage: Stage name reported with progress (e.g. "scene 3")
+            duration: Expected output duration in seconds (progress total)
+
+        Returns:
+            Completed process with text stderr
+
+        Raises:
+            RenderCancelled: The job was cancelled before or during the run
+        """
+        # -benchmark makes FFmpeg report its own utime/stime/maxrss, which stays
+        # exact per job even when several renders run in one process
+        if ctx is None:
+            cmd = [cmd[0], '-benchmark'] + cmd[1:]
+            return subprocess.run(cmd, capture_output=True, text=True)
+
+        ctx.check_cancelled()
+        cmd = [cmd[0], '-benchmark', '-progress', 'pipe:1', '-nostats'] + cmd[1:]
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        with ctx._lock:
+            ctx._processes.add(process)
+        try:
+            # Drain stderr on a helper thread so neither pipe can fill up and block FFmpeg
+            stderr_lines: List[str] = []
+            stderr_thread = threading.Thread(
+                target=lambda: stderr_lines.extend(process.stderr), daemon=True
+            )
+            stderr_thread.start()
+
+            for line in process.stdout:
+                # out_time_us is the position written so far, in microseconds
+                if line.startswith('out_time_us=') and stage:
+                    try:
+                        done = int(line.split('=', 1)[1]) / 1_000_000
+                    except ValueError:
+                        continue
+                    ctx.report_progress(stage, max(0.0, done), duration)
+
+            process.wait()
+            stderr_thread.join()
+        finally:
+            with ctx._lock:
+                ctx._processes.discard(process)
+
+        ctx.check_cancelled()
+        stderr = ''.join(stderr_lines)
+        ctx.record_process(stderr)
+        return subprocess.CompletedProcess(cmd, process.returncode, '', stderr)
+
     def generate_video(self,
                       scenes: List[Dict],
                       output_filename: str = "output.mp4",
@@ -127,7 +327,11 @@ class VideoGenerator:
                       transition_duration: float = 0.5,
                       fps: int = 30,
                       resolution: str = "1920x1080",
-                      enable_captions: bool = True) -> str:
+                      enable_captions: bool = True,
+                      streaming_output: Optional[str] = None,
+                      stream_dir: Optional[str] = None,
+                      metadata: Optional[Dict] = None,
+                      context: Optional[RenderContext] = None) -> str:
         """
         Generate video from scenes with transitions and text overlays
 
@@ -143,48 +347,376 @@ class VideoGenerator:
             fps: Frames per second
             resolution: Video resolution (e.g., "1920x1080")
             enable_captions: Whether to display captions on video (default: True)
+            streaming_output: Optional progressive output mode:
+                   - "hls": event playlist with fMP4 segments in stream_dir,
+                     extended as each scene is encoded (alongside the
+                     regular MP4)
+                   - "fmp4": fragmented MP4 that is playable while the final
+                     encode appends to it
+            stream_dir: Directory for HLS playlist/segments
+                   (default: <output_dir>/streams/<output name>)
+            metadata: Extra catalog fields for this video (e.g. {"topic": ...})
+            context: Render context for this job (a fresh one if omitted);
+                   its temp directory is removed when the render ends
 
         Returns:
             Path to generated video file
         """
-        self.temp_dir = tempfile.mkdtemp(prefix="video_gen_")
+        if streaming_output not in STREAMING_MODES:
+            raise ValueError(f"Unsupported streaming output: {streaming_output}")
 
-        try:
-            print(f"🎬 Starting video generation with {len(scenes)} scenes...")
+        ctx = context or RenderContext()
+        ctx.start_time = time.time()
 
-            # Check disk space before starting
-            if not self._check_disk_space(required_gb=3.0):
-                raise RuntimeError(
-                    "Insufficient disk space! Please free up at least 3 GB of space.\n"
-                    "Run: rm -rf temp_uploads/* generated_videos/*.mp4"
+        try:
+            with span('render', job_id=ctx.job_id, scenes=len(scenes)):
+                print(f"🎬 Starting video generation with {len(scenes)} scenes...")
+
+                # Calculate dimensions based on aspect ratio
+                width, height = self.get_dimensions(aspect_ratio, resolution)
+
+                # Check disk space for this job's estimated footprint before starting
+                durations = [self._get_scene_audio_duration(ctx, scene, i) for i, scene in enumerate(scenes)]
+                estimate = self.cost_model.estimate(durations, width, height, fps)
+                required_gb = estimate.temp_bytes / (1024**3) + DISK_SAFETY_MARGIN_GB
+                if not self._check_disk_space(required_gb=required_gb):
+                    raise RuntimeError(
+                        f"Insufficient disk space! Please free up at least {required_gb:.1f} GB of space.\n"
+                        "Run: rm -rf temp_uploads/* generated_videos/*.mp4"
+                    )
+
+                if streaming_output == 'hls':
+                    stream_dir = self._prepare_stream_dir(output_filename, stream_dir)
+
+                # Step 1: Prepare scene videos (streamed to the HLS playlist as they finish)
+                scene_videos = []
+                for i, scene in enumerate(scenes):
+                    print(f"📹 Processing scene {i+1}/{len(scenes)}...")
+                    scene_video = self.render_scene(
+                        ctx, scene, i, aspect_ratio, transition_duration, fps, resolution, enable_captions
+                    )
+                    scene_videos.append(scene_video)
+                    if streaming_output == 'hls':
+                        self.stream_scene(ctx, scene_videos, len(scenes), fps, transition_duration, stream_dir)
+                ctx.stage_timings['scenes'] = time.time() - ctx.start_time
+
+                # Step 2: Concatenate all scenes with smooth crossfade transitions
+                return self.assemble_video(
+                    ctx, scene_videos, output_filename, aspect_ratio, transition_duration, fps,
+                    streaming_output=streaming_output, stream_dir=stream_dir, metadata=metadata
                 )
 
-            # Calculate dimensions based on aspect ratio
-            width, height = self._get_dimensions(aspect_ratio, resolution)
+        finally:
+            # Cleanup temp directory
+            ctx.cleanup()
+
+    def render_scene(self, ctx: RenderContext, scene: Dict, index: int,
+                     aspect_ratio: str = "16:9",
+                     transition_duration: float = 0.5,
+                     fps: int = 30,
+                     resolution: str = "1920x1080",
+                     enable_captions: bool = True) -> str:
+        """
+        Render one scene clip into the job's temp directory
+
+        generate_video() calls this for every scene in order; pipelined
+        callers can call it for each scene as soon as its assets exist, and
+        finish with assemble_video(). Different jobs may render concurrently.
 
-            # Step 1: Prepare scene videos
-            scene_videos = []
-            for i, scene in enumerate(scenes):
-                print(f"📹 Processing scene {i+1}/{len(scenes)}...")
-                scene_video = self._create_scene_video(
-                    scene, i, width, height, fps, transition_duration, effect_type='auto', enable_captions=enable_captions
-                )
-                scene_videos.append(scene_video)
+        Args:
+            ctx: Render context of the job
+            scene: Scene dictionary (image_path, audio_path, caption)
+            index: Scene position in the final video
+            (other arguments as in generate_video)
+
+        Returns:
+            Path to the scene clip
+        """
+        require_ffmpeg()
+        width, height = self.get_dimensions(aspect_ratio, resolution)
+        with span('scene_encode', job_id=ctx.job_id, scene=index):
+            return self._create_scene_video(
+                ctx, scene, index, width, height, fps, transition_duration,
+                effect_type='auto', enable_captions=enable_captions
+            )
 
-            # Step 2: Concatenate all scenes with smooth crossfade transitions
-            output_path = self.output_dir / output_filename
+    def assemble_video(self, ctx: RenderContext, scene_videos: List[str],
+                       output_filename: str = "output.mp4",
+                       aspect_ratio: str = "16:9",
+                       transition_duration: float = 0.5,
+                       fps: int = 30,
+                       streaming_output: Optional[str] = None,
+                       stream_dir: Optional[str] = None,
+                       metadata: Optional[Dict] = None) -> str:
+        """
+        Join rendered scene clips with crossfade transitions into the output video
+
+        Records the assembly time and disk footprint on the context and
+        catalogs the result. The caller owns the context's cleanup.
+
+        Args:
+            ctx: Render context of the job
+            scene_videos: Scene clips in playback order (from render_scene)
+            (other arguments as in generate_video)
+
+        Returns:
+            Path to generated video file
+        """
+        if streaming_output not in STREAMING_MODES:
+            raise ValueError(f"Unsupported streaming output: {streaming_output}")
+        require_ffmpeg()
+
+        assembly_start = time.time()
+        output_path = self.output_dir / output_filename
+        if streaming_output == 'hls':
+            # Scenes not streamed yet (e.g. rendered by a pipelined caller) are streamed now
+            stream_dir = self._prepare_stream_dir(output_filename, stream_dir)
+            while len(ctx.stream_pieces) < len(scene_videos):
+                self.stream_scene(ctx, scene_videos[:len(ctx.stream_pieces) + 1],
+                                  len(scene_videos), fps, transition_duration, stream_dir)
+            with span('assembly', job_id=ctx.job_id, scenes=len(scene_videos)):
+                self._join_stream_pieces(ctx, output_path, transition_duration)
+        else:
             print(f"🎞️  Creating smooth transitions between scenes...")
-            self._concatenate_videos_with_transitions(scene_videos, output_path, fps, transition_duration)
+            with span('assembly', job_id=ctx.job_id, scenes=len(scene_videos)):
+                self._concatenate_videos_with_transitions(
+                    ctx, scene_videos, output_path, fps, transition_duration,
+                    streaming_output=streaming_output
+                )
+        ctx.stage_timings['assembly'] = time.time() - assembly_start
+        ctx.temp_bytes = ctx.get_temp_bytes() + os.path.getsize(output_path)
 
-            print(f"✅ Video generated successfully: {output_path}")
-            return str(output_path)
+        if self.catalog is not None:
+            with span('catalog', job_id=ctx.job_id):
+                self._catalog_output(output_path, len(scene_videos), aspect_ratio,
+                                     time.time() - ctx.start_time, ctx.stage_timings, metadata)
 
-        finally:
-            # Cleanup temp directory
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir)
+        print(f"✅ Video generated successfully: {output_path}")
+        return str(output_path)
+
+    def _catalog_output(self, output_path: Path, scene_count: int, aspect_ratio: str,
+                        render_seconds: float, stage_timings: Dict[str, float],
+                        metadata: Optional[Dict] = None):
+        """Record a finished video in the catalog (never fails the render)"""
+        try:
+            info = probe_video(str(output_path)) or {}
+            info.update(metadata or {})
+            self.catalog.add(
+                str(output_path),
+                scene_count=scene_count,
+                aspect_ratio=aspect_ratio,
+                render_seconds=render_seconds,
+                stage_timings=stage_timings,
+                **info
+            )
+        except Exception as e:
+            print(f"⚠️  Could not catalog {output_path}: {e}")
+
+    def get_stream_dir(self, output_filename: str) -> Path:
+        """Default directory for the HLS playlist of an output video"""
+        return self.output_dir / "streams" / Path(output_filename).stem
+
+    def _prepare_stream_dir(self, output_filename: str, stream_dir: Optional[str]) -> str:
+        """Create the HLS directory of a render (default: get_stream_dir)"""
+        stream_dir = stream_dir or str(self.get_stream_dir(output_filename))
+        if not os.path.isdir(stream_dir):
+            Path(stream_dir).mkdir(parents=True, exist_ok=True)
+            print(f"📡 Streaming HLS playlist to: {stream_dir}")
+        return stream_dir
+
+    def stream_scene(self, ctx: RenderContext, scene_videos: List[str], scene_count: int,
+                     fps: int, transition_duration: float, stream_dir: str):
+        """
+        Encode the part of the final video that the latest scene clip completes into the HLS stream
+
+        Piece N of the final video is the crossfade from scene N-1 into scene
+        N followed by scene N up to where its own outgoing crossfade starts
+        (the last piece runs to the end), so it only needs the clips of
+        scenes N-1 and N and can be encoded as soon as scene N is. Each piece
+        is segmented into stream_dir and appended to the event playlist
+        behind a discontinuity; assemble_video() later joins the pieces into
+        the MP4 without re-encoding.
+
+        Args:
+            ctx: Render context of the job
+            scene_videos: Scene clips rendered so far, in playback order (the
+                          last one is the scene to stream)
+            scene_count: Scenes in the whole video
+            fps: Frames per second
+            transition_duration: Crossfade duration in seconds
+            stream_dir: Directory for the HLS playlist and segments
+        """
+        index = len(scene_videos) - 1
+        for i in (index - 1, index):
+            if i >= 0 and i not in ctx.clip_durations:
+                ctx.clip_durations[i] = self._get_video_duration(scene_videos[i])
+
+        crossfade = transition_duration if scene_count > 1 else 0
+        fades_in = index > 0 and crossfade > 0
+        # Leave the scene's outgoing crossfade to the next piece
+        end = f":end={ctx.clip_durations[index] - crossfade}" if index < scene_count - 1 and crossfade > 0 else ""
+
+        # trim leaves the frame rate unset, which xfade and the encoder need: fps restores it
+        cmd = ['ffmpeg']
+        if fades_in:
+            cmd.extend(['-i', scene_videos[index - 1]])
+        cmd.extend(['-i', scene_videos[index]])
+        if fades_in:
+            tail_start = ctx.clip_durations[index - 1] - crossfade
+            filter_complex = (
+                f"[0:v]trim=start={tail_start},setpts=PTS-STARTPTS,fps={fps}[vprev];"
+                f"[1:v]trim=start=0{end},setpts=PTS-STARTPTS,fps={fps}[vnext];"
+                f"[vprev][vnext]xfade=transition=smoothleft:duration={crossfade}:offset=0,"
+                f"format=yuv420p[vout];"
+                f"[0:a]atrim=start={tail_start},asetpts=PTS-STARTPTS[aprev];"
+                f"[1:a]atrim=start=0{end},asetpts=PTS-STARTPTS[anext];"
+                f"[aprev][anext]acrossfade=d={crossfade}[aout]"
+            )
+        else:
+            filter_complex = (
+                f"[0:v]trim=start=0{end},setpts=PTS-STARTPTS,fps={fps},format=yuv420p[vout];"
+                f"[0:a]atrim=start=0{end},asetpts=PTS-STARTPTS[aout]"
+            )
+
+        piece_name = f"piece_{index:03d}"
+        piece_path = os.path.join(ctx.temp_dir, f"{piece_name}.mp4")
+        segment_pattern = os.path.join(stream_dir, f"{piece_name}_%03d.m4s")
+        playlist_path = os.path.join(stream_dir, f"{piece_name}.m3u8")
+        hls_options = ":".join([
+            "f=hls",
+            f"hls_time={HLS_SEGMENT_SECONDS}",
+            "hls_playlist_type=vod",
+            "hls_segment_type=fmp4",
+            f"hls_fmp4_init_filename={piece_name}_init.mp4",
+            f"hls_segment_filename={segment_pattern}",
+        ])
+        cmd.extend([
+            '-filter_complex', filter_complex,
+            '-map', '[vout]',
+            '-map', '[aout]',
+            '-c:v', 'libx264',
+            '-preset', 'fast',  # Faster encoding
+            '-crf', '25',  # Good quality but smaller file size
+            '-c:a', 'aac',
+            '-b:a', '128k',  # Reduced audio bitrate
+            # Keyframes on segment boundaries
+            '-force_key_frames', f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+            '-f', 'tee',
+            '-y',
+            f"[f=mp4]{piece_path}|[{hls_options}]{playlist_path}"
+        ])
+
+        piece_seconds = ctx.clip_durations[index] - (crossfade if end else 0)
+        with span('stream', job_id=ctx.job_id, scene=index):
+            result = self._run_ffmpeg(ctx, cmd, stage=f"stream {index+1}", duration=piece_seconds)
+        if result.returncode != 0:
+            print(f"❌ Error streaming scene {index}:")
+            print(f"   Filter: {filter_complex}")
+            print(f"   Error: {result.stderr}")
+            raise RuntimeError(f"Failed to stream scene {index}: {result.stderr[-500:]}")
+
+        ctx.artifacts.append(piece_path)
+        ctx.stream_pieces.append(piece_path)
+        self._write_hls_playlist(stream_dir, len(ctx.stream_pieces),
+                                 finished=len(ctx.stream_pieces) == scene_count)
+        print(f"   📡 Streamed {len(ctx.stream_pieces)}/{scene_count} scene(s)")
+
+    def _write_hls_playlist(self, stream_dir: str, pieces: int, finished: bool):
+        """
+        Rewrite the event playlist from the playlists of the pieces streamed so far
+
+        Each piece is a separate encode with its own init segment and
+        timestamps starting at zero, so pieces are separated by a
+        discontinuity with a new map. The file is replaced atomically so
+        players never read a partial playlist.
+        """
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:7",
+            f"#EXT-X-TARGETDURATION:{HLS_SEGMENT_SECONDS}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            "#EXT-X-INDEPENDENT-SEGMENTS",
+        ]
+        for piece in range(pieces):
+            if piece:
+                lines.append("#EXT-X-DISCONTINUITY")
+            with open(os.path.join(stream_dir, f"piece_{piece:03d}.m3u8")) as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith(('#EXT-X-MAP', '#EXTINF')) or (line and not line.startswith('#')):
+                        lines.append(line)
+        if finished:
+            lines.append("#EXT-X-ENDLIST")
+
+        playlist_path = os.path.join(stream_dir, HLS_PLAYLIST_NAME)
+        with open(playlist_path + ".tmp", 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(playlist_path + ".tmp", playlist_path)
+
+    def _join_stream_pieces(self, ctx: RenderContext, output_path: Path, transition_duration: float):
+        """Join the streamed pieces into the final MP4 without re-encoding"""
+        durations = [ctx.clip_durations[i] for i in range(len(ctx.stream_pieces))]
+        self._build_timeline(ctx, durations, transition_duration if len(durations) > 1 else 0)
+        concat_file = self._create_concat_file(ctx, ctx.stream_pieces)
+        cmd = [
+            'ffmpeg',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', concat_file,
+            '-map', '0',
+            '-c', 'copy',
+            '-movflags', '+faststart',
+            '-y',
+            str(output_path)
+        ]
+        total_duration = ctx.timeline[-1]['offset'] + ctx.timeline[-1]['duration']
+        result = self._run_ffmpeg(ctx, cmd, stage="assembly", duration=total_duration)
+        if result.returncode != 0:
+            print(f"❌ Error joining streamed scenes:")
+            print(result.stderr)
+            raise RuntimeError(f"Failed to join streamed scenes: {result.stderr[-500:]}")
+
+    def _get_output_args(self, output_path: Path,
+                         streaming_output: Optional[str] = None) -> List[str]:
+        """
+        Get the muxer arguments for the final encode
+
+        Args:
+            output_path: Path of the final MP4
+            streaming_output: None or "fmp4" (HLS renders are joined from
+                              their streamed pieces instead, see stream_scene)
+
+        Returns:
+            FFmpeg arguments placed after the codec options
+        """
+        if streaming_output == 'fmp4':
+            # Fragmented MP4 has no trailing moov atom, so it can be played
+            # (and served) while the encoder is still appending fragments
+            return [
+                '-movflags', '+frag_keyframe+empty_moov+default_base_moof',
+                '-y',
+                str(output_path)
+            ]
+
+        return [
+            '-movflags', '+faststart',
+            '-y',
+            str(output_path)
+        ]
+
+    def get_source_size(self, aspect_ratio: str, resolution: str = "1920x1080") -> tuple:
+        """Largest zoom/pan input of any scene effect; image pixels beyond it are never used"""
+        width, height = self.get_dimensions(aspect_ratio, resolution)
+        return max(self._source_size(effect, width, height) for effect in SCENE_EFFECTS)
+
+    @staticmethod
+    def _source_size(effect: str, width: int, height: int) -> tuple:
+        """Zoom/pan input size of an effect (higher for zoom/dynamic effects, for smooth zooming)"""
+        scale_factor = MAX_ZOOM_SCALE if effect in ['dynamic', 'zoom_out'] else 1.5
+        return int(width * scale_factor), int(height * scale_factor)
 
-    def _get_dimensions(self, aspect_ratio: str, resolution: str) -> tuple:
+    def get_dimensions(self, aspect_ratio: str, resolution: str = "1920x1080") -> tuple:
         """Get video dimensions based on aspect ratio"""
         aspect_map = {
             "16:9": (1920, 1080),
@@ -209,99 +741,34 @@ class VideoGenerator:
         Detect the script/language of the text
         Returns: 'malayalam', 'hindi', 'arabic', 'chinese', 'japanese', 'korean', or 'latin'
         """
-        # Malayalam Unicode range: U+0D00 to U+0D7F
-        if any('\u0D00' <= char <= '\u0D7F' for char in text):
-            return 'malayalam'
-        # Hindi/Devanagari Unicode range: U+0900 to U+097F
-        elif any('\u0900' <= char <= '\u097F' for char in text):
-            return 'hindi'
-        # Arabic Unicode range: U+0600 to U+06FF
-        elif any('\u0600' <= char <= '\u06FF' for char in text):
-            return 'arabic'
-        # Chinese Unicode ranges
-        elif any('\u4E00' <= char <= '\u9FFF' or '\u3400' <= char <= '\u4DBF' for char in text):
-            return 'chinese'
-        # Japanese (Hiragana, Katakana)
-        elif any('\u3040' <= char <= '\u309F' or '\u30A0' <= char <= '\u30FF' for char in text):
-            return 'japanese'
-        # Korean (Hangul)
-        elif any('\uAC00' <= char <= '\uD7AF' for char in text):
-            return 'korean'
-        # Default to Latin
-        return 'latin'
-
-    def _get_font_path(self, script: str) -> str:
+        return detect_script(text)
+
+    def _get_font_path(self, script: str, text: Optional[str] = None,
+                       text_scripts: Optional[FrozenSet[str]] = None) -> str:
         """
         Get the appropriate font path for the detected script
         Returns the full path to a font file that supports the script
-        """
-        import platform
-        system = platform.system()
-
-        # Font paths based on script and OS
-        font_map = {
-            'malayalam': {
-                'Darwin': '/System/Library/Fonts/Supplemental/Malayalam Sangam MN.ttc',  # macOS
-                'Linux': '/usr/share/fonts/truetype/noto/NotoSansMalayalam-Regular.ttf',
-                'Windows': 'C:\\Windows\\Fonts\\NirmalaB.ttf'  # Nirmala UI Bold
-            },
-            'hindi': {
-                'Darwin': '/System/Library/Fonts/Supplemental/Devanagari Sangam MN.ttc',
-                'Linux': '/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf',
-                'Windows': 'C:\\Windows\\Fonts\\NirmalaB.ttf'
-            },
-            'arabic': {
-                'Darwin': '/System/Library/Fonts/Supplemental/Baghdad.ttf',
-                'Linux': '/usr/share/fonts/truetype/noto/NotoSansArabic-Regular.ttf',
-                'Windows': 'C:\\Windows\\Fonts\\tahoma.ttf'
-            },
-            'chinese': {
-                'Darwin': '/System/Library/Fonts/PingFang.ttc',
-                'Linux': '/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc',
-                'Windows': 'C:\\Windows\\Fonts\\msyh.ttc'
-            },
-            'japanese': {
-                'Darwin': '/System/Library/Fonts/ヒラギノ角ゴシック W3.ttc',
-                'Linux': '/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc',
-                'Windows': 'C:\\Windows\\Fonts\\msmincho.ttc'
-            },
-            'korean': {
-                'Darwin': '/System/Library/Fonts/AppleSDGothicNeo.ttc',
-                'Linux': '/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc',
-                'Windows': 'C:\\Windows\\Fonts\\malgun.ttf'
-            },
-            'latin': {
-                'Darwin': '/System/Library/Fonts/Helvetica.ttc',
-                'Linux': '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
-                'Windows': 'C:\\Windows\\Fonts\\Arial.ttf'
-            }
-        }
-
-        font_path = font_map.get(script, font_map['latin']).get(system, font_map['latin']['Darwin'])
-
-        # Check if font exists, fallback to Noto Sans if not
-        if not os.path.exists(font_path):
-            print(f"⚠️  Font not found: {font_path}")
-            # Try fallback fonts
-            fallback_fonts = []
-            if system == 'Darwin':
-                fallback_fonts = [
-                    '/System/Library/Fonts/Supplemental/Arial Unicode.ttf',
-                    '/System/Library/Fonts/Helvetica.ttc',
-                ]
-            elif system == 'Linux':
-                fallback_fonts = [
-                    '/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf',
-                    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
-                ]
-
-            for fallback in fallback_fonts:
-                if os.path.exists(fallback):
-                    print(f"✅ Using fallback font: {fallback}")
-                    return fallback
-
-            print(f"⚠️  Using default font path: {font_path} (may not exist)")
 
+        Fonts come from the process's font index (see font_index.py); with
+        text, the font also has glyphs for every character of it, so a chunk
+        mixing scripts does not render as boxes. Passing the text's scripts
+        (from caption_layout.classify_text) saves the per-character check
+        unless the text has characters outside the known scripts.
+        """
+        index = font_index()
+        if text_scripts is not None and 'other' not in text_scripts:
+            font_path = index.font_for_scripts(text_scripts, script)
+        elif text:
+            font_path = index.font_for_text(text, script)
+        else:
+            font_path = index.font_for_script(script)
+        if font_path is None:
+            # No installed font has the script: let FFmpeg report the preferred one
+            preferred = PREFERRED_FONTS.get(SYSTEM, PREFERRED_FONTS['Linux'])
+            font_path = (preferred.get(script) or preferred['latin'])[0]
+            if script not in _MISSING_FONT_WARNED:
+                _MISSING_FONT_WARNED.add(script)
+                print(f"⚠️  No installed font covers {script}, using {font_path} (may not exist)")
         return font_path
 
     def _get_zoom_effect(self, effect_type: str, total_frames: int,
@@ -377,98 +844,216 @@ class VideoGenerator:
 
         return effects.get(effect_type, effects['ken_burns'])
 
-    def _create_scene_video(self, scene: Dict, index: int,
+    def _create_scene_video(self, ctx: RenderContext, scene: Dict, index: int,
                            width: int, height: int, fps: int,
                            transition_duration: float, effect_type: str = 'ken_burns', enable_captions: bool = True) -> str:
         """Create video for a single scene with text overlay"""
-        image_path = scene['image_path']
-        audio_path = scene['audio_path']
-        caption = scene['caption']
-
         # Get audio duration
-        audio_duration = self._get_audio_duration(audio_path)
+        audio_duration = self._get_scene_audio_duration(ctx, scene, index)
 
         # Output path for this scene
-        scene_output = os.path.join(self.temp_dir, f"scene_{index:03d}.mp4")
+        scene_output = ctx.scene_path(index)
+
+        # Cycle through 4 cinematic effects for variety
+        selected_effect = SCENE_EFFECTS[index % len(SCENE_EFFECTS)]
+        print(f"   🎬 Effect: {SCENE_EFFECT_NAMES.get(selected_effect, selected_effect)}")
+
+        filters = self._build_scene_filters(
+            scene['caption'], index, width, height, fps, audio_duration, selected_effect, enable_captions
+        )
+        cmd = self._scene_command(scene['image_path'], scene['audio_path'], filters, scene_output)
 
-        # Create complex filter for text animation and effects (only if captions enabled)
-        text_filter = self._create_text_filter(
-            caption, width, height, audio_duration, index
-        ) if enable_captions else ""
+        # Run FFmpeg
+        result = self._run_ffmpeg(ctx, cmd, stage=f"scene {index+1}", duration=audio_duration)
 
+        if result.returncode != 0:
+            print(f"❌ Error creating scene {index}:")
+            print(result.stderr)
+            raise RuntimeError(f"Failed to create scene {index}")
+
+        ctx.artifacts.append(scene_output)
+        return scene_output
+
+    def _build_scene_filters(self, caption: str, index: int, width: int, height: int, fps: int,
+                             duration: float, effect: str, enable_captions: bool = True) -> List[tuple]:
+        """
+        Video filter chain of a scene as (name, filter) pairs, in order
+
+        The names (upscale, zoompan, unsharp, fade, drawtext) let
+        profile_scene_filters() drop one filter at a time.
+        """
         # Calculate zoom parameters for smooth, dynamic motion
-        total_frames = int(audio_duration * fps)
+        total_frames = int(duration * fps)
 
-        # Cycle through 4 cinematic effects for variety
-        effect_types = ['pan_right', 'pan_left', 'dynamic', 'zoom_out']
-        selected_effect = effect_types[index % len(effect_types)]
-
-        # Display which effect is being used
-        effect_names = {
-            'pan_right': 'Pan right with zoom',
-            'pan_left': 'Pan left with zoom',
-            'dynamic': 'Dynamic zoom & pan',
-            'zoom_out': 'Smooth zoom out'
-        }
-        print(f"   🎬 Effect: {effect_names.get(selected_effect, selected_effect)}")
+        source_width, source_height = self._source_size(effect, width, height)
+
+        filters = [
+            ('upscale', f"scale={source_width}:{source_height}:force_original_aspect_ratio=increase,"
+                        f"crop={source_width}:{source_height}"),
+            # Get the zoom/pan filter for this scene
+            ('zoompan', self._get_zoom_effect(effect, total_frames, width, height, fps)),
+            # Add slight sharpening for crisp output
+            ('unsharp', "unsharp=5:5:0.8:5:5:0.0"),
+            # Fade in effect at start only (crossfade will handle transitions)
+            ('fade', "fade=t=in:st=0:d=0.5"),
+        ]
 
-        # Get the zoom/pan filter for this scene
-        zoom_filter = self._get_zoom_effect(selected_effect, total_frames, width, height, fps)
+        # Text animation (only if captions enabled)
+        if enable_captions:
+            text_filter = self._create_text_filter(caption, width, height, duration, index).lstrip(',')
+            if text_filter:
+                filters.append(('drawtext', text_filter))
+        return filters
 
-        # Scale factor for smooth zooming (higher for zoom/dynamic effects)
-        scale_factor = 2 if selected_effect in ['dynamic', 'zoom_out'] else 1.5
+    def _scene_command(self, image_path: str, audio_path: str, filters: List[tuple],
+                       output_path: str, encode_video: bool = True,
+                       max_seconds: Optional[float] = None) -> List[str]:
+        """
+        FFmpeg command rendering a scene clip from its image, audio and filter chain
 
+        Args:
+            encode_video: False sends the frames to the null muxer instead of
+                          libx264 (used to measure the encoder's share)
+            max_seconds: Stop after this many seconds of output
+        """
         cmd = [
             'ffmpeg',
             '-loop', '1',
             '-i', image_path,
             '-i', audio_path,
             '-filter_complex',
-            f"[0:v]scale={int(width*scale_factor)}:{int(height*scale_factor)}:force_original_aspect_ratio=increase,"
-            f"crop={int(width*scale_factor)}:{int(height*scale_factor)},"
-            f"{zoom_filter},"
-            # Add slight sharpening for crisp output
-            f"unsharp=5:5:0.8:5:5:0.0,"
-            # Fade in effect at start only (crossfade will handle transitions)
-            f"fade=t=in:st=0:d=0.5"
-            f"{text_filter}[v]",
+            f"[0:v]{','.join(chain for _, chain in filters)}[v]",
             '-map', '[v]',
             '-map', '1:a',
-            '-c:v', 'libx264',
-            '-preset', 'fast',  # Faster encoding
-            '-crf', '25',  # Good quality but smaller file size
+        ]
+        if encode_video:
+            cmd += [
+                '-c:v', 'libx264',
+                '-preset', 'fast',  # Faster encoding
+                '-crf', '25',  # Good quality but smaller file size
+            ]
+        cmd += [
             '-c:a', 'aac',
             '-b:a', '128k',  # Reduced audio bitrate
             '-shortest',
+        ]
+        if max_seconds:
+            cmd += ['-t', f"{max_seconds:.3f}"]
+        if not encode_video:
+            return cmd + ['-f', 'null', os.devnull]
+        return cmd + [
             '-movflags', '+faststart',
             '-y',
-            scene_output
+            output_path
         ]
 
-        # Run FFmpeg
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    def profile_scene_filters(self, scene: Dict, aspect_ratio: str = "16:9", fps: int = 30,
+                              effects: Optional[List[str]] = None, seconds: float = 3.0,
+                              repeat: int = 1, enable_captions: bool = True) -> Dict:
+        """
+        Attribute the CPU cost of a scene render to each filter of its chain
 
-        if result.returncode != 0:
-            print(f"❌ Error creating scene {index}:")
-            print(result.stderr)
-            raise RuntimeError(f"Failed to create scene {index}")
+        Renders the first seconds of the scene once per effect type with the
+        full chain, then once per ablation: one filter dropped (zoompan is
+        replaced by a plain crop to keep the frame size) or, for libx264,
+        frames sent to the null muxer. A filter's cost is the FFmpeg CPU time
+        (-benchmark utime + stime) the full chain needs beyond its ablation;
+        what no ablation explains (image decoding, audio, muxing) is "other".
 
-        return scene_output
+        Args:
+            scene: Scene dictionary (image_path, audio_path, caption)
+            aspect_ratio: Video aspect ratio
+            fps: Frames per second
+            effects: Effect types to profile (default: all of SCENE_EFFECTS)
+            seconds: Length of each profiling render
+            repeat: Runs per variant (the fastest counts)
+            enable_captions: Include the drawtext chain
+
+        Returns:
+            Report per effect: frames, CPU seconds and ms per frame of the full
+            chain, and its filters ranked by cost
+        """
+        require_ffmpeg()
+        width, height = self.get_dimensions(aspect_ratio)
+        ctx = RenderContext(job_id="profile")
+        try:
+            seconds = min(seconds, self._get_scene_audio_duration(ctx, scene, 0))
+            frames = max(1, int(seconds * fps))
+            output_path = os.path.join(ctx.temp_dir, "profile.mp4")
+
+            def measure(filters: List[tuple], encode_video: bool = True) -> float:
+                runs = []
+                for _ in range(max(1, repeat)):
+                    cmd = self._scene_command(scene['image_path'], scene['audio_path'], filters,
+                                              output_path, encode_video, seconds)
+                    cpu_before = ctx.cpu_seconds
+                    result = self._run_ffmpeg(ctx, cmd, stage="profile", duration=seconds)
+                    if result.returncode != 0:
+                        print(result.stderr)
+                        raise RuntimeError("Filter profiling render failed")
+                    runs.append(ctx.cpu_seconds - cpu_before)
+                return min(runs)
+
+            report = {}
+            for effect in effects or SCENE_EFFECTS:
+                print(f"🔬 Profiling {SCENE_EFFECT_NAMES.get(effect, effect)}...")
+                filters = self._build_scene_filters(
+                    scene['caption'], 0, width, height, fps, seconds, effect, enable_captions
+                )
+                baseline = measure(filters)
+
+                ablations = {}
+                for name, _ in filters:
+                    if name == 'fade':
+                        continue  # a per-pixel multiply for half a second: not worth a render
+                    if name == 'zoompan':
+                        # Same output frames without the per-frame zoom/pan
+                        ablated = [(other, f"crop={width}:{height},fps={fps}" if other == name else chain)
+                                   for other, chain in filters]
+                    else:
+                        ablated = [(other, chain) for other, chain in filters if other != name]
+                    ablations[name] = measure(ablated)
+                ablations['libx264'] = measure(filters, encode_video=False)
+
+                costs = [
+                    {
+                        'filter': name,
+                        'cpuSeconds': max(0.0, baseline - cpu),
+                        'msPerFrame': max(0.0, baseline - cpu) * 1000 / frames,
+                        'share': max(0.0, baseline - cpu) / baseline if baseline else 0.0,
+                    }
+                    for name, cpu in ablations.items()
+                ]
+                costs.sort(key=lambda cost: cost['cpuSeconds'], reverse=True)
+                attributed = sum(cost['cpuSeconds'] for cost in costs)
+                report[effect] = {
+                    'frames': frames,
+                    'cpuSeconds': baseline,
+                    'msPerFrame': baseline * 1000 / frames,
+                    'filters': costs,
+                    'otherSeconds': max(0.0, baseline - attributed),
+                }
+            return report
+        finally:
+            ctx.cleanup()
 
     def _create_text_filter(self, caption: str, width: int, height: int,
                            duration: float, scene_index: int) -> str:
         """
-        Create FFmpeg text overlay with live caption style (3-4 words at a time)
+        Create FFmpeg text overlay with live caption style (about 3 words at a time)
         Supports multiple scripts including Malayalam, Hindi, Arabic, Chinese, Japanese, Korean
 
+        Chunks are balanced by estimated rendered width (see caption_layout.py),
+        so long words, wide scripts and unspaced text stay inside the frame.
+
         Args:
             caption: Text to display (full voice over)
             width, height: Video dimensions
             duration: Scene duration in seconds
             scene_index: Scene number for color variation
         """
-        # Detect script and get appropriate font
-        script = self._detect_script(caption)
+        # Classify the caption once: its script, and the script and width of each word
+        script, words = classify_text(caption)
         font_path = self._get_font_path(script)
         print(f"   📝 Detected script: {script}, using font: {font_path}")
         # Determine aspect ratio orientation
@@ -498,37 +1083,45 @@ class VideoGenerator:
         else:
             text_y = int(height * 0.78)  # Bottom area for horizontal
 
-        # Split caption into 3-4 word chunks
-        words = caption.split()
-        chunks = []
-
-        # Group words into chunks of 3-4 words
-        words_per_chunk = 3
-        for i in range(0, len(words), words_per_chunk):
-            chunk_words = words[i:i + words_per_chunk]
-            chunk_text = ' '.join(chunk_words)
-            chunks.append(chunk_text)
+        # Split caption into chunks of about 3 average words, never wider than the frame
+        box_border = 15
+        max_width = (width * CAPTION_MAX_WIDTH - 2 * box_border) / font_size
+        chunks = chunk_words(words, min(CAPTION_CHUNK_EMS, max_width), max_width)
 
         # Calculate timing for each chunk
         num_chunks = len(chunks)
         time_per_chunk = duration / num_chunks if num_chunks > 0 else duration
 
-        print(f"   📝 Caption split into {num_chunks} chunks ({words_per_chunk} words each)")
+        print(f"   📝 Caption split into {num_chunks} chunks (~{CAPTION_CHUNK_EMS:g} ems each)")
+
+        # Scripts the caption's font has glyphs for, and the font of each other script mix
+        font_scripts = font_index().scripts_covered(font_path)
+        mix_fonts = {}
 
         # Create drawtext filter for each chunk
         text_filters = []
 
-        for i, chunk in enumerate(chunks):
+        for i, (chunk, chunk_scripts, _) in enumerate(chunks):
             # Escape special characters for FFmpeg
             chunk_escaped = chunk.replace("'", "'\\\\\\''").replace(":", "\\:").replace("%", "\\\\%")
 
             start_time = i * time_per_chunk
             end_time = (i + 1) * time_per_chunk
 
+            # The caption's font unless the chunk has characters it lacks
+            if chunk_scripts <= font_scripts:
+                chunk_font = font_path
+            elif 'other' in chunk_scripts:
+                chunk_font = self._get_font_path(script, chunk, chunk_scripts)
+            else:
+                if chunk_scripts not in mix_fonts:
+                    mix_fonts[chunk_scripts] = self._get_font_path(script, chunk, chunk_scripts)
+                chunk_font = mix_fonts[chunk_scripts]
+
             # Create filter for this chunk with proper font support
             text_filters.append(
                 f"drawtext="
-                f"fontfile={font_path}:"
+                f"fontfile={chunk_font}:"
                 f"fontsize={font_size}:"
                 f"fontcolor=white:"
                 f"borderw=3:"
@@ -536,7 +1129,7 @@ class VideoGenerator:
                 # Larger semi-transparent background box
                 f"box=1:"
                 f"boxcolor=black@0.7:"
-                f"boxborderw=15:"
+                f"boxborderw={box_border}:"
                 # Center horizontally and vertically
                 f"x=(w-text_w)/2:"
                 f"y={text_y}:"
@@ -554,9 +1147,10 @@ class VideoGenerator:
 
         return text_filter
 
-    def _create_concat_file(self, video_files: List[str]) -> str:
+    def _create_concat_file(self, ctx: RenderContext, video_files: List[str]) -> str:
         """Create concat file for FFmpeg"""
-        concat_file = os.path.join(self.temp_dir, "concat_list.txt")
+        concat_file = os.path.join(ctx.temp_dir, "concat_list.txt")
+        ctx.artifacts.append(concat_file)
 
         with open(concat_file, 'w') as f:
             for video in video_files:
@@ -576,11 +1170,27 @@ class VideoGenerator:
         result = subprocess.run(cmd, capture_output=True, text=True)
         return float(result.stdout.strip())
 
-    def _concatenate_videos_with_transitions(self, video_files: List[str], output_path: Path,
-                                            fps: int, transition_duration: float):
+    def _build_timeline(self, ctx: RenderContext, durations: List[float],
+                        transition_duration: float):
+        """Record where each scene starts in the final video (crossfades overlap scenes)"""
+        ctx.timeline = []
+        offset = 0.0
+        for index, duration in enumerate(durations):
+            ctx.timeline.append({'index': index, 'duration': duration, 'offset': offset})
+            offset += duration - transition_duration
+
+    def _concatenate_videos_with_transitions(self, ctx: RenderContext, video_files: List[str],
+                                            output_path: Path,
+                                            fps: int, transition_duration: float,
+                                            streaming_output: Optional[str] = None):
         """Concatenate videos with smooth crossfade transitions between scenes"""
 
         if len(video_files) == 1:
+            self._build_timeline(ctx, [self._get_video_duration(video_files[0])], 0)
+            if streaming_output:
+                # Remux the single scene so the streaming outputs still exist
+                self._remux_single_video(ctx, video_files[0], output_path, streaming_output)
+                return
             # Only one video, just copy it
             import shutil
             shutil.copy(video_files[0], output_path)
@@ -590,6 +1200,7 @@ class VideoGenerator:
 
         # Get durations of all videos
         durations = [self._get_video_duration(vf) for vf in video_files]
+        self._build_timeline(ctx, durations, transition_duration)
 
         # Build complex filter for crossfade transitions
         filter_parts = []
@@ -656,15 +1267,14 @@ class VideoGenerator:
             '-crf', '25',  # Good quality but smaller file size
             '-c:a', 'aac',
             '-b:a', '128k',  # Reduced audio bitrate
-            '-movflags', '+faststart',
-            '-y',
-            str(output_path)
         ])
+        cmd.extend(self._get_output_args(output_path, streaming_output))
 
         print(f"   ⏱️  Video durations: {[f'{d:.1f}s' for d in durations]}")
         print(f"   🔀 Transition type: smoothleft ({transition_duration}s)")
 
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        total_duration = ctx.timeline[-1]['offset'] + ctx.timeline[-1]['duration']
+        result = self._run_ffmpeg(ctx, cmd, stage="assembly", duration=total_duration)
 
         if result.returncode != 0:
             print(f"❌ Error creating transitions:")
@@ -682,6 +1292,24 @@ class VideoGenerator:
 
             raise RuntimeError(f"Failed to create video with transitions: {result.stderr[-500:]}")
 
+    def _remux_single_video(self, ctx: RenderContext, video_file: str, output_path: Path,
+                            streaming_output: str):
+        """Write a single scene video to the streaming outputs without re-encoding"""
+        cmd = [
+            'ffmpeg',
+            '-i', video_file,
+            '-map', '0',
+            '-c', 'copy',
+        ]
+        cmd.extend(self._get_output_args(output_path, streaming_output))
+
+        result = self._run_ffmpeg(ctx, cmd)
+
+        if result.returncode != 0:
+            print(f"❌ Error writing streaming output:")
+            print(result.stderr)
+            raise RuntimeError(f"Failed to write streaming output: {result.stderr[-500:]}")
+
     def _concatenate_videos(self, concat_file: str, output_path: Path, fps: int):
         """Concatenate all scene videos into final output (simple method without transitions)"""
         cmd = [